@@ -0,0 +1,406 @@
+"""
+Native async variants of the flashcard, study group, login and registration views, and
+the group event stream (server-sent events).
+
+They run on the event loop under ASGI (no sync_to_async hop per request) and use the
+async ORM. Request and response formats match the DRF views in api.views; the
+API_ASYNC_VIEWS setting decides which variant serves each route (see api.urls).
+"""
+import json
+import logging
+import math
+import time
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed, NotFound, Throttled
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .authentication import aauthenticate
+from . import cache as response_cache
+from . import events
+from .fieldsets import FULL, FieldsetError, parse_fieldset, trim_queryset
+from .backends import PooledModelBackend
+from .hashing import HashingBusy, amake_password
+from .models import StudyGroup, Flashcard, MEMBER_MODES, MEMBERS_FULL
+from .pagination import (
+    FlashcardKeysetPagination, KeysetPagination, StudyGroupKeysetPagination, get_page_size, wants_count
+)
+from .serializers import RegisterSerializer, StudyGroupSerializer, FlashcardSerializer, UserSerializer
+from .throttling import AUTH, ScopedThrottle, get_throttle, method_scope
+from .views import filter_category, group_queryset
+
+logger = logging.getLogger('api')
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+class AsyncAPIView(View):
+    """Token authentication, throttling, JSON bodies and DRF-shaped errors for async handlers."""
+    authentication_required = True
+    throttle_scope = None  # None: by request method, like api.throttling.ScopedThrottle
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated, so exempt from CSRF exactly like DRF's APIView
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        try:
+            # A sub-request of POST /api/batch/ arrives with its user resolved already
+            request.user = getattr(request, '_force_auth_user', None) or await aauthenticate(request)
+        except AuthenticationFailed as exc:
+            return json_response({'detail': str(exc.detail)}, status=401)
+        if request.user is None and self.authentication_required:
+            return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        client = ScopedThrottle().client(request)
+        wait = await get_throttle().acheck(self.throttle_scope or method_scope(request.method), client)
+        if wait:
+            logger.warning("Throttled %s %s for %s", request.method, request.path, client)
+            response = json_response({'detail': str(Throttled(wait).detail)}, status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            try:
+                request.data = json.loads(request.body or b'{}')
+            except ValueError as exc:
+                return json_response({'detail': f'JSON parse error - {exc}'}, status=400)
+        return await handler(request, *args, **kwargs)
+
+
+async def paginate(request, queryset, serializer_class, cursor_pagination_class, **serializer_kwargs):
+    """
+    The DRF list views' response shapes, fetched with acount() and async iteration:
+    ListPagination's, or cursor_pagination_class's with ?cursor=. Raises NotFound like them.
+    """
+    if KeysetPagination.cursor_query_param in request.GET:
+        paginator = cursor_pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request)
+        return paginator.get_paginated_data(serializer_class(page, many=True, **serializer_kwargs).data)
+    page_size = get_page_size(request.GET)
+    page = request.GET.get('page', '1')
+    if not page.isdigit() or int(page) < 1:
+        raise NotFound('Invalid page.')
+    page = int(page)
+    offset = (page - 1) * page_size
+    data = {}
+    if wants_count(request.GET, default=True):
+        count = await queryset.acount()
+        if page > max(1, -(-count // page_size)):
+            raise NotFound('Invalid page.')
+        results = [obj async for obj in queryset[offset:offset + page_size]]
+        has_next = offset + page_size < count
+        data['count'] = count
+    else:
+        # ?count=false: one extra row says whether there is a next page
+        results = [obj async for obj in queryset[offset:offset + page_size + 1]]
+        if not results and page > 1:
+            raise NotFound('Invalid page.')
+        has_next = len(results) > page_size
+        results = results[:page_size]
+    url = request.build_absolute_uri()
+    previous = None
+    if page > 1:
+        previous = replace_query_param(url, 'page', page - 1) if page > 2 else remove_query_param(url, 'page')
+    data.update({
+        'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+        'previous': previous,
+        'results': serializer_class(results, many=True, **serializer_kwargs).data,
+    })
+    return data
+
+
+def not_found_response(exc):
+    return json_response({'detail': str(exc.detail)}, status=404)
+
+
+async def cached_representation(key_function, request, *args):
+    """(cache key, cached (data, etag) or None) from api.cache, looked up off the event loop."""
+    def lookup():
+        key = key_function(request, *args)
+        return key, response_cache.get_cached(key)
+    return await sync_to_async(lookup)()
+
+
+async def etag_json_response(request, key, data, etag=None):
+    """api.cache.etag_response for async views: caches data under key unless etag says it came from there."""
+    if etag is None:
+        etag = await sync_to_async(response_cache.set_cached)(key, data)
+    response = HttpResponse(status=304) if response_cache.not_modified(request, etag) else json_response(data)
+    response['ETag'] = etag
+    return response
+
+
+def invalid_fieldset_response(exc):
+    return json_response({'error': str(exc)}, status=400)
+
+
+def hashing_busy_response():
+    logger.warning("Password hashing pool is full, refusing sign-in")
+    response = json_response({'error': 'Too many sign-ins in progress, try again shortly'}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+class AsyncRegisterView(AsyncAPIView):
+    authentication_required = False
+    throttle_scope = AUTH
+
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        if not await sync_to_async(serializer.is_valid)():
+            logger.error("Registration failed: %s", serializer.errors)
+            return json_response(serializer.errors, status=400)
+        try:
+            password_hash = await amake_password(serializer.validated_data['password'])
+        except HashingBusy:
+            return hashing_busy_response()
+        user = await sync_to_async(serializer.save)(password_hash=password_hash)
+        token, created = await Token.objects.aget_or_create(user=user)
+        logger.info("User %s registered successfully (async)", user.username)
+        return json_response({'user': UserSerializer(user).data, 'token': token.key}, status=201)
+
+
+class AsyncLoginView(AsyncAPIView):
+    authentication_required = False
+    throttle_scope = AUTH
+
+    async def post(self, request):
+        username = request.data.get('username')
+        try:
+            user = await PooledModelBackend().aauthenticate(request, username=username, password=request.data.get('password'))
+        except HashingBusy:
+            return hashing_busy_response()
+        if not user:
+            logger.error("Login failed for username %s: Invalid credentials", username)
+            return json_response({'error': 'Invalid credentials'}, status=401)
+        token, created = await Token.objects.aget_or_create(user=user)
+        logger.info("User %s logged in successfully (async)", username)
+        return json_response({'token': token.key})
+
+
+class AsyncFlashcardListCreateView(AsyncAPIView):
+    async def get(self, request):
+        try:
+            fieldset = parse_fieldset(request.GET, FlashcardSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        flashcards = filter_category(Flashcard.objects.filter(user=request.user), request.GET)
+        flashcards = trim_queryset(flashcards, FlashcardSerializer, fieldset)
+        try:
+            data = await paginate(request, flashcards, FlashcardSerializer, FlashcardKeysetPagination, context=fieldset.context())
+        except NotFound as exc:
+            return not_found_response(exc)
+        logger.info("Listed flashcards for %s (page %s, async)", request.user.username, request.GET.get('page', 1))
+        return json_response(data)
+
+    async def post(self, request):
+        serializer = FlashcardSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error("Flashcard creation failed: %s", serializer.errors)
+            return json_response(serializer.errors, status=400)
+        flashcard = await Flashcard.objects.acreate(user=request.user, **serializer.validated_data)
+        logger.info("Flashcard created by %s: %s", request.user.username, flashcard.front)
+        return json_response(FlashcardSerializer(flashcard).data, status=201)
+
+
+class AsyncFlashcardDetailView(AsyncAPIView):
+    async def get_object(self, id, user):
+        try:
+            return await Flashcard.objects.aget(id=id, user=user)
+        except Flashcard.DoesNotExist:
+            return None
+
+    async def put(self, request, id):
+        flashcard = await self.get_object(id, request.user)
+        if not flashcard:
+            logger.error("Flashcard %s not found or not authorized for %s", id, request.user.username)
+            return json_response({'error': 'Flashcard not found or not authorized'}, status=404)
+        serializer = FlashcardSerializer(flashcard, data=request.data, partial=True)
+        if not serializer.is_valid():
+            logger.error("Flashcard %s update failed: %s", id, serializer.errors)
+            return json_response(serializer.errors, status=400)
+        for field, value in serializer.validated_data.items():
+            setattr(flashcard, field, value)
+        await flashcard.asave(update_fields=list(serializer.validated_data))
+        logger.info("Flashcard %s updated by %s", id, request.user.username)
+        return json_response(FlashcardSerializer(flashcard).data)
+
+    async def delete(self, request, id):
+        flashcard = await self.get_object(id, request.user)
+        if not flashcard:
+            logger.error("Flashcard %s not found or not authorized for %s", id, request.user.username)
+            return json_response({'error': 'Flashcard not found or not authorized'}, status=404)
+        await flashcard.adelete()
+        logger.info("Flashcard %s deleted by %s", id, request.user.username)
+        return HttpResponse(status=204)
+
+
+def member_mode(request):
+    mode = request.GET.get('members', MEMBERS_FULL)
+    return mode if mode in MEMBER_MODES else None
+
+
+def invalid_member_mode_response():
+    return json_response({'error': f"members must be one of: {', '.join(MEMBER_MODES)}"}, status=400)
+
+
+class AsyncStudyGroupListCreateView(AsyncAPIView):
+    async def get(self, request):
+        mode = member_mode(request)
+        if not mode:
+            return invalid_member_mode_response()
+        try:
+            fieldset = parse_fieldset(request.GET, StudyGroupSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        cache_key, cached = await cached_representation(response_cache.group_list_key, request, mode, fieldset)
+        if cached:
+            logger.info("Listed study groups (page %s, cached, async)", request.GET.get('page', 1))
+            return await etag_json_response(request, cache_key, *cached)
+        groups = group_queryset(mode, fieldset)
+        try:
+            data = await paginate(
+                request, groups, StudyGroupSerializer, StudyGroupKeysetPagination, context={'members': mode, **fieldset.context()}
+            )
+        except NotFound as exc:
+            return not_found_response(exc)
+        logger.info("Listed study groups (page %s, async)", request.GET.get('page', 1))
+        return await etag_json_response(request, cache_key, data)
+
+    async def post(self, request):
+        serializer = StudyGroupSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error("Study group creation failed: %s", serializer.errors)
+            return json_response(serializer.errors, status=400)
+        group = await sync_to_async(self.create)(serializer, request.user)
+        group = await StudyGroup.objects.for_representation().aget(pk=group.pk)
+        logger.info("Study group %s created by %s", group.name, request.user.username)
+        return json_response(StudyGroupSerializer(group).data, status=201)
+
+
+    @staticmethod
+    def create(serializer, creator):
+        # The DRF view's path (StudyGroupSerializer.create and add_member), in one transaction so a group never lacks its creator
+        with transaction.atomic():
+            return serializer.save(creator=creator)
+
+
+class AsyncStudyGroupDetailView(AsyncAPIView):
+    async def get_object(self, id, mode=MEMBERS_FULL, fieldset=FULL):
+        try:
+            return await group_queryset(mode, fieldset).aget(id=id)
+        except StudyGroup.DoesNotExist:
+            return None
+
+    async def get(self, request, id):
+        mode = member_mode(request)
+        if not mode:
+            return invalid_member_mode_response()
+        try:
+            fieldset = parse_fieldset(request.GET, StudyGroupSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        cache_key, cached = await cached_representation(response_cache.group_detail_key, request, id, mode, fieldset)
+        if cached:
+            logger.info("Study group %s details retrieved by %s (cached, async)", id, request.user.username)
+            return await etag_json_response(request, cache_key, *cached)
+        group = await self.get_object(id, mode, fieldset)
+        if not group:
+            logger.error("Study group %s not found", id)
+            return json_response({'error': 'Group not found'}, status=404)
+        logger.info("Study group %s details retrieved by %s (async)", id, request.user.username)
+        data = StudyGroupSerializer(group, context={'members': mode, **fieldset.context()}).data
+        return await etag_json_response(request, cache_key, data)
+
+    async def put(self, request, id):
+        group = await self.get_object(id)
+        if not group:
+            logger.error("Study group %s not found for update", id)
+            return json_response({'error': 'Group not found'}, status=404)
+        if group.creator_id != request.user.id:
+            logger.warning("User %s attempted to update study group %s but is not the creator", request.user.username, id)
+            return json_response({'error': 'Only the creator can update this group'}, status=403)
+        serializer = StudyGroupSerializer(group, data=request.data, partial=True)
+        if not serializer.is_valid():
+            logger.error("Study group %s update failed: %s", id, serializer.errors)
+            return json_response(serializer.errors, status=400)
+        for field, value in serializer.validated_data.items():
+            setattr(group, field, value)
+        await group.asave(update_fields=list(serializer.validated_data))
+        logger.info("Study group %s updated by %s", id, request.user.username)
+        data = StudyGroupSerializer(group).data
+        await events.apublish_group_event(id, events.GROUP_UPDATED, data)
+        return json_response(data)
+
+    async def delete(self, request, id):
+        group = await StudyGroup.objects.filter(id=id).only('id', 'creator_id').afirst()
+        if not group:
+            logger.error("Study group %s not found for deletion", id)
+            return json_response({'error': 'Group not found'}, status=404)
+        if group.creator_id != request.user.id:
+            logger.warning("User %s attempted to delete study group %s but is not the creator", request.user.username, id)
+            return json_response({'error': 'Only the creator can delete this group'}, status=403)
+        await group.adelete()
+        logger.info("Study group %s deleted by %s", id, request.user.username)
+        await events.apublish_group_event(id, events.GROUP_DELETED, {'group': id})
+        return HttpResponse(status=204)
+
+
+class AsyncGroupEventStreamView(AsyncAPIView):
+    """
+    GET /api/groups/<id>/events/: a text/event-stream of member_joined, member_left,
+    updated and deleted events for the group. ?timeout= ends the stream sooner than
+    MAX_SECONDS. Only served over ASGI: under WSGI each open stream would hold a worker for
+    minutes, and EventSource reconnects by itself, so it answers 501 there.
+    """
+
+    async def get(self, request, id):
+        if not isinstance(request, ASGIRequest):
+            return json_response({'error': 'Event streams require the ASGI server (studygroup_api.asgi)'}, status=501)
+        config = events.get_config()
+        seconds = config['MAX_SECONDS']
+        if 'timeout' in request.GET:
+            if not request.GET['timeout'].isdigit():
+                return json_response({'error': 'timeout must be a whole number of seconds'}, status=400)
+            seconds = min(int(request.GET['timeout']), seconds)
+        if not await StudyGroup.objects.filter(id=id).aexists():
+            logger.error("Study group %s not found for event stream", id)
+            return json_response({'error': 'Group not found'}, status=404)
+        subscription = events.get_broker().subscribe(events.group_channel(id))
+        response = StreamingHttpResponse(self.astream(subscription, config, time.monotonic() + seconds), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: pass events through as they are written
+        logger.info("User %s subscribed to study group %s events", request.user.username, id)
+        return response
+
+    @staticmethod
+    def prelude(config):
+        return f"retry: {config['RETRY_MS']}\n\n".encode()
+
+    @staticmethod
+    def overflow(subscription):
+        logger.warning("Event stream on %s fell behind, closing it", subscription.channel)
+        return events.encode_event('overflow', {'detail': 'Too many pending events; refetch the group and reconnect'})
+
+    async def astream(self, subscription, config, deadline):
+        try:
+            yield self.prelude(config)
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    frames = await subscription.aget(min(config['HEARTBEAT_SECONDS'], remaining))
+                except events.Overflowed:
+                    yield self.overflow(subscription)
+                    return
+                yield b''.join(frames) if frames else events.KEEPALIVE
+        finally:
+            events.get_broker().unsubscribe(subscription)
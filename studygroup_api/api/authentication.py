@@ -0,0 +1,161 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+DEFAULT_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 60,
+    # Cache alias for a second tier shared between workers, or None for in-process only
+    'CACHE_ALIAS': None,
+}
+
+
+class TokenCache:
+    """
+    Token key -> (user, token) lookups, held in a bounded in-process LRU and optionally
+    in a shared Django cache. Entries expire after TTL seconds; entries in other
+    processes' LRUs cannot be invalidated directly, so TTL also bounds their staleness.
+    """
+
+    def __init__(self, max_entries, ttl, cache_alias=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = caches[cache_alias] if cache_alias else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_TOKEN_CACHE, **getattr(settings, 'TOKEN_AUTH_CACHE', {})}
+        return cls(config['MAX_ENTRIES'], config['TTL'], config['CACHE_ALIAS'])
+
+    def get(self, key):
+        now = time.monotonic()
+        value = self._get_local(key, now)
+        if value is None and self.shared is not None:
+            value = self.shared.get(self._shared_key(key))
+            if value is not None:
+                self._store_local(key, value, now)
+        return self._copy(value) if value is not None else None
+
+    async def aget(self, key):
+        now = time.monotonic()
+        value = self._get_local(key, now)
+        if value is None and self.shared is not None:
+            value = await self.shared.aget(self._shared_key(key))
+            if value is not None:
+                self._store_local(key, value, now)
+        return self._copy(value) if value is not None else None
+
+    def set(self, key, value):
+        self._store_local(key, value, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value, self.ttl)
+
+    async def aset(self, key, value):
+        self._store_local(key, value, time.monotonic())
+        if self.shared is not None:
+            await self.shared.aset(self._shared_key(key), value, self.ttl)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self._shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_local(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires > now:
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+            return None
+
+    def _store_local(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _copy(value):
+        # Requests must not share (and mutate) one cached User instance
+        user, token = value
+        return copy.copy(user), token
+
+    @staticmethod
+    def _shared_key(key):
+        return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache.from_settings()
+    return _token_cache
+
+
+def reset_token_cache():
+    global _token_cache
+    _token_cache = None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the Token/User query for recently seen tokens."""
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token))
+        return user, token
+
+
+async def aauthenticate(request):
+    """
+    CachedTokenAuthentication for the native async views: returns the user, None when no
+    token was sent, and raises AuthenticationFailed for a bad token, as DRF would.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return None
+    if len(auth) != 2:
+        raise AuthenticationFailed('Invalid token header.')
+    key = auth[1].decode(errors='replace')
+    token_cache = get_token_cache()
+    cached = await token_cache.aget(key)
+    if cached is not None:
+        return cached[0]
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        raise AuthenticationFailed('Invalid token.')
+    if not token.user.is_active:
+        raise AuthenticationFailed('User inactive or deleted.')
+    await token_cache.aset(key, (token.user, token))
+    return token.user
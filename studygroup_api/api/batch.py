@@ -0,0 +1,170 @@
+"""
+POST /api/batch/: several API calls in one round trip.
+
+Sub-requests are dispatched in-process straight to the views of api.urls, skipping the
+middleware stack and re-authentication: every sub-request is forced to the user the batch
+request authenticated as (DRF's forced authentication). They share the process-wide
+caches (tokens, group responses) like separate requests would, and each still passes the
+view's throttle, so a batch of twenty reads counts as twenty reads.
+
+Sub-requests run in order. With parallel, each run of consecutive GETs is spread over up
+to PARALLELISM threads; writes always run alone, so a GET after a write sees it. A batch
+takes at most MAX_REQUESTS sub-requests, and any sub-request not started within
+TIME_BUDGET_SECONDS is answered 503 without running.
+"""
+import contextvars
+import io
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve, reverse
+
+logger = logging.getLogger('api')
+
+DEFAULT_API_BATCH = {
+    'MAX_REQUESTS': 20,
+    'TIME_BUDGET_SECONDS': 5,  # sub-requests not started by then get 503
+    'PARALLELISM': 4,  # threads for consecutive GETs when the batch asks for parallel
+}
+
+# Streaming responses cannot be embedded, and a batch must not contain batches
+UNBATCHABLE = frozenset({'batch', 'group_events', 'flashcard_export'})
+# Copied from the batch request into every sub-request, so each is throttled as the same client
+INHERITED_META = ('REMOTE_ADDR', 'SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL', 'HTTP_HOST', 'HTTP_USER_AGENT', 'HTTP_X_FORWARDED_FOR')
+# The only headers an item may set itself
+ITEM_HEADERS = ('If-None-Match', 'Accept-Language')
+FORWARDED_HEADERS = ('ETag', 'Location', 'Retry-After')
+
+
+def get_config():
+    return {**DEFAULT_API_BATCH, **getattr(settings, 'API_BATCH', {})}
+
+
+def error_response(status, message):
+    return status, {}, json.dumps({'error': message}).encode()
+
+
+def sub_request(parent, item):
+    """A WSGIRequest for one item, carrying the batch request's user, client address and host."""
+    path, _, query = item['path'].partition('?')
+    body = b'' if item.get('body') is None else json.dumps(item['body']).encode()
+    meta = parent._request.META
+    environ = {key: meta[key] for key in INHERITED_META if key in meta}
+    allowed = {name.lower() for name in ITEM_HEADERS}
+    for name, value in item.get('headers', {}).items():
+        if name.lower() in allowed:  # BatchSerializer rejects the rest
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': parent.scheme,
+    })
+    request = WSGIRequest(environ)
+    request.user = parent.user
+    # Read by DRF's Request (and AsyncAPIView): use this user instead of authenticating again
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request
+
+
+def api_routes():
+    """(URL prefix of api.urls, its route names)."""
+    from . import urls  # api.urls imports the views, which import this module
+
+    return reverse('batch').removesuffix('batch/'), frozenset(pattern.name for pattern in urls.urlpatterns)
+
+
+def resolve_item(item, routes):
+    """The URL match for an item's path, or an error response."""
+    path = item['path'].partition('?')[0]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None, error_response(404, 'Not found')
+    prefix, names = routes
+    if not path.startswith(prefix) or match.url_name not in names:
+        return None, error_response(400, 'Only API routes can be batched')
+    if match.url_name in UNBATCHABLE:
+        return None, error_response(400, f"{match.url_name} cannot be batched")
+    return match, None
+
+
+def execute(parent, item, routes, deadline):
+    """(status, forwarded headers, JSON body bytes) for one item."""
+    if time.monotonic() > deadline:
+        return error_response(503, 'Batch time budget exhausted before this request started')
+    match, error = resolve_item(item, routes)
+    if error:
+        return error
+    request = sub_request(parent, item)
+    try:
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(request, *match.args, **match.kwargs)
+        else:
+            response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        logger.exception("Batched %s %s failed", item['method'], item['path'])
+        return error_response(500, 'Internal server error')
+    headers = {name: response[name] for name in FORWARDED_HEADERS if response.has_header(name)}
+    if not response.content:
+        return response.status_code, headers, b'null'
+    if response.get('Content-Type', '').startswith('application/json'):
+        return response.status_code, headers, response.content
+    return response.status_code, headers, json.dumps(response.content.decode(errors='replace')).encode()
+
+
+def execute_in_thread(context, *args):
+    try:
+        return context.run(execute, *args)
+    finally:
+        connections.close_all()  # this thread's connections end with it
+
+
+def groups(items, parallel):
+    """Items split into runs that may execute together: consecutive GETs when parallel, else one at a time."""
+    run = []
+    for item in items:
+        if parallel and item['method'] == 'GET':
+            run.append(item)
+            continue
+        if run:
+            yield run
+            run = []
+        yield [item]
+    if run:
+        yield run
+
+
+def run_batch(parent, items, parallel=False):
+    """The batch response body: {"responses": [{"status", "headers", "body"}, ...]} in item order."""
+    config = get_config()
+    deadline = time.monotonic() + config['TIME_BUDGET_SECONDS']
+    routes = api_routes()
+    results = []
+    with ThreadPoolExecutor(config['PARALLELISM']) if parallel else nullcontext() as pool:
+        for run in groups(items, parallel):
+            if len(run) == 1:
+                results.append(execute(parent, run[0], routes, deadline))
+                continue
+            # Each thread runs in a copy of this context, so request metrics and database routing carry over
+            futures = [pool.submit(execute_in_thread, contextvars.copy_context(), parent, item, routes, deadline) for item in run]
+            results.extend(future.result() for future in futures)
+    parts = [
+        b'{"status":%d,"headers":%s,"body":%s}' % (status, json.dumps(headers).encode(), body)
+        for status, headers, body in results
+    ]
+    return b'{"responses":[' + b','.join(parts) + b']}'
+
@@ -0,0 +1,511 @@
+"""Helpers shared by the bench_* management commands."""
+import asyncio
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.handlers import StaticFilesHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.testcases import LiveServerThread
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from .models import StudyGroup, Flashcard
+from .throttling import DEFAULT_THROTTLE
+
+
+def unthrottled():
+    """Limits too high to reject anything, so the throttle check is still part of every request."""
+    unlimited = {scope: f'{10 ** 9}/s' for scope in DEFAULT_THROTTLE['RATES']}
+    return override_settings(API_THROTTLE={**settings.API_THROTTLE, 'RATES': unlimited})
+
+
+@contextmanager
+def benchmark_environment(verbosity=0, file_databases=False):
+    """
+    Run against throwaway test databases (never real data), with DEBUG off so
+    connection.queries does not grow, and INFO logging muted so the console is not the bottleneck.
+    file_databases puts SQLite test databases in temporary files instead of memory, so
+    server threads can open their own connections to them.
+    """
+    if file_databases:
+        directory = tempfile.mkdtemp(prefix='bench-')
+        for connection in connections.all():
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = os.path.join(directory, f"{connection.alias}.sqlite3")
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity, interactive=False)
+    logging.disable(logging.INFO)
+    try:
+        with override_settings(DEBUG=False), unthrottled():
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+        teardown_databases(old_config, verbosity)
+        teardown_test_environment()
+
+
+def seed(users=10, groups=20, members_per_group=50, flashcards_per_user=200, batch_size=1000):
+    """Bulk-load a dataset; returns {'users': [...], 'tokens': {user_id: key}, 'groups': [...]}."""
+    password = make_password('benchmark')  # hash once, not once per user
+    offset = User.objects.count()
+    created_users = User.objects.bulk_create(
+        [User(username=f'bench{offset + i}', email=f'bench{offset + i}@example.com', password=password) for i in range(users)],
+        batch_size=batch_size
+    )
+    created_users = list(User.objects.filter(username__in=[user.username for user in created_users]).order_by('id'))
+    Token.objects.bulk_create([Token(key=Token.generate_key(), user=user) for user in created_users], batch_size=batch_size)
+    tokens = dict(Token.objects.filter(user__in=created_users).values_list('user_id', 'key'))
+
+    created_groups = StudyGroup.objects.bulk_create(
+        [StudyGroup(name=f'Benchmark group {i}', description='Seeded for benchmarking', creator=created_users[i % users]) for i in range(groups)],
+        batch_size=batch_size
+    )
+    through = StudyGroup.members.through
+    memberships = []
+    for index, group in enumerate(created_groups):
+        member_ids = {group.creator_id} | {created_users[(index + j) % users].id for j in range(min(members_per_group, users))}
+        memberships.extend(through(studygroup_id=group.id, user_id=user_id) for user_id in member_ids)
+    through.objects.bulk_create(memberships, batch_size=batch_size, ignore_conflicts=True)
+    StudyGroup.objects.filter(pk__in=[group.pk for group in created_groups]).recount_members()
+
+    Flashcard.objects.bulk_create(
+        (Flashcard(user=user, front=f'Question {i} for {user.username}', back=f'Answer {i}', category=f'Category {i % 5}')
+         for user in created_users for i in range(flashcards_per_user)),
+        batch_size=batch_size
+    )
+    return {'users': created_users, 'tokens': tokens, 'groups': created_groups}
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Throughput and latency percentiles (milliseconds) for one benchmark run."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p90_ms': round(percentile(ordered, 90) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+async def aconsume(response):
+    """Read a streamed body, so export latencies include producing it."""
+    if getattr(response, 'streaming', False):
+        if response.is_async:
+            return b''.join([chunk async for chunk in response.streaming_content])
+        return await sync_to_async(b''.join)(response.streaming_content)
+    return response.content
+
+
+async def drive_async(client, requests, concurrency):
+    """Issue (method, path, kwargs) requests through an AsyncClient with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def issue(method, path, kwargs):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await getattr(client, method)(path, **kwargs)
+            await aconsume(response)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(issue(method, path, kwargs) for method, path, kwargs in requests))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def drive_sync(client, requests):
+    """Issue (method, path, kwargs) requests one at a time through a test Client."""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for method, path, kwargs in requests:
+        request_started = time.perf_counter()
+        response = getattr(client, method)(path, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            errors += 1
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def drive_http(base_url, requests, concurrency):
+    """Issue (method, path, kwargs) requests over HTTP against a running server from a thread pool."""
+    def issue(request):
+        method, path, kwargs = request
+        body = kwargs.get('data')
+        headers = dict(kwargs.get('headers', {}))
+        if body is not None:
+            headers['Content-Type'] = kwargs.get('content_type', 'application/json')
+            body = body.encode()
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(base_url + path, data=body, headers=headers, method=method.upper())) as response:
+                response.read()
+            failed = False
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            failed = True
+        return time.perf_counter() - started, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(issue, requests))
+    return summarize([latency for latency, _ in outcomes], time.perf_counter() - started, sum(failed for _, failed in outcomes))
+
+
+def wsgi_environ(method, path, kwargs):
+    """A WSGI environ for (method, path, kwargs) as built by Endpoint.request()."""
+    path, _, query = path.partition('?')
+    body = kwargs.get('data', '').encode()
+    environ = {
+        'REQUEST_METHOD': method.upper(),
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': '127.0.0.1',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'CONTENT_LENGTH': str(len(body)),
+        'CONTENT_TYPE': kwargs.get('content_type', ''),
+    }
+    for name, value in kwargs.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def drive_wsgi(requests, concurrency, handler=None):
+    """
+    Call the WSGI application directly from `concurrency` long-lived worker threads, like a
+    threaded application server: request_started/request_finished fire, so CONN_MAX_AGE
+    decides whether each thread keeps its database connection between requests.
+    Returns (summary, per-request (latency, status) list in request order).
+    """
+    handler = handler or WSGIHandler()
+
+    def issue(request):
+        status = []
+        started = time.perf_counter()
+        body = handler(wsgi_environ(*request), lambda line, headers, exc_info=None: status.append(int(line[:3])))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()  # fires request_finished
+        return time.perf_counter() - started, status[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(issue, requests))
+    elapsed = time.perf_counter() - started
+    errors = sum(status >= 400 for _, status in outcomes)
+    return summarize([latency for latency, _ in outcomes], elapsed, errors), outcomes
+
+
+@contextmanager
+def live_server(host='127.0.0.1'):
+    """Serve the project over WSGI from a background thread; yields the base URL."""
+    server = LiveServerThread(host, StaticFilesHandler)
+    server.daemon = True
+    server.start()
+    server.is_ready.wait()
+    if server.error:
+        raise server.error
+    try:
+        yield f"http://{host}:{server.port}"
+    finally:
+        server.terminate()
+
+
+@contextmanager
+def count_queries():
+    """Count queries on every connection of the current thread; yields a dict updated in place."""
+    counts = {'queries': 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counts['queries'] += 1
+        return execute(sql, params, many, context)
+
+    wrappers = [connection.execute_wrapper(wrapper) for connection in connections.all()]
+    for context in wrappers:
+        context.__enter__()
+    try:
+        yield counts
+    finally:
+        for context in reversed(wrappers):
+            context.__exit__(None, None, None)
+
+
+class Endpoint:
+    """
+    One benchmarked request shape against a route of api.urls. build(ctx, i) returns
+    (user, url args, JSON body or None) for the i-th request; prepare(ctx, n), when given,
+    creates the rows n requests will consume (for deletes, joins and the like). asgi_only
+    endpoints are always driven through an AsyncClient, whatever the transport.
+    """
+
+    def __init__(self, label, url_name, method='get', build=None, query='', prepare=None, auth=True, asgi_only=False):
+        self.label = label
+        self.url_name = url_name
+        self.method = method
+        self.build = build or (lambda ctx, i: (acting_user(ctx, i), [], None))
+        self.query = query
+        self.prepare = prepare
+        self.auth = auth
+        self.asgi_only = asgi_only
+
+    def request(self, ctx, i):
+        user, args, body = self.build(ctx, i)
+        path = reverse(self.url_name, args=args) + (f"?{self.query}" if self.query else '')
+        kwargs = {}
+        if self.auth:
+            kwargs['headers'] = {'Authorization': f"Token {ctx['tokens'][user.id]}"}
+        if body is not None:
+            kwargs.update(data=json.dumps(body), content_type='application/json')
+        return self.method, path, kwargs
+
+
+def acting_user(ctx, i):
+    return ctx['users'][i % len(ctx['users'])]
+
+
+def own_flashcard(ctx, i):
+    user = acting_user(ctx, i)
+    cards = ctx['flashcards'][user.id]
+    return user, cards[(i // len(ctx['users'])) % len(cards)]
+
+
+def own_group(ctx, i):
+    creators = sorted(ctx['owned_groups'])
+    user_id = creators[i % len(creators)]
+    groups = ctx['owned_groups'][user_id]
+    return ctx['users_by_id'][user_id], groups[(i // len(creators)) % len(groups)]
+
+
+def on_own_flashcard(body):
+    def build(ctx, i):
+        user, card_id = own_flashcard(ctx, i)
+        return user, [card_id], body(i)
+    return build
+
+
+def on_own_group(body):
+    def build(ctx, i):
+        user, group_id = own_group(ctx, i)
+        return user, [group_id], body(i)
+    return build
+
+
+def any_group(ctx, i):
+    return ctx['groups'][i % len(ctx['groups'])].id
+
+
+def prepare_flashcards(ctx, n):
+    cards = Flashcard.objects.bulk_create(
+        [Flashcard(user=acting_user(ctx, i), front=f'Disposable {i}', back='Answer') for i in range(n)], batch_size=1000
+    )
+    ctx['targets'] = [(card.user, card.id) for card in cards]
+
+
+def prepare_groups(ctx, n, with_members=False):
+    """n fresh groups created by the first user; with_members adds request i's user to group i."""
+    owner = ctx['users'][0]
+    groups = StudyGroup.objects.bulk_create(
+        [StudyGroup(name=f"Disposable {ctx['run']} {i}", description='Benchmark', creator=owner) for i in range(n)],
+        batch_size=1000
+    )
+    others = ctx['users'][1:]
+    ctx['targets'] = [(others[i % len(others)], group.id) for i, group in enumerate(groups)]
+    if with_members:
+        StudyGroup.members.through.objects.bulk_create(
+            [StudyGroup.members.through(studygroup_id=group_id, user_id=user.id) for user, group_id in ctx['targets']],
+            batch_size=1000
+        )
+        StudyGroup.objects.filter(pk__in=[group.pk for group in groups]).recount_members()
+
+
+def prepare_owned_groups(ctx, n):
+    users = ctx['users']
+    groups = StudyGroup.objects.bulk_create(
+        [StudyGroup(name=f"Disposable {ctx['run']} {i}", description='Benchmark', creator=users[i % len(users)]) for i in range(n)],
+        batch_size=1000
+    )
+    ctx['targets'] = [(users[i % len(users)], group.id) for i, group in enumerate(groups)]
+
+
+def target(ctx, i):
+    user, object_id = ctx['targets'][i]
+    return user, [object_id], None
+
+
+def batch_of_reads(ctx, i):
+    """The reads a client screen makes on load, as one batch."""
+    user = acting_user(ctx, i)
+    paths = [
+        reverse('user_detail', args=[user.id]),
+        reverse('group_list_create'),
+        reverse('group_detail', args=[any_group(ctx, i)]),
+        reverse('flashcard_list_create'),
+    ]
+    return user, [], {'requests': [{'path': path} for path in paths]}
+
+
+ENDPOINTS = [
+    Endpoint('register', 'register', 'post', auth=False, build=lambda ctx, i: (None, [], {
+        'username': f"reg{ctx['run']}{i}", 'email': f"reg{ctx['run']}{i}@example.com", 'password': 'benchmark'
+    })),
+    Endpoint('login', 'login', 'post', auth=False, build=lambda ctx, i: (None, [], {
+        'username': acting_user(ctx, i).username, 'password': 'benchmark'
+    })),
+    Endpoint('user_detail', 'user_detail', build=lambda ctx, i: (acting_user(ctx, i), [ctx['users'][(i + 1) % len(ctx['users'])].id], None)),
+    Endpoint('user_lookup', 'user_lookup', build=lambda ctx, i: (acting_user(ctx, i), [], None), query='ids=1,2,3,4,5,6,7,8,9,10'),
+    Endpoint('group_list', 'group_list_create'),
+    Endpoint('group_list_preview', 'group_list_create', query='members=preview'),
+    Endpoint('group_create', 'group_list_create', 'post', build=lambda ctx, i: (acting_user(ctx, i), [], {
+        'name': f"Created {ctx['run']} {i}", 'description': 'Benchmark'
+    })),
+    Endpoint('group_detail', 'group_detail', build=lambda ctx, i: (acting_user(ctx, i), [any_group(ctx, i)], None)),
+    Endpoint('group_update', 'group_detail', 'put', build=on_own_group(lambda i: {'description': f'Edited {i}'})),
+    Endpoint('group_delete', 'group_detail', 'delete', build=target, prepare=prepare_owned_groups),
+    Endpoint('group_members', 'group_members', build=lambda ctx, i: (acting_user(ctx, i), [any_group(ctx, i)], None)),
+    Endpoint('group_join', 'join_group', 'post', build=target, prepare=prepare_groups),
+    Endpoint('group_leave', 'leave_group', 'post', build=target, prepare=lambda ctx, n: prepare_groups(ctx, n, with_members=True)),
+    # Subscribe and receive the stream prelude; timeout=0 ends the stream right after it
+    Endpoint('group_events', 'group_events', build=lambda ctx, i: (acting_user(ctx, i), [any_group(ctx, i)], None), query='timeout=0',
+             asgi_only=True),
+    Endpoint('flashcard_list', 'flashcard_list_create'),
+    Endpoint('flashcard_list_cursor', 'flashcard_list_create', query='cursor='),
+    Endpoint('flashcard_create', 'flashcard_list_create', 'post', build=lambda ctx, i: (acting_user(ctx, i), [], {
+        'front': f'Created {i}', 'back': 'Answer', 'category': 'Benchmark'
+    })),
+    Endpoint('flashcard_update', 'flashcard_detail', 'put', build=on_own_flashcard(lambda i: {'back': f'Edited {i}'})),
+    Endpoint('flashcard_delete', 'flashcard_detail', 'delete', build=target, prepare=prepare_flashcards),
+    Endpoint('flashcard_bulk_import', 'flashcard_bulk_import', 'post', build=lambda ctx, i: (acting_user(ctx, i), [], [
+        {'front': f'Imported {i}.{j}', 'back': 'Answer', 'category': 'Benchmark'} for j in range(50)
+    ])),
+    Endpoint('flashcard_export', 'flashcard_export'),
+    Endpoint('flashcard_review', 'flashcard_review', 'post', build=on_own_flashcard(lambda i: {'grade': 4})),
+    Endpoint('flashcard_batch_review', 'flashcard_batch_review', 'post', build=lambda ctx, i: (acting_user(ctx, i), [], [
+        {'id': card_id, 'grade': 4} for card_id in ctx['flashcards'][acting_user(ctx, i).id][:20]
+    ])),
+    Endpoint('flashcard_due', 'flashcard_due'),
+    Endpoint('flashcard_sync', 'flashcard_sync', query='since=0&page_size=100'),
+    Endpoint('search_flashcards', 'search', query='q=question'),
+    Endpoint('search_groups', 'search', query='q=benchmark&type=groups'),
+    Endpoint('metrics', 'metrics', build=lambda ctx, i: (ctx['admin'], [], None)),
+    Endpoint('batch', 'batch', 'post', build=batch_of_reads),
+    Endpoint('async_group_list', 'async_group_list_create', query='members=preview'),
+    Endpoint('async_group_create', 'async_group_list_create', 'post', build=lambda ctx, i: (acting_user(ctx, i), [], {
+        'name': f"Async {ctx['run']} {i}", 'description': 'Benchmark'
+    })),
+    Endpoint('async_group_detail', 'async_group_detail', build=lambda ctx, i: (acting_user(ctx, i), [any_group(ctx, i)], None)),
+    Endpoint('async_flashcard_list', 'async_flashcard_list_create'),
+    Endpoint('async_flashcard_update', 'async_flashcard_detail', 'put', build=on_own_flashcard(lambda i: {'back': f'Edited {i}'})),
+    Endpoint('async_register', 'async_register', 'post', auth=False, build=lambda ctx, i: (None, [], {
+        'username': f"areg{ctx['run']}{i}", 'email': f"areg{ctx['run']}{i}@example.com", 'password': 'benchmark'
+    })),
+    Endpoint('async_login', 'async_login', 'post', auth=False, build=lambda ctx, i: (None, [], {
+        'username': acting_user(ctx, i).username, 'password': 'benchmark'
+    })),
+]
+
+
+def suite_context(dataset):
+    """Lookup tables the endpoint builders share, derived from a seed() dataset."""
+    users = dataset['users']
+    flashcards = {}
+    for user_id, card_id in Flashcard.objects.filter(user__in=users).order_by('id').values_list('user_id', 'id'):
+        flashcards.setdefault(user_id, []).append(card_id)
+    # The first user doubles as the admin for admin-only routes
+    User.objects.filter(pk=users[0].pk).update(is_staff=True)
+    owned_groups = {}
+    for group in dataset['groups']:
+        owned_groups.setdefault(group.creator_id, []).append(group.id)
+    return {
+        'run': uuid.uuid4().hex[:8],
+        'users': users,
+        'users_by_id': {user.id: user for user in users},
+        'admin': users[0],
+        'tokens': dataset['tokens'],
+        'groups': dataset['groups'],
+        'flashcards': flashcards,
+        'owned_groups': owned_groups,
+    }
+
+
+def run_suite(ctx, endpoints, transport='client', requests=200, concurrency=10, warmup=10, profile=10):
+    """
+    Benchmark each endpoint in turn. Every endpoint first gets `profile` requests through a
+    sync test Client with a query counter attached, then `warmup` unmeasured requests and
+    `requests` measured ones over the chosen transport: 'client' (sequential test Client),
+    'asgi' (AsyncClient, `concurrency` in flight) or 'wsgi' (threaded HTTP against a live server).
+    asgi_only endpoints (event streams) get every phase through an AsyncClient instead.
+    """
+    results = {}
+    client = Client()
+    with live_server() if transport == 'wsgi' else nullcontext() as base_url:
+        for endpoint in endpoints:
+            total = profile + warmup + requests
+            if endpoint.prepare:
+                endpoint.prepare(ctx, total)
+            batch = [endpoint.request(ctx, i) for i in range(total)]
+            profiled, warm, measured = batch[:profile], batch[profile:profile + warmup], batch[profile + warmup:]
+            if endpoint.asgi_only:
+                # async_to_sync keeps the async ORM's queries on this thread, in count_queries' sight
+                with count_queries() as counts:
+                    async_to_sync(drive_async)(AsyncClient(), profiled, 1)
+                summary = async_to_sync(_drive_async_twice)(warm, measured, concurrency)
+            else:
+                with count_queries() as counts:
+                    drive_sync(client, profiled)
+                if transport == 'client':
+                    drive_sync(client, warm)
+                    summary = drive_sync(client, measured)
+                elif transport == 'asgi':
+                    summary = asyncio.run(_drive_async_twice(warm, measured, concurrency))
+                else:
+                    drive_http(base_url, warm, concurrency)
+                    summary = drive_http(base_url, measured, concurrency)
+            summary['queries_per_request'] = round(counts['queries'] / profile, 2) if profile else None
+            results[endpoint.label] = {'method': endpoint.method.upper(), 'route': endpoint.url_name, **summary}
+    return results
+
+
+async def _drive_async_twice(warm, measured, concurrency):
+    client = AsyncClient()
+    await drive_async(client, warm, concurrency)
+    return await drive_async(client, measured, concurrency)
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from itertools import islice
+from rest_framework import serializers
+from .serializers import FlashcardSerializer
+
+EXPORT_FIELDS = ['id', 'front', 'back', 'category', 'created_at']
+IMPORT_FIELDS = ['front', 'back', 'category']
+
+
+class BulkImportError(Exception):
+    """The upload could not be read as a list of flashcard rows."""
+
+
+def read_rows(request):
+    """Return the uploaded rows: a JSON array body, or a CSV file sent as multipart field 'file'."""
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            reader = csv.DictReader(text)
+            if not reader.fieldnames or not {'front', 'back'} <= set(reader.fieldnames):
+                raise BulkImportError("CSV header must include 'front' and 'back' columns")
+            return [{field: row.get(field) for field in IMPORT_FIELDS if row.get(field) is not None} for row in reader]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise BulkImportError(f"Could not read CSV: {exc}")
+    rows = request.data
+    if not isinstance(rows, list):
+        raise BulkImportError("Expected a JSON array of flashcards or a CSV file upload")
+    return rows
+
+
+def validate_rows(rows, chunk_size):
+    """Validate rows chunk by chunk; returns (validated_data, errors) with errors keyed by row index."""
+    validated, errors = [], []
+    iterator = iter(enumerate(rows))
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        serializer = FlashcardSerializer(data=[row for _, row in chunk], many=True)
+        if serializer.is_valid():
+            validated.extend(serializer.validated_data)
+            continue
+        for (index, _), row_errors in zip(chunk, serializer.errors):
+            if row_errors:
+                errors.append({'row': index, 'errors': row_errors})
+    return validated, errors
+
+
+class _Echo:
+    """File-like object whose write() hands the value back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(queryset, chunk_size):
+    created_at = serializers.DateTimeField()
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        yield row[:-1] + (created_at.to_representation(row[-1]),)
+
+
+def _batched(parts, size):
+    # Join small writes so the server sends a few large chunks instead of one per row
+    while True:
+        batch = ''.join(islice(parts, size))
+        if not batch:
+            return
+        yield batch
+
+
+def stream_json(queryset, chunk_size):
+    def parts():
+        yield '['
+        separator = ''
+        for row in _export_rows(queryset, chunk_size):
+            yield separator + json.dumps(dict(zip(EXPORT_FIELDS, row)))
+            separator = ','
+        yield ']'
+    return _batched(parts(), chunk_size)
+
+
+def stream_csv(queryset, chunk_size):
+    writer = csv.writer(_Echo())
+
+    def parts():
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in _export_rows(queryset, chunk_size):
+            yield writer.writerow(row)
+    return _batched(parts(), chunk_size)
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import uuid
+from functools import partial
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .fieldsets import FULL
+from .models import StudyGroup
+
+# Bump whenever StudyGroupSerializer output changes so stale representations are never served
+REPRESENTATION_VERSION = 1
+
+# Only these query parameters may vary a cached group response; anything else bypasses the cache
+CACHEABLE_PARAMS = {'page', 'members', 'fields', 'expand'}
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation(key):
+    """
+    Current generation token for an invalidation scope. Invalidating deletes the token;
+    the replacement is a fresh uuid, so entries written under the old one are never hit again.
+    """
+    cache = get_cache()
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def _variant(request, mode, fieldset):
+    return f"{request.get_host()}:{mode}:{fieldset.cache_key()}"
+
+
+def group_detail_key(request, group_id, mode, fieldset=FULL):
+    if set(request.GET) - CACHEABLE_PARAMS:
+        return None
+    generation = _generation(f"groups:detail:{group_id}:gen")
+    return f"groups:v{REPRESENTATION_VERSION}:detail:{group_id}:{generation}:{_variant(request, mode, fieldset)}"
+
+
+def group_list_key(request, mode, fieldset=FULL):
+    if set(request.GET) - CACHEABLE_PARAMS:
+        return None
+    page = request.GET.get('page', '1')
+    if not page.isdigit():
+        return None
+    list_generation = _generation('groups:list:gen')
+    page_generation = _generation(f"groups:list:page:{int(page)}:gen")
+    return f"groups:v{REPRESENTATION_VERSION}:list:{int(page)}:{list_generation}:{page_generation}:{_variant(request, mode, fieldset)}"
+
+
+def get_cached(key):
+    """Return (data, etag) for a cached representation, or None."""
+    if key is None:
+        return None
+    return get_cache().get(key)
+
+
+def set_cached(key, data):
+    """Store a representation and return its ETag."""
+    body = json.dumps(data, sort_keys=True, default=str)
+    etag = '"%s"' % hashlib.md5(f"{REPRESENTATION_VERSION}:{body}".encode()).hexdigest()
+    if key is not None:
+        get_cache().set(key, (data, etag), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+    return etag
+
+
+def not_modified(request, etag):
+    """Whether the client's If-None-Match already names this representation."""
+    if_none_match = request.headers.get('If-None-Match', '')
+    return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+
+
+def etag_response(request, data, etag):
+    """200 with an ETag, or an empty 304 when the client already holds this representation."""
+    if not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    return response
+
+
+def invalidate_group(group_id):
+    """An existing group changed in place: drop its detail and the one list page that shows it, once the change commits."""
+    transaction.on_commit(partial(_drop_group, group_id))
+
+
+def invalidate_group_list(*group_ids):
+    """Groups were added or removed: every page's count and links change. Takes effect when the change commits."""
+    transaction.on_commit(partial(_drop_group_list, group_ids))
+
+
+# Deferred to commit (at once in autocommit): a generation dropped earlier could be replaced by a
+# reader before the commit, and the old rows cached under the new one until RESPONSE_CACHE_TIMEOUT
+
+def _drop_group(group_id):
+    position = StudyGroup.objects.filter(id__lt=group_id).count()
+    page = position // api_settings.PAGE_SIZE + 1
+    get_cache().delete_many([f"groups:detail:{group_id}:gen", f"groups:list:page:{page}:gen"])
+
+
+def _drop_group_list(group_ids):
+    keys = ['groups:list:gen'] + [f"groups:detail:{group_id}:gen" for group_id in group_ids]
+    get_cache().delete_many(keys)
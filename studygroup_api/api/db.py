@@ -0,0 +1,48 @@
+"""
+Connection-level tuning for SQLite, applied by a connection_created receiver.
+
+WAL lets readers proceed while a writer commits, synchronous=NORMAL is durable across
+application crashes in WAL mode (only an OS crash can lose the last commits), mmap and a
+larger page cache keep the hot part of the database out of read() calls, and
+busy_timeout makes a writer wait for the lock instead of failing with "database is locked".
+"""
+from django.conf import settings
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative: KiB, i.e. 64 MiB per connection
+    'busy_timeout': 5000,  # ms
+    'temp_store': 'MEMORY',
+}
+
+# Meaningless (or refused) for in-memory databases such as the test database
+FILE_ONLY_PRAGMAS = {'journal_mode', 'mmap_size'}
+
+
+def get_sqlite_pragmas():
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    return DEFAULT_SQLITE_PRAGMAS if pragmas is None else pragmas
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    in_memory = connection.is_in_memory_db()
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas().items():
+            if in_memory and name in FILE_ONLY_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def sqlite_pragma_values(connection):
+    """Current values of the tuned pragmas on a connection, for checks and benchmarks."""
+    with connection.cursor() as cursor:
+        values = {}
+        for name in DEFAULT_SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()  # mmap_size returns no row for in-memory databases
+            values[name] = row[0] if row else None
+        return values
@@ -0,0 +1,233 @@
+"""
+Study group activity pushed to subscribers as server-sent events.
+
+Views publish an event (a member joined or left, the group was edited or deleted) once
+their transaction commits. The broker encodes it into an SSE frame once and hands it to
+every subscription on the group's channel in this process; the stream view writes the
+frames to its connection. Publishing goes through a backend: LocalBackend delivers in
+this process only, RedisBackend relays through Redis pub/sub so subscribers connected to
+any worker or host receive it.
+
+Each subscription buffers at most MAX_PENDING frames. A consumer that falls further
+behind is not buffered for: its stream ends with an `overflow` event, and the client
+refetches the group and reconnects. Memory per connection stays bounded whatever the
+publish rate.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from functools import partial
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger('api')
+
+DEFAULT_API_EVENTS = {
+    'BACKEND': 'api.events.LocalBackend',
+    'OPTIONS': {},  # keyword arguments for the backend, e.g. {'url': 'redis://...'}
+    'MAX_PENDING': 100,  # frames buffered per subscription before it is dropped
+    'HEARTBEAT_SECONDS': 15,  # comment line sent when idle, so proxies keep the connection open
+    'MAX_SECONDS': 300,  # streams end after this long; EventSource reconnects by itself
+    'RETRY_MS': 3000,  # reconnection delay suggested to clients
+}
+
+MEMBER_JOINED, MEMBER_LEFT, GROUP_UPDATED, GROUP_DELETED = 'member_joined', 'member_left', 'updated', 'deleted'
+KEEPALIVE = b': keepalive\n\n'
+
+
+def get_config():
+    return {**DEFAULT_API_EVENTS, **getattr(settings, 'API_EVENTS', {})}
+
+
+def group_channel(group_id):
+    return f'group:{group_id}'
+
+
+def encode_event(event, data):
+    """One SSE frame. The JSON is compact and single-line, so it fits one data: field."""
+    payload = json.dumps(data, cls=JSONEncoder, separators=(',', ':'))
+    return f'event: {event}\ndata: {payload}\n\n'.encode()
+
+
+class Overflowed(Exception):
+    """The subscriber fell more than MAX_PENDING frames behind; the frames were discarded."""
+
+
+class Subscription:
+    """
+    Frames for one connection. put() may be called from any thread; the consumer waits
+    with aget() on the event loop, or get() from a thread.
+    """
+
+    def __init__(self, channel, max_pending):
+        self.channel = channel
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._frames = deque()
+        self._condition = threading.Condition()
+        self._waiter = None  # (loop, asyncio.Event) while aget() waits
+
+    def put(self, frame):
+        with self._condition:
+            if self.overflowed:
+                return
+            if len(self._frames) >= self.max_pending:
+                self.overflowed = True
+                self._frames.clear()
+            else:
+                self._frames.append(frame)
+            self._condition.notify()
+            waiter = self._waiter
+        if waiter is not None:
+            loop, ready = waiter
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:  # the loop has closed; the stream is gone
+                pass
+
+    def _take(self):
+        if self.overflowed:
+            raise Overflowed()
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+    def get(self, timeout):
+        """Frames waiting, or [] after timeout seconds without any."""
+        with self._condition:
+            if not self._frames and not self.overflowed:
+                self._condition.wait(timeout)
+            return self._take()
+
+    async def aget(self, timeout):
+        with self._condition:
+            if self._frames or self.overflowed:
+                return self._take()
+            ready = asyncio.Event()
+            self._waiter = (asyncio.get_running_loop(), ready)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._condition:
+            self._waiter = None
+            return self._take()
+
+
+class LocalBackend:
+    """Single process: publishing is delivering."""
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, channel, frame):
+        self.deliver(channel, frame)
+
+    def close(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Publishes to Redis and delivers what any process published, from a listener thread.
+    Requires redis-py (`pip install redis`).
+    """
+
+    def __init__(self, deliver, url='redis://localhost:6379/0', prefix='studygroup:events:'):
+        import redis
+
+        self.deliver = deliver
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.psubscribe(**{f'{prefix}*': self.on_message})
+        self.listener = self.pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def on_message(self, message):
+        self.deliver(message['channel'].decode()[len(self.prefix):], message['data'])
+
+    def publish(self, channel, frame):
+        self.client.publish(self.prefix + channel, frame)
+
+    def close(self):
+        self.listener.stop()
+        self.pubsub.close()
+
+
+class Broker:
+    def __init__(self, backend_path, options, max_pending):
+        self.max_pending = max_pending
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self.backend = import_string(backend_path)(self.deliver, **options)
+
+    @classmethod
+    def from_settings(cls):
+        config = get_config()
+        return cls(config['BACKEND'], config['OPTIONS'], config['MAX_PENDING'])
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.max_pending)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+    def publish(self, channel, event, data):
+        self.backend.publish(channel, encode_event(event, data))
+
+    def deliver(self, channel, frame):
+        """Called by the backend for every frame published on a channel, from any process."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(frame)
+
+    def close(self):
+        self.backend.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = Broker.from_settings()
+    return _broker
+
+
+def reset_broker():
+    global _broker
+    if _broker is not None:
+        _broker.close()
+    _broker = None
+
+
+def publish_group_event(group_id, event, data):
+    """Publish once the current transaction commits (at once in autocommit), so subscribers never see a rolled-back change."""
+    transaction.on_commit(partial(get_broker().publish, group_channel(group_id), event, data))
+
+
+async def apublish_group_event(group_id, event, data):
+    # For async views, which write in autocommit: publish now, off the event loop (the backend may do network I/O)
+    await sync_to_async(get_broker().publish, thread_sensitive=False)(group_channel(group_id), event, data)
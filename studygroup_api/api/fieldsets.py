@@ -0,0 +1,118 @@
+"""
+Sparse fieldsets for the read endpoints: ?fields= and ?expand=.
+
+Without ?fields= every representation is unchanged. With it, only the named top-level
+fields are returned and nested objects (a group's creator and members) collapse to their
+primary keys unless they are also named in ?expand=. The view narrows its query to match
+with trim_queryset(), so columns that are not rendered are never read.
+"""
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+class FieldsetError(ValueError):
+    """?fields= or ?expand= names something the representation does not have."""
+
+
+class Fieldset:
+    def __init__(self, fields=None, expand=()):
+        self.fields = None if fields is None else frozenset(fields)  # None: the full representation
+        self.expand = frozenset(expand)
+
+    @property
+    def sparse(self):
+        return self.fields is not None
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def context(self):
+        """Serializer context consumed by api.serializers.SparseFieldsMixin."""
+        return {'fields': self.fields, 'expand': self.expand}
+
+    def cache_key(self):
+        if self.fields is None:
+            return 'all'
+        return f"{','.join(sorted(self.fields))}|{','.join(sorted(self.expand & self.fields))}"
+
+
+FULL = Fieldset()
+
+
+@lru_cache(maxsize=None)
+def describe(serializer_class):
+    """Field name -> (source, nested serializer or None) for the full representation."""
+    return {
+        name: (field.source, field if isinstance(field, serializers.BaseSerializer) else None)
+        for name, field in serializer_class().fields.items()
+    }
+
+
+def expandable(serializer_class):
+    return [name for name, (_, nested) in describe(serializer_class).items() if nested is not None]
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse_fieldset(params, serializer_class):
+    """Read ?fields= and ?expand= against serializer_class. Expanding a relation also selects it."""
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return FULL
+    available = describe(serializer_class)
+    expand = _split(params.get(EXPAND_PARAM, ''))
+    unknown = [name for name in expand if name not in expandable(serializer_class)]
+    if unknown:
+        raise FieldsetError(f"Cannot expand {', '.join(unknown)}; expandable fields: {', '.join(expandable(serializer_class))}")
+    if FIELDS_PARAM not in params:
+        return Fieldset(expand=expand)  # relations are embedded already, so this only validates
+    fields = _split(params[FIELDS_PARAM])
+    if not fields:
+        raise FieldsetError("fields must name at least one field")
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise FieldsetError(f"Unknown fields {', '.join(unknown)}; available fields: {', '.join(available)}")
+    return Fieldset(fields + expand, expand)
+
+
+def _column(model, source):
+    try:
+        field = model._meta.get_field(source.split('.')[0])
+    except FieldDoesNotExist:
+        return None  # a property, prefetch attribute or method
+    return field if field.concrete and not field.many_to_many else None
+
+
+def trim_queryset(queryset, serializer_class, fieldset):
+    """
+    .only() the columns behind the selected fields, plus the primary key and the model's
+    ordering (cursor pagination reads it from the last row). Selected foreign keys that
+    stay collapsed need only their id column; expanded ones are joined with just the
+    columns their nested serializer renders.
+    """
+    if not fieldset.sparse:
+        return queryset
+    model = queryset.model
+    columns = {model._meta.pk.name, *(name.lstrip('-') for name in model._meta.ordering)}
+    joins = []
+    for name, (source, nested) in describe(serializer_class).items():
+        field = _column(model, source) if fieldset.includes(name) else None
+        if field is None:
+            continue
+        columns.add(field.name)
+        if field.is_relation and nested is not None and name in fieldset.expand:
+            joins.append(field.name)
+            related = nested.Meta.model
+            columns.update(
+                f"{field.name}__{column.name}" for child_source, _ in describe(type(nested)).values()
+                if (column := _column(related, child_source)) is not None
+            )
+    queryset = queryset.select_related(None)
+    if joins:  # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*joins)
+    return queryset.only(*columns)
@@ -0,0 +1,180 @@
+"""
+Password hashing off the request thread.
+
+A password hash costs on the order of 100 ms of CPU, by design. Registration and login
+hand it to a small process pool instead, so hashing never occupies more than
+POOL_WORKERS cores and the request threads serving everything else keep their CPU. The
+pool is bounded: once MAX_PENDING hashes are running or queued, further sign-ins fail
+fast with HashingBusy (the views answer 503) instead of piling up behind them.
+
+Hashers are resolved here, in the configured process, and sent to the workers together
+with their parameters, so the workers never need Django settings. For the same reason this
+module must stay importable without the app registry (no model imports).
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import get_random_string
+
+DEFAULT_PASSWORD_HASHING = {
+    'ITERATIONS': None,  # PBKDF2 iterations for new hashes; None keeps Django's default
+    'POOL_WORKERS': 2,  # processes hashing in parallel; 0 hashes on the calling thread
+    'MAX_PENDING': 32,  # hashes running or queued before sign-ins are refused
+}
+
+
+def get_config():
+    return {**DEFAULT_PASSWORD_HASHING, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 with the iteration count from PASSWORD_HASHING['ITERATIONS'].
+    Stored hashes with a different count are rehashed at the next successful login.
+    """
+
+    def __init__(self):
+        # An instance attribute, so it travels with the pickled hasher to the pool workers
+        self.iterations = get_config()['ITERATIONS'] or hashers.PBKDF2PasswordHasher.iterations
+
+
+class HashingBusy(Exception):
+    """MAX_PENDING hashes are already in flight."""
+
+
+# Run in the pool workers
+
+def _encode(hasher, password, salt):
+    return hasher.encode(password, salt)
+
+
+def _verify(hasher, password, encoded, harden, upgrade):
+    """
+    (is_correct, new encoded hash or None). upgrade is (preferred hasher, salt) when the
+    stored hash is outdated; harden pads a failed check to the preferred work factor.
+    """
+    if not hasher.verify(password, encoded):
+        if harden:
+            hasher.harden_runtime(password, encoded)
+        return False, None
+    if upgrade is None:
+        return True, None
+    preferred, salt = upgrade
+    return True, preferred.encode(password, salt)
+
+
+class HashingPool:
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        """A concurrent.futures.Future of fn(*args); raises HashingBusy when every slot is taken."""
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self.executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        if not self.workers:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers inherit no threads, locks or database connections from this process
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        config = get_config()
+        _pool = HashingPool(config['POOL_WORKERS'], config['MAX_PENDING'])
+    return _pool
+
+
+def reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = None
+
+
+def _encode_args(password):
+    hasher = hashers.get_hasher()
+    return hasher, password, hasher.salt()
+
+
+def make_password(password):
+    """django.contrib.auth.hashers.make_password(), computed in the pool."""
+    return get_pool().run(_encode, *_encode_args(password))
+
+
+async def amake_password(password):
+    return await get_pool().arun(_encode, *_encode_args(password))
+
+
+def _verify_args(password, encoded):
+    """The decisions of Django's verify_password(), or None when there is no usable hash to check."""
+    if password is None or not hashers.is_password_usable(encoded):
+        return None
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:  # gibberish, or a hasher that is no longer installed
+        return None
+    preferred = hashers.get_hasher()
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    return hasher, password, encoded, must_update and not hasher_changed, (preferred, preferred.salt()) if must_update else None
+
+
+def check_password(user, password):
+    """user.check_password() computed in the pool; an upgraded hash is saved like Django's setter does."""
+    args = _verify_args(password, user.password)
+    if args is None:
+        make_password(get_random_string(12))  # as long as a real check
+        return False
+    is_correct, upgraded = get_pool().run(_verify, *args)
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return is_correct
+
+
+async def acheck_password(user, password):
+    args = _verify_args(password, user.password)
+    if args is None:
+        await amake_password(get_random_string(12))
+        return False
+    is_correct, upgraded = await get_pool().arun(_verify, *args)
+    if upgraded:
+        user.password = upgraded
+        await user.asave(update_fields=['password'])
+    return is_correct
@@ -0,0 +1,175 @@
+"""
+Logging pieces wired up in settings.LOGGING.
+
+Request threads only enqueue records: QueueListenerHandler hands them to a background
+thread, which drains the queue in batches and passes each batch to the real handlers.
+BatchedRotatingFileHandler writes a whole batch with one write() and one flush().
+SamplingFilter thins out high-volume INFO events before they are even enqueued.
+"""
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, plus any dict passed as extra={'data': ...}."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data = getattr(record, 'data', None)
+        if isinstance(data, dict):
+            entry.update(data)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that also accepts a batch of records and writes them in one go."""
+
+    def handle_batch(self, records):
+        records = [record for record in records if record.levelno >= self.level and self.filter(record)]
+        if not records:
+            return
+        with self.lock:
+            try:
+                lines = [self.format(record) + self.terminator for record in records]
+                if self.stream is None:
+                    self.stream = self._open()
+                # Rotate once per batch rather than per record; a batch may overshoot maxBytes slightly
+                if self.maxBytes > 0 and self.stream.tell() + sum(map(len, lines)) >= self.maxBytes and self.stream.tell():
+                    self.doRollover()
+                self.stream.write(''.join(lines))
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[0])
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to batch_size waiting records per wake-up."""
+
+    def __init__(self, queue, *handlers, batch_size=256):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._sentinel in batch
+            self.handle_batch([record for record in batch if record is not self._sentinel])
+            for _ in batch:
+                q.task_done()
+            if stop:
+                return
+
+    def handle_batch(self, records):
+        if not records:
+            return
+        for handler in self.handlers:
+            if hasattr(handler, 'handle_batch'):
+                handler.handle_batch(records)
+                continue
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+
+class QueueListenerHandler(logging.Handler):
+    """
+    Enqueues records for a BatchingQueueListener feeding `handlers`, given in LOGGING as
+    'cfg://handlers.<name>' (those handlers must sort before this one's name). The queue
+    is bounded: when it is full, records are dropped instead of blocking the request.
+    Not a QueueHandler subclass: nothing is pickled, so records are formatted by the
+    listener thread, not the request thread.
+    """
+
+    def __init__(self, handlers, queue_size=10000, batch_size=256, level=logging.NOTSET):
+        # dictConfig resolves cfg:// references on item access, not on iteration
+        targets = [handlers[index] for index in range(len(handlers))]
+        for handler in targets:
+            if not isinstance(handler, logging.Handler):
+                raise ValueError(f"{handler!r} is not a configured handler; reference it as 'cfg://handlers.<name>'")
+        super().__init__(level)
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.listener = BatchingQueueListener(self.queue, *targets, batch_size=batch_size)
+        # logging.shutdown() closes this handler at exit, which drains the queue
+        self.listener.start()
+
+    def handle(self, record):
+        # queue.Queue is already thread-safe; skip Handler's per-record lock
+        passed = self.filter(record)
+        if passed:
+            self.emit(record)
+        return passed
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until everything enqueued so far has been handed to the target handlers."""
+        self.queue.join()
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes only a fraction of INFO-and-below records, per logger. `rates` maps logger names
+    to a fraction in [0, 1] and applies to their children too (the longest match wins).
+    Sampling is counted per message template, so every distinct event is logged the first
+    time and then once every 1/rate occurrences. WARNING and above always pass.
+    """
+
+    max_keys = 10000
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = {name: float(rate) for name, rate in (rates or {}).items()}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def rate_for(self, name):
+        while True:
+            if name in self.rates:
+                return self.rates[name]
+            if '.' not in name:
+                return self.rates.get('', 1.0)
+            name = name.rsplit('.', 1)[0]
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        key = (record.name, record.msg)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                if len(self._counters) >= self.max_keys:  # templates built with f-strings would never repeat
+                    self._counters.clear()
+                counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % round(1 / rate) == 0
@@ -0,0 +1,116 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from api import urls
+from api.benchmarks import ENDPOINTS, benchmark_environment, run_suite, seed, suite_context
+
+# Password hashing dominates these, so they get their own (smaller) request count
+AUTH_ENDPOINTS = {'register', 'login'}
+COMPARED_METRICS = ('rps', 'p50_ms', 'p99_ms', 'queries_per_request')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Relative change of each metric against a previous report, in percent."""
+    deltas = {}
+    for label, result in results.items():
+        previous = baseline.get('results', {}).get(label)
+        if not previous:
+            continue
+        deltas[label] = {
+            metric: round((result[metric] - previous[metric]) / previous[metric] * 100, 1)
+            for metric in COMPARED_METRICS if result.get(metric) is not None and previous.get(metric)
+        }
+    return deltas
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with bulk_create and drive every route in api/urls.py, "
+        "reporting throughput, latency percentiles and queries per request for each endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--members', type=int, default=20, help='Members per group')
+        parser.add_argument('--flashcards', type=int, default=200, help='Flashcards per user')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+        parser.add_argument('--auth-requests', type=int, default=20, help='Measured requests for register and login')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once (asgi and wsgi transports)')
+        parser.add_argument(
+            '--transport', choices=['client', 'asgi', 'wsgi'], default='client',
+            help='client: sequential test Client; asgi: AsyncClient through the ASGI handler; wsgi: HTTP against a threaded local server'
+        )
+        parser.add_argument('--only', help='Comma-separated endpoint labels to run')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--compare', help='Previous report to compute per-endpoint changes against')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['groups'] < options['users']:
+            raise CommandError('Need at least 2 users and at least as many groups as users (every user must own a group)')
+        endpoints = ENDPOINTS
+        if options['only']:
+            labels = set(options['only'].split(','))
+            unknown = labels - {endpoint.label for endpoint in ENDPOINTS}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.label in labels]
+        uncovered = {pattern.name for pattern in urls.urlpatterns} - {endpoint.url_name for endpoint in ENDPOINTS}
+        if uncovered:
+            self.stderr.write(f"Routes without a benchmark: {', '.join(sorted(uncovered))}")
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+            if baseline.get('meta', {}).get('options', {}).get('transport') != options['transport']:
+                self.stderr.write('Baseline was recorded with a different transport; changes are not comparable')
+
+        with benchmark_environment(file_databases=options['transport'] == 'wsgi'):
+            dataset = seed(
+                users=options['users'], groups=options['groups'],
+                members_per_group=options['members'], flashcards_per_user=options['flashcards']
+            )
+            ctx = suite_context(dataset)
+            results = {}
+            for endpoint in endpoints:
+                count = options['auth_requests'] if endpoint.label in AUTH_ENDPOINTS else options['requests']
+                results.update(run_suite(ctx, [endpoint], options['transport'], count, options['concurrency']))
+            vendor = connection.vendor
+
+        report = {
+            'meta': {
+                'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': vendor,
+                'options': {key: options[key] for key in (
+                    'users', 'groups', 'members', 'flashcards', 'requests', 'auth_requests', 'concurrency', 'transport'
+                )},
+            },
+            'results': results,
+        }
+        if baseline is not None:
+            report['compared_to'] = baseline.get('meta', {}).get('git_revision')
+            report['changes_pct'] = compare(results, baseline)
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stdout.write(f"Wrote {len(results)} endpoint results to {options['output']}")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from api.benchmarks import benchmark_environment, drive_async, seed
+
+# (label, sync path, async path); {group} is filled with a seeded group id
+ENDPOINTS = [
+    ('flashcard_list', '/api/flashcards/', '/api/async/flashcards/'),
+    ('group_list', '/api/groups/?members=preview', '/api/async/groups/?members=preview'),
+    ('group_detail', '/api/groups/{group}/?members=preview', '/api/async/groups/{group}/?members=preview'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the DRF (sync) and native async flashcard/group views under concurrent load "
+        "through the ASGI handler, on a throwaway test database. Prints requests/second and latency percentiles as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once')
+        parser.add_argument('--flashcards', type=int, default=200, help='Flashcards seeded per user')
+        parser.add_argument('--groups', type=int, default=50, help='Study groups seeded')
+
+    def handle(self, *args, **options):
+        with benchmark_environment(), override_settings(RESPONSE_CACHE_TIMEOUT=0):  # measure the views, not the response cache
+            dataset = seed(users=20, groups=options['groups'], members_per_group=20, flashcards_per_user=options['flashcards'])
+            report = asyncio.run(self.run(dataset, options))
+        self.stdout.write(json.dumps(report, indent=2))
+
+    async def run(self, dataset, options):
+        user = dataset['users'][0]
+        client = AsyncClient()
+        headers = {'Authorization': f"Token {dataset['tokens'][user.id]}"}
+        groups = dataset['groups']
+        report = {'options': {key: options[key] for key in ('requests', 'concurrency', 'flashcards', 'groups')}, 'results': {}}
+        for label, sync_path, async_path in ENDPOINTS:
+            for mode, path in (('sync', sync_path), ('async', async_path)):
+                requests = [
+                    ('get', path.format(group=groups[i % len(groups)].id), {'headers': headers})
+                    for i in range(options['requests'])
+                ]
+                await drive_async(client, requests[:options['concurrency']], options['concurrency'])  # warm-up
+                report['results'].setdefault(label, {})[mode] = await drive_async(client, requests, options['concurrency'])
+        return report
@@ -0,0 +1,56 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from api import hashing
+from api.benchmarks import ENDPOINTS, benchmark_environment, drive_wsgi, seed, suite_context, summarize
+
+READS = ('flashcard_list', 'flashcard_due')
+LOGIN = 'login'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed load of flashcard reads and logins from threaded in-process WSGI workers, hashing passwords on the "
+        "request threads and then in the worker pool. Prints read and login latency for both as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads')
+        parser.add_argument('--login-ratio', type=float, default=0.1, help='Fraction of requests that log in')
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASHING['POOL_WORKERS'], help='Hashing pool processes')
+        parser.add_argument('--iterations', type=int, default=None, help="PBKDF2 iterations (default: Django's)")
+
+    def handle(self, *args, **options):
+        endpoints = {endpoint.label: endpoint for endpoint in ENDPOINTS}
+        report = {'options': {key: options[key] for key in ('requests', 'concurrency', 'login_ratio', 'workers', 'iterations')}, 'results': {}}
+        base = {**settings.PASSWORD_HASHING, 'ITERATIONS': options['iterations'], 'MAX_PENDING': options['requests']}
+        with benchmark_environment(file_databases=True), override_settings(PASSWORD_HASHING={**base, 'POOL_WORKERS': 0}):
+            # Seeded with the same iteration count, so no login upgrades a hash mid-run
+            ctx = suite_context(seed(users=20, groups=10, members_per_group=10, flashcards_per_user=200))
+            requests, kinds = self.workload(ctx, endpoints, options)
+            for label, workers in (('inline', 0), ('pool', options['workers'])):
+                with override_settings(PASSWORD_HASHING={**base, 'POOL_WORKERS': workers}):
+                    hashing.make_password('warm-up')  # start the worker processes before measuring
+                    summary, outcomes = drive_wsgi(requests, options['concurrency'])
+                result = {'workers': workers, **summary}
+                for kind, labels in (('reads', READS), ('logins', (LOGIN,))):
+                    selected = [outcome for outcome, request_kind in zip(outcomes, kinds) if request_kind in labels]
+                    errors = sum(status >= 400 for _, status in selected)
+                    result[kind] = {key: value for key, value in summarize([latency for latency, _ in selected], summary['seconds'], errors).items()
+                                    if key in ('requests', 'errors', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')}
+                report['results'][label] = result
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def workload(self, ctx, endpoints, options):
+        """Every 1/login_ratio-th request logs in; the rest alternate between the read endpoints."""
+        total = options['requests']
+        every = max(1, round(1 / options['login_ratio'])) if options['login_ratio'] else total + 1
+        kinds = [LOGIN if i % every == every - 1 else READS[i % len(READS)] for i in range(total)]
+        counters = {}
+        requests = []
+        for kind in kinds:
+            index = counters[kind] = counters.get(kind, -1) + 1
+            requests.append(endpoints[kind].request(ctx, index))
+        return requests, kinds
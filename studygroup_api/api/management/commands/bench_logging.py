@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from api.benchmarks import percentile
+from api.log import BatchedRotatingFileHandler, QueueListenerHandler, SamplingFilter
+
+FORMAT = '{levelname} {asctime} {module} {message}'
+
+
+class FakeUser:
+    username = 'benchmark-user'
+
+
+def sync_handlers(directory):
+    """The previous setup: every record is formatted and written (and flushed) on the calling thread."""
+    console = logging.StreamHandler(open(os.path.join(directory, 'console.log'), 'w'))
+    file = logging.FileHandler(os.path.join(directory, 'debug.log'))
+    for handler in (console, file):
+        handler.setFormatter(logging.Formatter(FORMAT, style='{'))
+    return [console, file]
+
+
+def queued_handlers(directory, sample_rate=None):
+    console = logging.StreamHandler(open(os.path.join(directory, 'console.log'), 'w'))
+    file = BatchedRotatingFileHandler(os.path.join(directory, 'debug.log'), maxBytes=10 * 1024 * 1024, backupCount=2)
+    for handler in (console, file):
+        handler.setFormatter(logging.Formatter(FORMAT, style='{'))
+    queued = QueueListenerHandler([console, file], queue_size=1_000_000)
+    if sample_rate is not None:
+        queued.addFilter(SamplingFilter({'bench': sample_rate}))
+    return [queued]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the cost of logging the flashcard-list INFO line on the request thread: eager f-strings vs lazy "
+        "%-formatting, synchronous handlers vs the queued, batched pipeline, with and without sampling. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000, help='Log calls per thread')
+        parser.add_argument('--threads', type=int, default=4, help='Threads logging concurrently (like request workers)')
+
+    def handle(self, *args, **options):
+        scenarios = [
+            ('sync_fstring', 'fstring', sync_handlers, logging.INFO),
+            ('sync_lazy', 'lazy', sync_handlers, logging.INFO),
+            ('queued_lazy', 'lazy', queued_handlers, logging.INFO),
+            ('queued_lazy_sampled_10pct', 'lazy', lambda directory: queued_handlers(directory, 0.1), logging.INFO),
+            # INFO disabled: eager f-strings still pay for building the message, lazy calls do not
+            ('disabled_fstring', 'fstring', sync_handlers, logging.WARNING),
+            ('disabled_lazy', 'lazy', sync_handlers, logging.WARNING),
+        ]
+        report = {'options': {'events': options['events'], 'threads': options['threads']}, 'results': {}}
+        for label, style, make_handlers, level in scenarios:
+            report['results'][label] = self.run(style, make_handlers, level, options['events'], options['threads'])
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, style, make_handlers, level, events, threads):
+        with tempfile.TemporaryDirectory() as directory:
+            logger = logging.getLogger(f'bench.{style}.{time.monotonic_ns()}')
+            logger.propagate = False
+            logger.setLevel(level)
+            handlers = make_handlers(directory)
+            for handler in handlers:
+                logger.addHandler(handler)
+            user = FakeUser()
+            latencies = [[] for _ in range(threads)]
+
+            def work(samples):
+                for page in range(events):
+                    started = time.perf_counter()
+                    if style == 'fstring':
+                        logger.info(f"Listed flashcards for {user.username} (page {page})")
+                    else:
+                        logger.info("Listed flashcards for %s (page %s)", user.username, page)
+                    samples.append(time.perf_counter() - started)
+
+            workers = [threading.Thread(target=work, args=(samples,)) for samples in latencies]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            emitted = time.perf_counter() - started
+            for handler in handlers:
+                handler.flush()
+            drained = time.perf_counter() - started
+            for handler in handlers:
+                logger.removeHandler(handler)
+                handler.close()
+            samples = sorted(sample for samples in latencies for sample in samples)
+            return {
+                'calls': len(samples),
+                'calls_per_second': round(len(samples) / emitted, 1),
+                'mean_us': round(sum(samples) / len(samples) * 1e6, 2),
+                'p50_us': round(percentile(samples, 50) * 1e6, 2),
+                'p99_us': round(percentile(samples, 99) * 1e6, 2),
+                'max_us': round(samples[-1] * 1e6, 2),
+                # Time the logging threads spent, then time until every record reached disk
+                'seconds_logging': round(emitted, 4),
+                'seconds_until_written': round(drained, 4),
+            }
@@ -0,0 +1,74 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from api.benchmarks import benchmark_environment, percentile, seed
+from api.models import Flashcard
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import FlashcardSerializer, row_mapper
+
+
+def serialize_instances(queryset):
+    return FlashcardSerializer(queryset, many=True).data
+
+
+def map_rows(queryset):
+    mapper = row_mapper(FlashcardSerializer)
+    return mapper.map(mapper.values(queryset))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one flashcard list page through FlashcardSerializer and JSONRenderer (the previous path) "
+        "against .values() rows with RowMapper and FastJSONRenderer, for several page sizes, on a throwaway "
+        "database. Fetch+serialize and render are timed separately. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated page sizes')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per page size and path')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        paths = {
+            'serializer_json': (serialize_instances, JSONRenderer()),
+            'serializer_orjson': (serialize_instances, FastJSONRenderer()),
+            'values_json': (map_rows, JSONRenderer()),
+            'values_orjson': (map_rows, FastJSONRenderer()),
+        }
+        report = {'options': {'sizes': sizes, 'repeat': options['repeat'], 'orjson': orjson is not None}, 'results': {}}
+        with benchmark_environment():
+            user = seed(users=1, groups=0, members_per_group=0, flashcards_per_user=max(sizes))['users'][0]
+            for size in sizes:
+                queryset = Flashcard.objects.filter(user=user)[:size]
+                results = {label: self.run(queryset, *path, options['repeat']) for label, path in paths.items()}
+                bodies = {label: result.pop('body') for label, result in results.items()}
+                baseline = results['serializer_json']['total_ms']['p50']
+                for result in results.values():
+                    result['speedup'] = round(baseline / result['total_ms']['p50'], 2)
+                report['results'][size] = {
+                    'identical_output': len(set(bodies.values())) == 1,
+                    'paths': results,
+                }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, queryset, serialize, renderer, repeat):
+        serialize(queryset)  # warm up: query compilation, mapper and field caches
+        timings = {'serialize_ms': [], 'render_ms': [], 'total_ms': []}
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serialize(queryset)
+            serialized = time.perf_counter()
+            body = renderer.render(data)
+            rendered = time.perf_counter()
+            timings['serialize_ms'].append((serialized - started) * 1000)
+            timings['render_ms'].append((rendered - serialized) * 1000)
+            timings['total_ms'].append((rendered - started) * 1000)
+        result = {'body': body}
+        for phase, samples in timings.items():
+            samples.sort()
+            result[phase] = {'p50': round(percentile(samples, 50), 3), 'p90': round(percentile(samples, 90), 3)}
+        return result
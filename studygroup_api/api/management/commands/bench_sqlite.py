@@ -0,0 +1,67 @@
+import json
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+from api.benchmarks import ENDPOINTS, benchmark_environment, drive_wsgi, seed, suite_context, summarize
+from api.db import DEFAULT_SQLITE_PRAGMAS, sqlite_pragma_values
+
+# (label, CONN_MAX_AGE, OPTIONS, pragmas); run in this order because WAL persists in the file
+SCENARIOS = [
+    ('defaults', 0, {}, {}),
+    ('persistent_connections', 600, {}, {}),
+    ('tuned', 600, {'transaction_mode': 'IMMEDIATE'}, DEFAULT_SQLITE_PRAGMAS),
+]
+READS = ('flashcard_list', 'flashcard_due')
+WRITES = ('flashcard_create', 'group_join')
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed read/write load from threaded in-process WSGI workers against a file-backed SQLite test database, "
+        "comparing Django's defaults with persistent connections and with WAL + tuned pragmas. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8, help='Worker threads')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Fraction of requests that write')
+
+    def handle(self, *args, **options):
+        endpoints = {endpoint.label: endpoint for endpoint in ENDPOINTS}
+        report = {'options': {key: options[key] for key in ('requests', 'concurrency', 'write_ratio')}, 'results': {}}
+        with benchmark_environment(file_databases=True), override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            ctx = suite_context(seed(users=20, groups=20, members_per_group=10, flashcards_per_user=200))
+            database = connections.settings['default']
+            for label, max_age, db_options, pragmas in SCENARIOS:
+                database['CONN_MAX_AGE'] = max_age
+                database['OPTIONS'] = db_options
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    connection.close()
+                    if not pragmas:
+                        with connection.cursor() as cursor:
+                            cursor.execute('PRAGMA journal_mode = DELETE')
+                    requests, kinds = self.workload(ctx, endpoints, options)
+                    summary, outcomes = drive_wsgi(requests, options['concurrency'])
+                    result = {'pragmas': sqlite_pragma_values(connection), **summary}
+                    for kind, labels in (('reads', READS), ('writes', WRITES)):
+                        latencies = [latency for (latency, _), request_kind in zip(outcomes, kinds) if request_kind in labels]
+                        errors = sum(status >= 400 for (_, status), request_kind in zip(outcomes, kinds) if request_kind in labels)
+                        result[kind] = {key: value for key, value in summarize(latencies, summary['seconds'], errors).items()
+                                        if key in ('requests', 'errors', 'p50_ms', 'p99_ms', 'max_ms')}
+                    report['results'][label] = result
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def workload(self, ctx, endpoints, options):
+        """Interleave reads and writes; every write_ratio-th slot writes, alternating the write kinds."""
+        total = options['requests']
+        every = max(1, round(1 / options['write_ratio'])) if options['write_ratio'] else total + 1
+        kinds = []
+        for i in range(total):
+            kinds.append(WRITES[(i // every) % len(WRITES)] if i % every == every - 1 else READS[i % len(READS)])
+        endpoints['group_join'].prepare(ctx, kinds.count('group_join'))
+        counters = {}
+        requests = []
+        for kind in kinds:
+            index = counters[kind] = counters.get(kind, -1) + 1
+            requests.append(endpoints[kind].request(ctx, index))
+        return requests, kinds
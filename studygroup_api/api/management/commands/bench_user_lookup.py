@@ -0,0 +1,55 @@
+import json
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from api.benchmarks import benchmark_environment, drive_sync, seed
+from api.profiles import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve the members of a group the way a client renders them: one GET /api/users/{id}/ per member, "
+        "against one GET /api/users/?ids= for all of them, with the user cache cold and warm, on a throwaway "
+        "database. Prints the time per group and the speedup over the single calls as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=50, help='Users resolved per group')
+        parser.add_argument('--repeat', type=int, default=20, help='Groups resolved per variant')
+
+    def handle(self, *args, **options):
+        members, repeat = options['members'], options['repeat']
+        report = {'options': {'members': members, 'repeat': repeat}, 'results': {}}
+        with benchmark_environment():
+            dataset = seed(users=members, groups=0, members_per_group=0, flashcards_per_user=0)
+            ids = [user.id for user in dataset['users']][:min(members, get_config()['MAX_IDS'])]
+            client = Client(headers={'Authorization': f"Token {dataset['tokens'][ids[0]]}"})
+            singles = [('get', reverse('user_detail', args=[user_id]), {}) for user_id in ids]
+            lookup = [('get', reverse('user_lookup'), {'data': {'ids': ','.join(map(str, ids))}})]
+            drive_sync(client, singles[:1] + lookup)  # warm up: URL resolving, token cache
+            variants = {
+                'single_calls': (singles, False),
+                'lookup_cold': (lookup, True),
+                'lookup_warm': (lookup, False),
+            }
+            for label, (requests, cold) in variants.items():
+                totals, errors = [], 0
+                for _ in range(repeat):
+                    if cold:
+                        caches[get_config()['CACHE_ALIAS']].clear()
+                    summary = drive_sync(client, requests)
+                    totals.append(summary['seconds'] * 1000)
+                    errors += summary['errors']
+                totals.sort()
+                report['results'][label] = {
+                    'requests_per_group': len(requests),
+                    'errors': errors,
+                    'p50_ms': round(totals[len(totals) // 2], 3),
+                    'max_ms': round(totals[-1], 3),
+                }
+            baseline = report['results']['single_calls']['p50_ms']
+            for result in report['results'].values():
+                result['speedup'] = round(baseline / result['p50_ms'], 2)
+            report['options']['members'] = len(ids)
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,29 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from api.schema import SchemaDocument, artifact_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema and write it to API_SCHEMA['ARTIFACT_DIR'] as openapi-<version>.json "
+        "(and .yaml), for the workers to load at startup instead of introspecting every view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help="Directory to write to (default: API_SCHEMA['ARTIFACT_DIR'])")
+        parser.add_argument('--no-yaml', action='store_true', help='Write only the JSON artifact')
+
+    def handle(self, *args, **options):
+        path = artifact_path(options['output_dir'])
+        if path is None:
+            raise CommandError("Set API_SCHEMA['ARTIFACT_DIR'] or pass --output-dir")
+        document = SchemaDocument.build()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        outputs = [(path, 'json')] if options['no_yaml'] else [(path, 'json'), (path.with_suffix('.yaml'), 'yaml')]
+        for output, fmt in outputs:
+            # Written beside the target and renamed, so a worker starting meanwhile never reads half a file
+            partial = Path(f'{output}.tmp')
+            partial.write_bytes(document.encode(fmt))
+            partial.replace(output)
+            self.stdout.write(f"Wrote {output}")
+        self.stdout.write(f"URLconf fingerprint {document.fingerprint}")
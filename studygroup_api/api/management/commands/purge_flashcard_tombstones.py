@@ -0,0 +1,25 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from api.models import Flashcard, SyncCounter
+
+
+class Command(BaseCommand):
+    help = "Permanently remove flashcards deleted more than --days ago. Sync tokens older than a purge get 410 and must do a full sync."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep tombstones younger than this many days (default 30)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Flashcard.all_objects.filter(deleted_at__lt=cutoff)
+        purged = 0
+        for user_id, through in expired.values_list('user_id').annotate(through=Max('change_seq')).order_by('user_id'):
+            with transaction.atomic():
+                # Raise the floor first, so a client cannot sync past the purge and miss the deletions
+                counters = SyncCounter.objects.filter(pk=user_id, purged_through__lt=through)
+                counters.update(purged_through=through)
+                purged += expired.filter(user_id=user_id, change_seq__lte=through).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} flashcard tombstone(s) deleted before {cutoff:%Y-%m-%d}"))
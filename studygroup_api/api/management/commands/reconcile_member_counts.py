@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.models import StudyGroup
+
+
+class Command(BaseCommand):
+    help = "Recompute StudyGroup.member_count from the membership table, fixing any drift."
+
+    def handle(self, *args, **options):
+        fixed = StudyGroup.objects.recount_members()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled member counts: {fixed} group(s) corrected"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from api.benchmarks import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load benchmark users (password 'benchmark'), tokens, groups, memberships and flashcards "
+        "into the configured database, for load-testing a running server with external tools."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--members', type=int, default=20, help='Members per group')
+        parser.add_argument('--flashcards', type=int, default=200, help='Flashcards per user')
+
+    def handle(self, *args, **options):
+        dataset = seed(
+            users=options['users'], groups=options['groups'],
+            members_per_group=options['members'], flashcards_per_user=options['flashcards']
+        )
+        first = dataset['users'][0]
+        self.stdout.write(
+            f"Seeded {len(dataset['users'])} users, {len(dataset['groups'])} groups and "
+            f"{options['flashcards'] * len(dataset['users'])} flashcards. "
+            f"First user: {first.username}, token {dataset['tokens'][first.id]}"
+        )
@@ -0,0 +1,36 @@
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from api.routers import get_routing
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into each SQLite replica alias (SQLITE_REPLICAS) with SQLite's backup API, "
+        "standing in for replication when trying the read/write routing locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=None, help='Keep copying every INTERVAL seconds (simulated replication lag)')
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError("The primary is not SQLite; real replicas are kept up to date by the database server")
+        replicas = [alias for alias in get_routing().replicas if connections[alias].vendor == 'sqlite']
+        if not replicas:
+            raise CommandError("No SQLite replicas configured; set SQLITE_REPLICAS=N")
+        while True:
+            source.ensure_connection()
+            for alias in replicas:
+                connections[alias].close()  # so this process holds no read transaction on the file being replaced
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    source.connection.backup(target)
+                finally:
+                    target.close()
+            self.stdout.write(f"Copied {source.settings_dict['NAME']} to {', '.join(replicas)}")
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
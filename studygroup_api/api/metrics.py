@@ -0,0 +1,185 @@
+"""
+Per-request performance accounting for PerformanceMiddleware.
+
+The middleware opens a RequestMetrics for each request in a context variable. Database
+time is added by an execute_wrapper installed on every connection (connection_created),
+and serializer time by the timed serializers in api.serializers. Context variables follow
+a request into sync_to_async threads, so async views and the sync views they call are
+counted the same way. Aggregates are per process.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULT_PERFORMANCE_METRICS = {
+    'SERVER_TIMING': True,
+    'LATENCY_BUCKETS_MS': (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    'QUERY_BUCKETS': (0, 1, 2, 5, 10, 20, 50, 100),
+    'SIZE_BUCKETS': (256, 1024, 4096, 16384, 65536, 262144, 1048576),
+}
+
+_current = ContextVar('api_request_metrics', default=None)
+
+
+def get_config():
+    return {**DEFAULT_PERFORMANCE_METRICS, **getattr(settings, 'PERFORMANCE_METRICS', {})}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start_request():
+    """Begin accounting for a request; returns the token finish_request() needs."""
+    return _current.set(RequestMetrics())
+
+
+def finish_request(token):
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timed_serialization():
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+
+
+def query_timer(execute, sql, params, many, context):
+    """execute_wrapper counting the queries and DB time of the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # connection_created fires on every reconnect of the same wrapper object
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are estimated as the upper bound of their bucket."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (None,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound is not None else round(self.max, 3)
+        return round(self.max, 3)
+
+    def snapshot(self):
+        labels = [str(bound) for bound in self.bounds] + ['+Inf']
+        return {
+            'count': self.count,
+            'mean': round(self.sum / self.count, 3) if self.count else None,
+            'max': round(self.max, 3),
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class EndpointStats:
+    def __init__(self, config):
+        self.errors = 0
+        self.latency_ms = Histogram(config['LATENCY_BUCKETS_MS'])
+        self.db_ms = Histogram(config['LATENCY_BUCKETS_MS'])
+        self.serializer_ms = Histogram(config['LATENCY_BUCKETS_MS'])
+        self.queries = Histogram(config['QUERY_BUCKETS'])
+        self.response_bytes = Histogram(config['SIZE_BUCKETS'])
+
+    def snapshot(self):
+        return {
+            'count': self.latency_ms.count,
+            'errors': self.errors,
+            'latency_ms': self.latency_ms.snapshot(),
+            'db_ms': self.db_ms.snapshot(),
+            'serializer_ms': self.serializer_ms.snapshot(),
+            'queries': self.queries.snapshot(),
+            'response_bytes': self.response_bytes.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    """Per-endpoint aggregates keyed by 'METHOD route', where route is the URL pattern."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.since = timezone.now()
+
+    def record(self, endpoint, metrics, total, status_code, size):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(get_config())
+            stats.latency_ms.observe(total * 1000)
+            stats.db_ms.observe(metrics.db_time * 1000)
+            stats.serializer_ms.observe(metrics.serializer_time * 1000)
+            stats.queries.observe(metrics.queries)
+            if size is not None:
+                stats.response_bytes.observe(size)
+            if status_code >= 500:
+                stats.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'since': self.since.isoformat(),
+                'endpoints': {endpoint: stats.snapshot() for endpoint, stats in sorted(self._endpoints.items())},
+            }
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,76 @@
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from . import metrics
+
+logger = logging.getLogger('api.performance')
+
+
+def endpoint_name(request):
+    """'METHOD route' using the URL pattern (not the path), so ids do not explode the key space."""
+    match = getattr(request, 'resolver_match', None)
+    route = match.route if match is not None else '<unmatched>'
+    return f"{request.method} /{route}"
+
+
+class PerformanceMiddleware:
+    """
+    Times each request: wall time, DB queries and DB time, serializer time and response size.
+    Adds a Server-Timing header, logs one structured line to the api.performance logger and
+    feeds the per-endpoint histograms served by /api/metrics/. Should be first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = metrics.get_config()['SERVER_TIMING']
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics = metrics.finish_request(token)
+        return self.finish(request, response, request_metrics, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics = metrics.finish_request(token)
+        return self.finish(request, response, request_metrics, time.perf_counter() - started)
+
+    def finish(self, request, response, request_metrics, total):
+        endpoint = endpoint_name(request)
+        # Streamed bodies are produced after this point; their size is unknown here
+        size = None if response.streaming else len(response.content)
+        db_ms = request_metrics.db_time * 1000
+        serializer_ms = request_metrics.serializer_time * 1000
+        total_ms = total * 1000
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.2f};desc="{request_metrics.queries} queries", '
+                f'serializer;dur={serializer_ms:.2f}, '
+                f'app;dur={max(total_ms - db_ms - serializer_ms, 0):.2f}, '
+                f'total;dur={total_ms:.2f}'
+            )
+        metrics.registry.record(endpoint, request_metrics, total, response.status_code, size)
+        logger.info('request', extra={'data': {
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 3),
+            'db_ms': round(db_ms, 3),
+            'queries': request_metrics.queries,
+            'serializer_ms': round(serializer_ms, 3),
+            'response_bytes': size,
+        }})
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_flashcard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='flashcard_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_member_counts(apps, schema_editor):
+    StudyGroup = apps.get_model('api', 'StudyGroup')
+    memberships = StudyGroup.members.through.objects.filter(studygroup_id=OuterRef('pk'))
+    StudyGroup.objects.update(member_count=Coalesce(Subquery(
+        memberships.values('studygroup_id').annotate(total=Count('*')).values('total')[:1]
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_flashcard_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studygroup',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_member_counts, migrations.RunPython.noop),
+    ]
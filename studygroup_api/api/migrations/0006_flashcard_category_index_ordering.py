@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_flashcard_review_schedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='flashcard',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='studygroup',
+            options={'ordering': ['id']},
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'category', '-created_at', '-id'], name='flashcard_user_category_idx'),
+        ),
+    ]
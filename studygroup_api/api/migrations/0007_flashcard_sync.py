@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_change_seq(apps, schema_editor):
+    """Number each user's existing cards 1..n by id and start their counters at n."""
+    Flashcard = apps.get_model('api', 'Flashcard')
+    SyncCounter = apps.get_model('api', 'SyncCounter')
+    earlier = Flashcard.objects.filter(user_id=OuterRef('user_id'), id__lte=OuterRef('pk'))
+    Flashcard.objects.update(change_seq=Subquery(
+        earlier.values('user_id').annotate(total=Count('*')).values('total')[:1]
+    ))
+    SyncCounter.objects.bulk_create(
+        SyncCounter(user_id=row['user_id'], value=row['total'])
+        for row in Flashcard.objects.values('user_id').annotate(total=Count('*')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_flashcard_category_index_ordering'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='flashcard_sync', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+                ('purged_through', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='flashcard',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='flashcard',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flashcard',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'change_seq'], name='flashcard_user_change_idx'),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
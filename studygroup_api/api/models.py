@@ -1,21 +1,216 @@
-from django.db import models
+from collections import defaultdict
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.signals import m2m_changed
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .scheduling import DEFAULT_EASE_FACTOR
+
+# Member representations supported by the group endpoints (?members=...)
+MEMBERS_FULL = 'full'
+MEMBERS_PREVIEW = 'preview'
+MEMBERS_COUNT = 'count'
+MEMBER_MODES = (MEMBERS_FULL, MEMBERS_PREVIEW, MEMBERS_COUNT)
+
+# Largest primary key any supported database stores (signed 64-bit); larger ids overflow in queries
+MAX_ID = 2 ** 63 - 1
+
+class StudyGroupQuerySet(models.QuerySet):
+    def with_members(self):
+        return self.prefetch_related(Prefetch('members', queryset=member_queryset()))
+
+    def with_member_preview(self, limit):
+        # Sliced prefetch: one windowed query fetches at most `limit` members per group
+        return self.prefetch_related(
+            Prefetch('members', queryset=member_queryset()[:limit], to_attr='member_preview')
+        )
+
+    def for_representation(self, members=MEMBERS_FULL, preview_size=5):
+        """Everything StudyGroupSerializer touches, in a constant number of queries."""
+        queryset = self.select_related('creator')
+        if members == MEMBERS_FULL:
+            queryset = queryset.with_members()
+        elif members == MEMBERS_PREVIEW:
+            queryset = queryset.with_member_preview(preview_size)
+        return queryset
+
+    def add_member(self, group_id, user_id):
+        """
+        Insert-or-ignore the membership row and bump member_count in the same transaction.
+        Returns True if the user joined, False if they were already a member, None if the group does not exist.
+        """
+        through = StudyGroup.members.through
+        quote = connections[self.db].ops.quote_name
+        with transaction.atomic(using=self.db), connections[self.db].cursor() as cursor:
+            # The EXISTS guard folds the 404 check into the insert; ON CONFLICT relies on the (studygroup, user) unique constraint
+            cursor.execute(
+                f"INSERT INTO {quote(through._meta.db_table)} (studygroup_id, user_id) "
+                f"SELECT %s, %s WHERE EXISTS (SELECT 1 FROM {quote(StudyGroup._meta.db_table)} WHERE id = %s) "
+                f"ON CONFLICT DO NOTHING",
+                [group_id, user_id, group_id]
+            )
+            joined = cursor.rowcount == 1
+            if joined:
+                self.filter(pk=group_id).update(member_count=F('member_count') + 1)
+        if joined:
+            self._members_changed(group_id, user_id, 'post_add')
+            return True
+        return False if self.filter(pk=group_id).exists() else None
+
+    def remove_member(self, group_id, user_id):
+        """Delete the membership row and decrement member_count. Returns True if a row was removed."""
+        through = StudyGroup.members.through
+        with transaction.atomic(using=self.db):
+            removed, _ = through.objects.using(self.db).filter(studygroup_id=group_id, user_id=user_id).delete()
+            if removed:
+                self.filter(pk=group_id).update(member_count=F('member_count') - 1)
+        if removed:
+            self._members_changed(group_id, user_id, 'post_remove')
+        return removed == 1
+
+    def recount_members(self):
+        """Set member_count from the membership table; returns the number of groups that had drifted."""
+        drifted = self.annotate(actual=actual_member_count()).exclude(member_count=F('actual'))
+        return self.filter(pk__in=drifted.values('pk')).update(member_count=actual_member_count())
+
+    def _members_changed(self, group_id, user_id, action):
+        # The raw write bypasses the related manager, so announce it the way members.add()/remove() would.
+        # member_count_updated tells the bookkeeping receiver that the count is already correct.
+        m2m_changed.send(
+            sender=StudyGroup.members.through, instance=StudyGroup(pk=group_id), action=action,
+            reverse=False, model=User, pk_set={user_id}, using=self.db, member_count_updated=True
+        )
+
+def actual_member_count():
+    memberships = StudyGroup.members.through.objects.filter(studygroup_id=OuterRef('pk'))
+    return Coalesce(Subquery(
+        memberships.values('studygroup_id').annotate(total=Count('*')).values('total')[:1]
+    ), 0)
+
+def member_queryset():
+    return User.objects.only('id', 'username', 'email').order_by('id')
 
 class StudyGroup(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_groups')
     members = models.ManyToManyField(User, related_name='study_groups')
+    # Denormalized len(members); kept in step by add_member/remove_member and the m2m_changed receiver
+    member_count = models.PositiveIntegerField(default=0)
+
+    objects = StudyGroupQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']  # primary key order, so page N is stable; served by the primary key index
 
     def __str__(self):
         return self.name
 
+class SyncCounter(models.Model):
+    """
+    Per-user source of Flashcard.change_seq. Allocating updates this row, and the row lock
+    is held until the writing transaction commits, so one user's sequence numbers become
+    visible in order and a sync client never skips a change by moving its token past it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='flashcard_sync')
+    value = models.PositiveBigIntegerField(default=0)  # last allocated change_seq
+    # Tombstones up to here have been purged: older sync tokens would miss those deletions
+    purged_through = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, user_id, count=1, using='default'):
+        """Reserve `count` consecutive sequence numbers and return the first. Call inside the writing transaction."""
+        counters = cls.objects.using(using).filter(pk=user_id)
+        with transaction.atomic(using=using):
+            if not counters.update(value=F('value') + count):
+                cls.objects.using(using).get_or_create(pk=user_id)
+                counters.update(value=F('value') + count)
+            return counters.values_list('value', flat=True).get() - count + 1
+
+class FlashcardQuerySet(models.QuerySet):
+    """
+    bulk_create() and bulk_update() take change sequence numbers like save() does.
+    update() and delete() on a queryset are not tracked: they bypass sync and tombstones.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            self._allocate(objs)
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            self._allocate(objs)
+            for obj in objs:
+                obj.updated_at = now  # auto_now is only applied by save()
+            return super().bulk_update(objs, [*fields, 'change_seq', 'updated_at'], *args, **kwargs)
+
+    def _allocate(self, objs):
+        by_user = defaultdict(list)
+        for obj in objs:
+            by_user[obj.user_id].append(obj)
+        for user_id, cards in sorted(by_user.items()):  # a fixed lock order between users
+            first = SyncCounter.allocate(user_id, len(cards), using=self.db)
+            for offset, card in enumerate(cards):
+                card.change_seq = first + offset
+
+class LiveFlashcardManager(models.Manager.from_queryset(FlashcardQuerySet)):
+    """The default manager: soft-deleted cards (tombstones) are invisible to the API."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class Flashcard(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='flashcards')
     front = models.TextField()
     back = models.TextField()
     category = models.CharField(max_length=50, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # SM-2 review state, see api.scheduling
+    ease_factor = models.FloatField(default=DEFAULT_EASE_FACTOR)
+    interval = models.PositiveIntegerField(default=0)  # days
+    repetitions = models.PositiveIntegerField(default=0)
+    due_at = models.DateTimeField(default=timezone.now)
+    # Change tracking for GET /api/flashcards/sync/: every write takes the owner's next
+    # change_seq (see SyncCounter), and deleting leaves a tombstone until it is purged
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.PositiveBigIntegerField(default=0)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveFlashcardManager()
+    all_objects = FlashcardQuerySet.as_manager()  # tombstones included
+
+    class Meta:
+        # Newest first, with id as the tie-breaker so equal timestamps still page deterministically
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Serves keyset pagination of a user's deck: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['user', '-created_at', '-id'], name='flashcard_user_created_idx'),
+            # Serves ?category= on the deck in the same order, without a sort step
+            models.Index(fields=['user', 'category', '-created_at', '-id'], name='flashcard_user_category_idx'),
+            # Serves the due queue: WHERE user = ? AND due_at <= now ORDER BY due_at
+            models.Index(fields=['user', 'due_at'], name='flashcard_user_due_idx'),
+            # Serves sync: WHERE user = ? AND change_seq > ? ORDER BY change_seq
+            models.Index(fields=['user', 'change_seq'], name='flashcard_user_change_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            self.change_seq = SyncCounter.allocate(self.user_id, using=using)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq', 'updated_at'}
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        """Soft delete: the row stays as a tombstone so sync clients learn about the deletion."""
+        self.deleted_at = timezone.now()
+        self.save(using=using, update_fields=['deleted_at'])
+        return 1, {self._meta.label: 1}
 
     def __str__(self):
         return f"{self.front} - {self.user.username}"
\ No newline at end of file
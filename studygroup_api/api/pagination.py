@@ -0,0 +1,280 @@
+import base64
+import datetime
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.http import int_to_base36
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+PAGE_SIZE_QUERY_PARAM = 'page_size'
+COUNT_QUERY_PARAM = 'count'
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def get_page_size(params):
+    """
+    ?page_size=, capped at MAX_PAGE_SIZE; the default PAGE_SIZE when it is absent or not a
+    positive integer (as DRF's PageNumberPagination treats page_size_query_param).
+    """
+    value = params.get(PAGE_SIZE_QUERY_PARAM, '')
+    if not value.isdigit() or int(value) < 1:
+        return api_settings.PAGE_SIZE
+    return min(int(value), getattr(settings, 'MAX_PAGE_SIZE', 500))
+
+
+def wants_count(params, default):
+    value = params.get(COUNT_QUERY_PARAM)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no')
+
+
+class ListPagination(PageNumberPagination):
+    """
+    PageNumberPagination with ?page_size= (up to MAX_PAGE_SIZE) and ?count=false, which
+    skips the COUNT query: the page is fetched with one extra row to learn whether a next
+    page exists, and the response has no count.
+    """
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+
+    def get_page_size(self, request):
+        return get_page_size(request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.countless = not wants_count(request.query_params, default=True)
+        if not self.countless:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        number = request.query_params.get(self.page_query_param, '1')
+        if not number.isdigit() or int(number) < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=number, message='That page number is not a positive integer'))
+        self.number = int(number)
+        page_size = self.get_page_size(request)
+        offset = (self.number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=number, message='That page contains no results'))
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.countless:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.countless:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if not self.countless:
+            return super().get_previous_link()
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on a unique ordering key instead of using OFFSET,
+    so every page costs one indexed range scan regardless of depth. ?page_size= works
+    as for ListPagination.
+
+    The total count is only computed when the client asks for it with ?count=true
+    and is then cached for KEYSET_COUNT_CACHE_TIMEOUT seconds.
+
+    Cursors are compact: the position values joined with '.', each tagged with its type
+    ('i' base-36 integer, 't' base-36 microseconds since the epoch, 's' base64 text), and
+    prefixed with '_' when paging backwards. A flashcard cursor is about 16 characters.
+
+    Parameters are read from request.GET, so the async views can page plain Django
+    requests with apaginate_queryset().
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    count_query_param = COUNT_QUERY_PARAM
+    invalid_cursor_message = 'Invalid cursor'
+    # Must end with a unique field so the key is a total order, e.g. ('-created_at', '-id')
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.seek(queryset, request, self.get_count(queryset, request))
+        # Fetch one extra row to learn whether another page exists without counting
+        return self.take(list(queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset for the async views, which pass a plain Django request."""
+        queryset = self.seek(queryset, request, await self.aget_count(queryset, request))
+        return self.take([obj async for obj in queryset[:self.page_size + 1]])
+
+    def seek(self, queryset, request, count):
+        """The queryset ordered and filtered to start at the cursor's position."""
+        self.request = request
+        self.page_size = get_page_size(request.GET)
+        self.base_url = request.build_absolute_uri()
+        self.count = count
+        self.position, self.reverse = self.decode_cursor(request)
+        ordering = self.ordering if not self.reverse else tuple(self._flip(field) for field in self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(self._seek_filter(queryset.model, self.position, ordering))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+        return queryset
+
+    def take(self, results):
+        """The page from up to page_size + 1 rows fetched after seek()."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+        self.page = results
+        self.has_next = has_more if not self.reverse else self.position is not None
+        self.has_previous = self.position is not None if not self.reverse else has_more
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return payload
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_count(self, queryset, request):
+        if not wants_count(request.GET, default=False):
+            return None
+        key = self._count_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, getattr(settings, 'KEYSET_COUNT_CACHE_TIMEOUT', 60))
+        return count
+
+    async def aget_count(self, queryset, request):
+        if not wants_count(request.GET, default=False):
+            return None
+        key = self._count_key(queryset)
+        count = await cache.aget(key)
+        if count is None:
+            count = await queryset.order_by().acount()
+            await cache.aset(key, count, getattr(settings, 'KEYSET_COUNT_CACHE_TIMEOUT', 60))
+        return count
+
+    @staticmethod
+    def _count_key(queryset):
+        query = queryset.order_by().query
+        return 'keyset-count:' + hashlib.md5(f"{queryset.model._meta.label}:{query}".encode()).hexdigest()
+
+    def decode_cursor(self, request):
+        encoded = request.GET.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            reverse = encoded.startswith('_')
+            position = [self._load(part) for part in encoded.lstrip('_').split('.')]
+            if len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, IndexError, UnicodeError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        position = [self._dump(self._read(instance, field.lstrip('-'))) for field in self.ordering]
+        encoded = ('_' if reverse else '') + '.'.join(position)
+        return replace_query_param(remove_query_param(self.base_url, self.count_query_param), self.cursor_query_param, encoded)
+
+    def _seek_filter(self, model, position, ordering):
+        # (a, b) > (x, y) expanded as: a > x OR (a = x AND b > y), honouring each field's direction
+        values = [model._meta.get_field(field.lstrip('-')).to_python(value) for field, value in zip(ordering, position)]
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = f"{name}__lt" if field.startswith('-') else f"{name}__gt"
+            clause = Q(**{lookup: values[index]})
+            for previous_field, previous_value in zip(ordering[:index], values[:index]):
+                clause &= Q(**{previous_field.lstrip('-'): previous_value})
+            condition |= clause
+        return condition
+
+    @staticmethod
+    def _read(instance, name):
+        # Pages may also hold .values() rows (see api.serializers.RowMapper)
+        return instance[name] if isinstance(instance, dict) else getattr(instance, name)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f"-{field}"
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, int):
+            return f"i{'-' if value < 0 else ''}{int_to_base36(abs(value))}"
+        if isinstance(value, datetime.datetime):
+            if timezone.is_naive(value):
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return f"t{int_to_base36((value - EPOCH) // datetime.timedelta(microseconds=1))}"
+        return f"s{base64.urlsafe_b64encode(str(value).encode()).decode('ascii').rstrip('=')}"
+
+    @staticmethod
+    def _load(part):
+        tag, body = part[:1], part[1:]
+        if not body or len(body) > 24:
+            raise ValueError
+        if tag == 'i':
+            return int(body, 36)
+        if tag == 't':
+            value = EPOCH + datetime.timedelta(microseconds=int(body, 36))
+            return value if settings.USE_TZ else timezone.make_naive(value, datetime.timezone.utc)
+        if tag == 's':
+            return base64.urlsafe_b64decode(body.encode('ascii') + b'=' * (-len(body) % 4)).decode()
+        raise ValueError
+
+
+class FlashcardKeysetPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class StudyGroupKeysetPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+def get_paginator(view, request):
+    """Opt into keyset pagination with ?cursor= (empty for the first page)."""
+    if KeysetPagination.cursor_query_param in request.query_params:
+        return view.cursor_pagination_class()
+    return view.pagination_class()
@@ -0,0 +1,53 @@
+"""
+Serialized users for GET /api/users/?ids=, read through a Django cache.
+
+Each user's full UserSerializer payload is cached under its id. A lookup fetches every
+requested id with one get_many, loads the misses with a single id__in query and stores
+them with one set_many, so a member list of any size costs at most one query. Saving or
+deleting a user drops its entry (api.signals); a lookup racing such a save can put the
+old payload back, which TIMEOUT bounds.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from .fieldsets import FULL, trim_queryset
+from .serializers import UserSerializer
+
+DEFAULT_USER_PROFILE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds
+    'MAX_IDS': 100,  # ids one request may ask for
+}
+
+# Bump whenever UserSerializer output changes so stale payloads are never served
+REPRESENTATION_VERSION = 1
+
+
+def get_config():
+    return {**DEFAULT_USER_PROFILE_CACHE, **getattr(settings, 'USER_PROFILE_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def profile_key(user_id):
+    return f"users:v{REPRESENTATION_VERSION}:{user_id}"
+
+
+def get_profiles(ids):
+    """user id -> full UserSerializer payload, for the ids that exist."""
+    cache = get_cache()
+    keys = {profile_key(user_id): user_id for user_id in ids}
+    profiles = {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+    missing = [user_id for user_id in ids if user_id not in profiles]
+    if missing:
+        users = trim_queryset(User.objects.filter(id__in=missing), UserSerializer, FULL)
+        fresh = {payload['id']: dict(payload) for payload in UserSerializer(users, many=True).data}
+        cache.set_many({profile_key(user_id): payload for user_id, payload in fresh.items()}, get_config()['TIMEOUT'])
+        profiles.update(fresh)
+    return profiles
+
+
+def invalidate_profiles(*user_ids):
+    get_cache().delete_many([profile_key(user_id) for user_id in user_ids])
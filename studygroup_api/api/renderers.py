@@ -0,0 +1,35 @@
+"""
+JSONRenderer that encodes with orjson when it is installed (pip install orjson).
+
+orjson builds the whole document in native code, several times faster than json.dumps
+on large list pages. The output matches DRF's compact JSONRenderer: datetimes and
+anything else orjson does not handle natively go through DRF's JSONEncoder, and
+U+2028/U+2029 are escaped; only NaN and infinities differ (null instead of an error).
+Indented output (an indent= Accept parameter) and non-default UNICODE_JSON/COMPACT_JSON
+settings use the stdlib path.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:  # e.g. integers wider than 64 bits; orjson.JSONEncodeError is a TypeError
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            # Valid JSON, but not valid JavaScript; escape them as JSONRenderer does
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,184 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary. Reads go to a replica only inside a safe (GET, HEAD,
+OPTIONS) request handled by ReplicaRoutingMiddleware; everything else, including unsafe
+requests, management commands and shells, reads from the primary. Each request sticks
+to one replica, so all its reads see the same copy.
+
+Replicas lag, so a client that has just written is pinned to the primary for
+PIN_SECONDS: its next reads see its own writes. Clients are identified by their
+Authorization header or session cookie (hashed), which is known before any query runs,
+and pins live in a Django cache so all workers honour them when it is shared. Models in
+PRIMARY_MODELS (the auth token, so a token issued a moment ago authenticates) are always
+read from the primary.
+"""
+import hashlib
+import random
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_DATABASE_ROUTING = {
+    'REPLICAS': [],  # database aliases serving reads; empty turns routing off
+    'PIN_SECONDS': 5,  # reads stay on the primary this long after a client writes
+    'CACHE_ALIAS': 'default',  # where pins are kept; share it between workers
+    'PRIMARY_MODELS': ['authtoken.token', 'sessions.session'],
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = ContextVar('api_db_routing', default=None)
+
+
+class Routing:
+    """Parsed DATABASE_ROUTING."""
+
+    def __init__(self, replicas, pin_seconds, cache_alias, primary_models):
+        self.replicas = tuple(replicas)
+        self.pin_seconds = pin_seconds
+        self.cache_alias = cache_alias
+        self.primary_models = frozenset(label.lower() for label in primary_models)
+        self.aliases = frozenset((DEFAULT_DB_ALIAS, *self.replicas))
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_DATABASE_ROUTING, **getattr(settings, 'DATABASE_ROUTING', {})}
+        return cls(config['REPLICAS'], config['PIN_SECONDS'], config['CACHE_ALIAS'], config['PRIMARY_MODELS'])
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def choose_replica(self):
+        alias = random.choice(self.replicas)
+        # A replica configured as the primary's test MIRROR is the same database: use the primary's connection
+        if connections[alias].settings_dict['NAME'] == connections[DEFAULT_DB_ALIAS].settings_dict['NAME']:
+            return None
+        return alias
+
+    @staticmethod
+    def pin_key(client):
+        return f'db-pin:{client}'
+
+
+_routing = None
+
+
+def get_routing():
+    global _routing
+    if _routing is None:
+        _routing = Routing.from_settings()
+    return _routing
+
+
+def reset_routing():
+    global _routing
+    _routing = None
+
+
+class RequestRouting:
+    """Where the current request reads: a replica alias, or None for the primary."""
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+    def use_primary(self):
+        self.replica = None
+
+
+def client_key(request):
+    """A hash of the credentials the request carries, or None when anonymous."""
+    credentials = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return hashlib.sha256(credentials.encode()).hexdigest()[:32]
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db  # related objects come from where their parent did
+        state = _state.get()
+        if state is None or state.replica is None or model._meta.label_lower in get_routing().primary_models:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Later reads in this request, and the client's next requests, see the write
+            state.use_primary()
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = get_routing().aliases
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary and get its schema from replication
+        return False if db in get_routing().replicas else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Opens the routing state for each request: a random replica for safe requests from
+    clients that are not pinned, the primary otherwise. Pins clients after a request that
+    wrote. Place it right after PerformanceMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = get_routing()
+        if not routing.replicas:
+            return self.get_response(request)
+        client = client_key(request)
+        pinned = client is not None and request.method in SAFE_METHODS and routing.cache.get(routing.pin_key(client))
+        state, token = self.start(request, routing, pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if client is not None and self.wrote(request, response, state):
+            routing.cache.set(routing.pin_key(client), True, routing.pin_seconds)
+        return response
+
+    async def __acall__(self, request):
+        routing = get_routing()
+        if not routing.replicas:
+            return await self.get_response(request)
+        client = client_key(request)
+        pinned = client is not None and request.method in SAFE_METHODS and await routing.cache.aget(routing.pin_key(client))
+        state, token = self.start(request, routing, pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if client is not None and self.wrote(request, response, state):
+            await routing.cache.aset(routing.pin_key(client), True, routing.pin_seconds)
+        return response
+
+    @staticmethod
+    def start(request, routing, pinned):
+        replica = routing.choose_replica() if request.method in SAFE_METHODS and not pinned else None
+        state = RequestRouting(replica)
+        return state, _state.set(state)
+
+    @staticmethod
+    def wrote(request, response, state):
+        return state.wrote or (request.method not in SAFE_METHODS and response.status_code < 400)
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+# SM-2 (SuperMemo 2) constants
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+PASSING_GRADE = 3
+MAX_GRADE = 5
+
+
+def schedule_review(card, grade, now):
+    """
+    Apply one SM-2 review to `card` in place: grade 0-5, where anything below 3 is a lapse.
+    A lapse restarts the repetition sequence without touching the ease factor; a pass grows
+    the interval (1 day, 6 days, then interval * ease) and adjusts the ease by how easy it was.
+    """
+    if grade < PASSING_GRADE:
+        card.repetitions = 0
+        card.interval = 1
+    else:
+        if card.repetitions == 0:
+            card.interval = 1
+        elif card.repetitions == 1:
+            card.interval = 6
+        else:
+            card.interval = round(card.interval * card.ease_factor)
+        card.repetitions += 1
+        miss = MAX_GRADE - grade
+        card.ease_factor = max(MIN_EASE_FACTOR, card.ease_factor + 0.1 - miss * (0.08 + miss * 0.02))
+    card.due_at = now + timedelta(days=card.interval)
+    return card
@@ -0,0 +1,207 @@
+"""
+The OpenAPI schema, generated once instead of on every request.
+
+drf_yasg introspects every view and serializer each time the schema is requested. Here
+the public schema is built once per process, or loaded from the artifact written by
+`manage.py generate_schema`, and kept in memory as encoded JSON (YAML on first use),
+each with a gzipped copy and an ETag. Requests only pick a representation, so a
+repeat visit with If-None-Match costs a 304 and nothing else.
+
+The schema records a fingerprint of the URLconf and of the source of the modules behind
+its views (`x-urlconf-fingerprint`). An artifact whose fingerprint no longer matches the
+running code is ignored and the schema is rebuilt in memory.
+"""
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import re
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import URLResolver, get_resolver
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from drf_yasg import views as yasg_views
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson, yaml_sane_dump
+from drf_yasg.renderers import _SpecRenderer
+
+logger = logging.getLogger('api')
+
+DEFAULT_API_SCHEMA = {
+    'ARTIFACT_DIR': None,  # where generate_schema writes openapi-<version>.json; None: always build in memory
+    'WARM_UP': True,  # build the schema when the WSGI/ASGI application starts, not on the first request
+}
+
+FINGERPRINT_KEY = 'x-urlconf-fingerprint'
+FORMATS = {'json': 'application/json', 'yaml': 'application/yaml'}
+GZIP_RE = re.compile(r'\bgzip\b')
+
+
+def get_config():
+    return {**DEFAULT_API_SCHEMA, **getattr(settings, 'API_SCHEMA', {})}
+
+
+def _view(callback):
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, route)
+        else:
+            view = _view(pattern.callback)
+            yield route, pattern.name or '', view.__module__, view.__qualname__
+
+
+def _project_sources(modules):
+    """The .py files of the project packages that define the views, so serializer and model changes count too."""
+    base = Path(settings.BASE_DIR).resolve()
+    directories = set()
+    for name in modules:
+        try:
+            source = Path(inspect.getsourcefile(sys.modules[name])).resolve()
+        except (KeyError, TypeError):
+            continue
+        if source.is_relative_to(base):
+            directories.add(source.parent)
+    return sorted(path for directory in directories for path in directory.glob('*.py'))
+
+
+def urlconf_fingerprint(urlconf=None):
+    """sha256 over every route with its name and view, and the source of the project packages behind them."""
+    routes = sorted(_walk(get_resolver(urlconf).url_patterns))
+    digest = hashlib.sha256()
+    for route in routes:
+        digest.update('\0'.join(route).encode() + b'\n')
+    for path in _project_sources({module for _, _, module, _ in routes}):
+        digest.update(path.name.encode() + b'\0' + path.read_bytes())
+    return digest.hexdigest()
+
+
+class Representation:
+    """One encoding of the schema: the body, its gzipped copy and an ETag."""
+
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body, mtime=0)
+        # Weak, so one tag covers the identity and gzip transfers of the same document
+        self.etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class SchemaDocument:
+    def __init__(self, spec):
+        self.spec = spec
+        self.fingerprint = spec.get(FINGERPRINT_KEY)
+        self._representations = {'json': Representation(self.encode('json'))}
+        self._lock = threading.Lock()
+
+    def encode(self, fmt):
+        # The encodings of drf_yasg's OpenAPICodecJson and OpenAPICodecYaml
+        if fmt == 'yaml':
+            return yaml_sane_dump(self.spec, binary=True)
+        return json.dumps(self.spec, ensure_ascii=False).encode()
+
+    def representation(self, fmt):
+        if fmt not in self._representations:
+            with self._lock:
+                if fmt not in self._representations:
+                    self._representations[fmt] = Representation(self.encode(fmt))
+        return self._representations[fmt]
+
+    @classmethod
+    def build(cls, urlconf=None):
+        info = swagger_settings.DEFAULT_INFO
+        generator = swagger_settings.DEFAULT_GENERATOR_CLASS(info, info.get('version', ''), urlconf=urlconf)
+        # No request: every endpoint is included and no host is baked in (clients use the one serving the schema)
+        spec = OpenAPICodecJson(validators=[]).generate_swagger_object(generator.get_schema(None, public=True))
+        spec[FINGERPRINT_KEY] = urlconf_fingerprint(urlconf)
+        return cls(spec)
+
+    @classmethod
+    def load(cls, path):
+        return cls(json.loads(Path(path).read_text(encoding='utf-8'), object_pairs_hook=OrderedDict))
+
+
+def artifact_path(directory=None):
+    directory = directory or get_config()['ARTIFACT_DIR']
+    if directory is None:
+        return None
+    return Path(directory) / f"openapi-{swagger_settings.DEFAULT_INFO.get('version') or 'v1'}.json"
+
+
+def load_or_build():
+    """The artifact when it matches the running URLconf, else a freshly built document."""
+    path = artifact_path()
+    if path is not None and path.exists():
+        document = SchemaDocument.load(path)
+        if document.fingerprint == urlconf_fingerprint():
+            logger.info("Loaded OpenAPI schema from %s", path)
+            return document
+        logger.warning("OpenAPI schema artifact %s is stale, regenerating in memory", path)
+    return SchemaDocument.build()
+
+
+_document = None
+_document_lock = threading.Lock()
+
+
+def get_document():
+    global _document
+    if _document is None:
+        with _document_lock:
+            if _document is None:
+                _document = load_or_build()
+    return _document
+
+
+def reset_document():
+    global _document
+    _document = None
+
+
+def warm_up():
+    """Called by the WSGI and ASGI entry points, so the first schema request finds it ready."""
+    if get_config()['WARM_UP']:
+        get_document()
+
+
+def schema_response(request, fmt='json', content_type=None):
+    """The cached schema, gzipped when the client accepts it, or 304 for a matching If-None-Match."""
+    representation = get_document().representation(fmt)
+    content_type = content_type or FORMATS[fmt]
+    response = get_conditional_response(request, etag=representation.etag)
+    if response is None:
+        if GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            response = HttpResponse(representation.gzipped, content_type=content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(representation.body, content_type=content_type)
+    response['ETag'] = representation.etag
+    response['Cache-Control'] = 'no-cache'  # may be stored, but revalidated; a deploy changes the ETag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def get_schema_view(**kwargs):
+    """
+    drf_yasg's get_schema_view() whose spec formats (?format=openapi, .json, .yaml) are
+    served from the cached document; the Swagger UI and ReDoc pages render as before.
+    The API info is SWAGGER_SETTINGS['DEFAULT_INFO'], which the document is built from.
+    """
+    base = yasg_views.get_schema_view(**kwargs)
+
+    class CachedSchemaView(base):
+        def get(self, request, version='', format=None):
+            renderer = request.accepted_renderer
+            if isinstance(renderer, _SpecRenderer):
+                return schema_response(request, 'yaml' if renderer.format == 'yaml' else 'json', renderer.media_type)
+            return super().get(request, version, format)
+
+    return CachedSchemaView
@@ -0,0 +1,151 @@
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from .models import StudyGroup, Flashcard
+
+# Columns indexed per model, most important first (earlier columns weigh more in the ranking)
+SEARCH_FIELDS = {
+    Flashcard: ('front', 'back'),
+    StudyGroup: ('name', 'description'),
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """
+    Full-text search over SEARCH_FIELDS. search() narrows a queryset to matching rows
+    ordered by relevance and annotated with `rank`, so callers can still slice,
+    select_related and prefetch it like any other queryset.
+    """
+
+    def install(self, using='default'):
+        """Create whatever index structures the backend needs; must be idempotent."""
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    FTS5 external-content tables (<table>_fts) fed by insert/update/delete triggers, so
+    bulk_create, queryset.update() and raw SQL all stay indexed. Ranking is bm25.
+    """
+
+    def install(self, using='default'):
+        existing = set(connections[using].introspection.table_names())
+        with connections[using].cursor() as cursor:
+            for model, fields in SEARCH_FIELDS.items():
+                if model._meta.db_table not in existing:  # migrating another app before ours
+                    continue
+                for statement in self._ddl(model._meta.db_table, fields, cursor):
+                    cursor.execute(statement)
+
+    def _ddl(self, table, fields, cursor):
+        fts = f"{table}_fts"
+        columns = ', '.join(fields)
+        new_values = ', '.join(f"new.{field}" for field in fields)
+        old_values = ', '.join(f"old.{field}" for field in fields)
+        # Rebuilding a table (as SQLite migrations do) drops its triggers; detect that and reindex
+        cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name LIKE %s", [table, f"{fts}_%"])
+        triggers_missing = cursor.fetchone()[0] < 3
+        yield (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        )
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+        )
+        if triggers_missing:
+            yield f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        # Quote every token so user input can never be parsed as FTS syntax; the last one matches as a prefix
+        match = ' '.join(f'"{token}"' for token in tokens) + '*'
+        table = queryset.model._meta.db_table
+        fts = f"{table}_fts"
+        weights = ', '.join(str(float(weight)) for weight in range(len(SEARCH_FIELDS[queryset.model]), 0, -1))
+        return queryset.extra(
+            tables=[fts],
+            where=[f"{fts}.rowid = {table}.id", f"{fts} MATCH %s"],
+            params=[match],
+            select={'rank': f"bm25({fts}, {weights})"},
+            order_by=['rank', 'id'],
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector search ranked by ts_rank, served by a GIN expression index per model."""
+    config = 'english'
+
+    def install(self, using='default'):
+        existing = set(connections[using].introspection.table_names())
+        with connections[using].cursor() as cursor:
+            for model, fields in SEARCH_FIELDS.items():
+                table = model._meta.db_table
+                if table not in existing:
+                    continue
+                document = " || ' ' || ".join(f"COALESCE({field}, '')" for field in fields)
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} "
+                    f"USING GIN (to_tsvector('{self.config}'::regconfig, {document}))"
+                )
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        vector = SearchVector(*SEARCH_FIELDS[queryset.model], config=self.config)
+        search_query = SearchQuery(' & '.join(tokens) + ':*', search_type='raw', config=self.config)
+        return queryset.annotate(document=vector, rank=SearchRank(vector, search_query)).filter(
+            document=search_query
+        ).order_by('-rank', 'id')
+
+
+class SubstringSearchBackend(SearchBackend):
+    """Unindexed icontains fallback for databases without a full-text backend."""
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        for token in tokens:
+            condition = Q()
+            for field in SEARCH_FIELDS[queryset.model]:
+                condition |= Q(**{f"{field}__icontains": token})
+            queryset = queryset.filter(condition)
+        return queryset.order_by('id')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    backend = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    return VENDOR_BACKENDS.get(connections[using].vendor, SubstringSearchBackend)()
@@ -1,11 +1,143 @@
-from rest_framework import serializers
+import datetime
+from functools import lru_cache, partial
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
-from .models import StudyGroup, Flashcard
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from . import hashing
+from .batch import ITEM_HEADERS
+from .models import StudyGroup, Flashcard, MAX_ID, MEMBERS_COUNT, MEMBERS_PREVIEW
+from .metrics import timed_serialization
+from .scheduling import MAX_GRADE
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """
+    Reports the time spent building .data to PerformanceMiddleware. Subclasses set
+    Meta.list_serializer_class = TimedListSerializer so many=True is timed too.
+    """
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+def iso_datetime(value, tz):
+    """DateTimeField.to_representation for the ISO 8601 format, given the already resolved field timezone."""
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+class RowMapper:
+    """
+    Renders .values() rows exactly as serializer_class renders model instances, without
+    building instances or walking DRF's per-field machinery. How each field converts is
+    decided once per mapper: values whose representation is the value itself are copied,
+    floats and ISO 8601 datetimes use plain functions (the current timezone is looked up
+    once per page instead of once per value), anything else calls the bound field's
+    to_representation. Flat serializers only; see row_mapper().
+    """
+    # to_representation is str()/int() of a value the database driver already returns as such
+    COPIED_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+    def __init__(self, serializer_class, fields=None):
+        model = serializer_class.Meta.model
+        specs = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField,
+                                  serializers.SerializerMethodField)) or '.' in field.source:
+                raise TypeError(f"{serializer_class.__name__}.{name} cannot be rendered from .values() rows")
+            if model._meta.get_field(field.source).is_relation:  # FieldDoesNotExist for properties
+                raise TypeError(f"{serializer_class.__name__}.{name} cannot be rendered from .values() rows")
+            specs.append((name, field.source, self.compile(field)))
+        self.specs = tuple(specs)
+        # The primary key and ordering columns come along so cursor pagination can read them
+        self.columns = tuple(dict.fromkeys([
+            *(source for _, source, _ in specs), model._meta.pk.name,
+            *(name.lstrip('-') for name in model._meta.ordering),
+        ]))
+
+    @staticmethod
+    def compile(field):
+        """Returns a function that yields the field's converter for one page (None: copy the value)."""
+        if isinstance(field, RowMapper.COPIED_FIELDS):
+            return lambda: None
+        if isinstance(field, serializers.FloatField):
+            return lambda: float
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if isinstance(field, serializers.DateTimeField) and isinstance(output_format, str) and output_format.lower() == ISO_8601:
+            return lambda: partial(iso_datetime, tz=field.timezone if hasattr(field, 'timezone') else field.default_timezone())
+        return lambda: field.to_representation
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def map(self, rows):
+        with timed_serialization():
+            specs = [(name, source, converter()) for name, source, converter in self.specs]
+            data = []
+            for row in rows:
+                item = {}
+                for name, source, convert in specs:
+                    value = row[source]
+                    item[name] = value if convert is None or value is None else convert(value)
+                data.append(item)
+            return data
+
+@lru_cache(maxsize=None)
+def row_mapper(serializer_class, fields=None):
+    """Cached RowMapper for a serializer and fieldset (see api.fieldsets), or None if it cannot map rows."""
+    try:
+        return RowMapper(serializer_class, fields)
+    except (TypeError, FieldDoesNotExist):
+        return None
+
+def collapse(field):
+    """A nested serializer field reduced to the primary key(s) of what it would embed."""
+    kwargs = {'source': field.source} if field.source else {}
+    return serializers.PrimaryKeyRelatedField(read_only=True, many=isinstance(field, serializers.ListSerializer), **kwargs)
+
+class SparseFieldsMixin:
+    """
+    Applies context['fields'] and context['expand'] (see api.fieldsets) to the top-level
+    serializer. Nested serializers share the context but always render all their fields.
+    """
+
+    def get_fields(self):
+        return self.select_fields(super().get_fields())
+
+    def select_fields(self, fields):
+        selected = self.context.get('fields')
+        if selected is None or not self.is_top_level():
+            return fields
+        expand = self.context.get('expand', ())
+        return {
+            name: collapse(field) if isinstance(field, serializers.BaseSerializer) and name not in expand else field
+            for name, field in fields.items() if name in selected
+        }
+
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+class UserSerializer(SparseFieldsMixin, TimedModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
+        list_serializer_class = TimedListSerializer
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -15,27 +147,66 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['username', 'email', 'password']
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password']
+        # Hashed in the worker pool (api.hashing) unless the caller already did: save(password_hash=...)
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data['email']),
+            password=validated_data.get('password_hash') or hashing.make_password(validated_data['password'])
         )
+        user.save()
         return user
 
-class StudyGroupSerializer(serializers.ModelSerializer):
+class StudyGroupSerializer(SparseFieldsMixin, TimedModelSerializer):
     creator = UserSerializer(read_only=True)
     members = UserSerializer(many=True, read_only=True)
 
     class Meta:
         model = StudyGroup
-        fields = ['id', 'name', 'description', 'creator', 'members']
+        fields = ['id', 'name', 'description', 'creator', 'members', 'member_count']
+        read_only_fields = ['member_count']
+        list_serializer_class = TimedListSerializer
+
+    def select_fields(self, fields):
+        # context['members'] picks the member representation; see StudyGroupQuerySet.for_representation
+        mode = self.context.get('members')
+        if mode == MEMBERS_COUNT:
+            fields.pop('members')
+        elif mode == MEMBERS_PREVIEW:
+            fields['members'] = UserSerializer(many=True, read_only=True, source='member_preview')
+        return super().select_fields(fields)
 
     def create(self, validated_data):
         group = StudyGroup.objects.create(**validated_data)
-        group.members.add(group.creator)  # Creator is automatically a member
+        if StudyGroup.objects.add_member(group.pk, group.creator_id):  # Creator is automatically a member
+            group.member_count += 1
         return group
 
-class FlashcardSerializer(serializers.ModelSerializer):
+class FlashcardSerializer(SparseFieldsMixin, TimedModelSerializer):
     class Meta:
         model = Flashcard
-        fields = ['id', 'front', 'back', 'category', 'created_at']
\ No newline at end of file
+        fields = ['id', 'front', 'back', 'category', 'created_at', 'updated_at', 'ease_factor', 'interval', 'repetitions', 'due_at']
+        read_only_fields = ['ease_factor', 'interval', 'repetitions', 'due_at']
+        list_serializer_class = TimedListSerializer
+
+class ReviewSerializer(serializers.Serializer):
+    grade = serializers.IntegerField(min_value=0, max_value=MAX_GRADE)
+
+class BatchReviewSerializer(ReviewSerializer):
+    id = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.RegexField(r'^/', max_length=2048, help_text="Path and query string, e.g. /api/groups/?page=2")
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(), required=False, help_text=f"Only {', '.join(ITEM_HEADERS)}")
+
+    def validate_headers(self, value):
+        allowed = {name.lower() for name in ITEM_HEADERS}
+        rejected = sorted(name for name in value if name.lower() not in allowed)
+        if rejected:
+            raise serializers.ValidationError(f"Sub-requests may only set {', '.join(ITEM_HEADERS)}, not {', '.join(rejected)}")
+        return value
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False, help_text="Run consecutive GETs concurrently")
@@ -0,0 +1,125 @@
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import get_token_cache, reset_token_cache
+from .cache import invalidate_group, invalidate_group_list
+from .db import apply_sqlite_pragmas
+from .events import reset_broker
+from .hashing import reset_pool
+from .metrics import install_query_timer
+from .models import StudyGroup, actual_member_count
+from .profiles import invalidate_profiles
+from .routers import reset_routing
+from .schema import reset_document
+from .search import get_search_backend
+from .throttling import reset_throttle
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    get_token_cache().invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    # Covers deactivation as well as any change to the cached user's fields
+    if not created:
+        keys = list(Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
+        get_token_cache().invalidate(*keys)
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_profile(sender, instance, created, update_fields, **kwargs):
+    # last_login alone is not part of the cached representation
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_profiles(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_profile(sender, instance, **kwargs):
+    invalidate_profiles(instance.pk)
+
+
+@receiver(post_save, sender=StudyGroup)
+def invalidate_saved_group(sender, instance, created, **kwargs):
+    if created:
+        invalidate_group_list(instance.pk)
+    else:
+        invalidate_group(instance.pk)
+
+
+@receiver(post_delete, sender=StudyGroup)
+def invalidate_deleted_group(sender, instance, **kwargs):
+    invalidate_group_list(instance.pk)
+
+
+def changed_group_ids(instance, reverse, pk_set):
+    if not reverse:
+        return [instance.pk]
+    # user.study_groups.add(...): pk_set holds group ids, or None after a clear
+    return pk_set if pk_set is not None else getattr(instance, '_cleared_group_ids', [])
+
+
+@receiver(m2m_changed, sender=StudyGroup.members.through)
+def update_member_counts(sender, instance, action, reverse, pk_set, member_count_updated=False, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_group_ids = list(instance.study_groups.values_list('id', flat=True))
+    if member_count_updated or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    StudyGroup.objects.filter(pk__in=changed_group_ids(instance, reverse, pk_set)).update(member_count=actual_member_count())
+    if not reverse:
+        instance.refresh_from_db(fields=['member_count'])
+
+
+@receiver(m2m_changed, sender=StudyGroup.members.through)
+def invalidate_group_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    for group_id in changed_group_ids(instance, reverse, pk_set):
+        invalidate_group(group_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_groups(sender, instance, created, update_fields, **kwargs):
+    # Users are embedded as creator/members; last_login alone is not part of that representation
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    group_ids = set(instance.study_groups.values_list('id', flat=True))
+    group_ids.update(instance.created_groups.values_list('id', flat=True))
+    if group_ids:
+        invalidate_group_list(*group_ids)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using, **kwargs):
+    # Runs after every migrate, so index triggers dropped by a table rebuild come back
+    if sender.name == 'api':
+        get_search_backend(using).install(using)
+
+
+connection_created.connect(install_query_timer, dispatch_uid='api_query_timer')
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid='api_sqlite_pragmas')
+
+
+@receiver(setting_changed)
+def reset_caches(setting, **kwargs):
+    if setting == 'TOKEN_AUTH_CACHE':
+        reset_token_cache()
+    elif setting == 'API_THROTTLE':
+        reset_throttle()
+    elif setting == 'PASSWORD_HASHING':
+        # Hasher instances read their iteration count when created
+        hashers.get_hashers.cache_clear()
+        hashers.get_hashers_by_algorithm.cache_clear()
+        reset_pool()
+    elif setting in ('API_SCHEMA', 'ROOT_URLCONF', 'SWAGGER_SETTINGS'):
+        reset_document()
+    elif setting == 'DATABASE_ROUTING':
+        reset_routing()
+    elif setting == 'API_EVENTS':
+        reset_broker()
@@ -1,3 +1,1134 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+from . import urls
+from .authentication import get_token_cache
+from .db import sqlite_pragma_values
+from .events import Overflowed, get_broker, group_channel
+from .hashing import get_pool
+from .log import BatchedRotatingFileHandler, QueueListenerHandler, SamplingFilter
+from .benchmarks import ENDPOINTS, run_suite, seed, suite_context, unthrottled
+from .metrics import registry as metrics_registry
+from .models import StudyGroup, Flashcard, SyncCounter
+from .renderers import FastJSONRenderer
+from .scheduling import schedule_review
+from .schema import FINGERPRINT_KEY, SchemaDocument, reset_document
+from .serializers import FlashcardSerializer, row_mapper
+from .throttling import CacheWindowStore, LocalBucketStore, get_throttle, reset_throttle
 
-# Create your tests here.
+
+def make_group(creator, name, members=()):
+    group = StudyGroup.objects.create(name=name, description=f"{name} description", creator=creator)
+    group.members.add(creator, *members)
+    return group
+
+
+class StudyGroupQueryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        cls.others = [
+            User.objects.create_user(username=f'member{i}', email=f'member{i}@example.com', password='pass12345')
+            for i in range(8)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def count_list_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('group_list_create'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_list_query_count_is_constant(self):
+        for mode in ('full', 'preview', 'count'):
+            with self.captureOnCommitCallbacks(execute=True):
+                StudyGroup.objects.all().delete()
+                make_group(self.user, 'Small')
+            baseline = self.count_list_queries(members=mode)
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(9):
+                    make_group(self.user, f'Group {i}', self.others)
+            self.assertEqual(self.count_list_queries(members=mode), baseline, mode)
+
+    def test_preview_is_capped_and_count_omits_members(self):
+        group = make_group(self.user, 'Big', self.others)
+        url = reverse('group_detail', args=[group.id])
+        with self.settings(GROUP_MEMBER_PREVIEW_SIZE=3):
+            preview = self.client.get(url, {'members': 'preview'}).data
+        self.assertEqual(len(preview['members']), 3)
+        self.assertEqual(preview['member_count'], 9)
+        counted = self.client.get(url, {'members': 'count'}).data
+        self.assertNotIn('members', counted)
+        self.assertEqual(counted['member_count'], 9)
+        self.assertEqual(self.client.get(url, {'members': 'bogus'}).status_code, 400)
+
+    def test_members_endpoint_is_paginated(self):
+        group = make_group(self.user, 'Big', self.others)
+        response = self.client.get(reverse('group_members', args=[group.id]))
+        self.assertEqual(response.data['count'], 9)
+        self.assertEqual(len(response.data['results']), 9)
+        self.assertEqual(self.client.get(reverse('group_members', args=[group.id + 1])).status_code, 404)
+
+
+class KeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', email='reader@example.com', password='pass12345')
+        Flashcard.objects.bulk_create(
+            Flashcard(user=cls.user, front=f'Q{i}', back=f'A{i}') for i in range(25)
+        )
+        # Identical timestamps force the id tie-breaker to do the work
+        first = Flashcard.objects.order_by('id').first()
+        Flashcard.objects.filter(id__lt=first.id + 12).update(created_at=first.created_at)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_walks_every_card_once_newest_first(self):
+        seen = []
+        response = self.client.get(reverse('flashcard_list_create'), {'cursor': '', 'count': 'true'})
+        self.assertEqual(response.data['count'], 25)
+        while True:
+            seen.extend(card['id'] for card in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+            self.assertNotIn('count', response.data)
+        expected = list(Flashcard.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([card['id'] for card in previous.data['results']], expected[10:20])
+
+    def test_cursors_are_compact(self):
+        url = reverse('flashcard_list_create')
+        first = self.client.get(url, {'cursor': ''}).data
+        cursor = first['next'].split('cursor=')[1]
+        self.assertLess(len(cursor), 24)
+        second = self.client.get(first['next']).data['results']
+        self.assertTrue(second)
+        self.assertFalse({card['id'] for card in second} & {card['id'] for card in first['results']})
+
+    @override_settings(MAX_PAGE_SIZE=20)
+    def test_page_size_is_capped(self):
+        url = reverse('flashcard_list_create')
+        self.assertEqual(len(self.client.get(url, {'page_size': 15}).data['results']), 15)
+        self.assertEqual(len(self.client.get(url, {'page_size': 1000}).data['results']), 20)
+        self.assertEqual(len(self.client.get(url, {'page_size': 'all'}).data['results']), 10)
+        self.assertEqual(len(self.client.get(url, {'page_size': 1000, 'cursor': ''}).data['results']), 20)
+
+    def test_count_false_skips_the_count_query(self):
+        url = reverse('flashcard_list_create')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'count': 'false', 'page': 2, 'page_size': 12})
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertIn('page=3', response.data['next'])
+        last = self.client.get(response.data['next']).data
+        self.assertEqual((len(last['results']), last['next']), (1, None))
+        self.assertEqual(self.client.get(url, {'count': 'false', 'page': 4}).status_code, 404)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('flashcard_list_create'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class FlashcardBulkTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='importer', email='importer@example.com', password='pass12345')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_json_import_reports_row_errors_and_writes_nothing(self):
+        rows = [{'front': 'Q1', 'back': 'A1'}, {'front': 'Q2'}, {'back': 'A3'}]
+        response = self.client.post(reverse('flashcard_bulk_import'), rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(Flashcard.objects.exists())
+
+    def test_csv_import_then_streamed_export(self):
+        upload = SimpleUploadedFile('deck.csv', b'front,back,category\nQ1,A1,Math\n"Q, 2",A2,\n', content_type='text/csv')
+        response = self.client.post(reverse('flashcard_bulk_import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+
+        response = self.client.get(reverse('flashcard_export'))
+        self.assertTrue(response.streaming)
+        exported = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([card['front'] for card in exported], ['Q1', 'Q, 2'])
+
+        response = self.client.get(reverse('flashcard_export'), {'as': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,front,back,category,created_at')
+        self.assertEqual(len(lines), 3)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='cached', email='cached@example.com', password='pass12345')
+
+    def setUp(self):
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('user_detail', args=[self.user.id])
+        get_token_cache().clear()
+
+    def test_repeat_requests_skip_the_token_query(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(1):  # only the user lookup in the view
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_deleted_token_and_deactivated_user_are_invalidated(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_shared_tier_refills_the_local_lru(self):
+        with self.settings(TOKEN_AUTH_CACHE={'MAX_ENTRIES': 1, 'TTL': 60, 'CACHE_ALIAS': 'default'}):
+            self.client.get(self.url)
+            get_token_cache().clear()
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+class GroupResponseCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='cacher', email='cacher@example.com', password='pass12345')
+        cls.joiner = User.objects.create_user(username='joiner', email='joiner@example.com', password='pass12345')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        self.groups = [make_group(self.user, f'Group {i}') for i in range(12)]
+
+    def test_detail_is_cached_until_membership_changes(self):
+        url = reverse('group_detail', args=[self.groups[0].id])
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.groups[0].members.add(self.joiner)
+        refreshed = self.client.get(url)
+        self.assertEqual(refreshed.data['member_count'], 2)
+        self.assertNotEqual(refreshed['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_304_without_body(self):
+        url = reverse('group_list_create')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_update_only_invalidates_the_page_holding_the_group(self):
+        url = reverse('group_list_create')
+        self.client.get(url, {'page': 1})
+        self.client.get(url, {'page': 2})
+        last = self.groups[-1]
+        last.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            last.save()
+        with self.assertNumQueries(0):
+            self.client.get(url, {'page': 1})
+        response = self.client.get(url, {'page': 2})
+        self.assertIn('Renamed', [group['name'] for group in response.data['results']])
+
+    def test_invalidation_waits_for_commit(self):
+        url = reverse('group_detail', args=[self.groups[0].id])
+        self.client.get(url)
+        self.groups[0].name = 'Committed later'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.groups[0].save()
+            # Before the commit, readers keep the cached generation instead of caching the old row under a new one
+            with self.assertNumQueries(0):
+                self.client.get(url)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(url).data['name'], 'Committed later')
+
+
+class MembershipTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', email='creator@example.com', password='pass12345')
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='pass12345')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.group = make_group(self.creator, 'Algebra')
+
+    def test_join_is_idempotent_and_counted(self):
+        url = reverse('join_group', args=[self.group.id])
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, 200)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.member_count, 2)
+        self.assertEqual(self.group.members.count(), 2)
+        self.assertEqual(self.client.post(reverse('join_group', args=[self.group.id + 1])).status_code, 404)
+
+    def test_leave_decrements_and_creator_cannot_leave(self):
+        self.client.post(reverse('join_group', args=[self.group.id]))
+        for _ in range(2):
+            self.assertEqual(self.client.post(reverse('leave_group', args=[self.group.id])).status_code, 200)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.member_count, 1)
+        self.client.force_authenticate(self.creator)
+        self.assertEqual(self.client.post(reverse('leave_group', args=[self.group.id])).status_code, 403)
+
+    def test_reconcile_command_fixes_drift(self):
+        StudyGroup.objects.filter(pk=self.group.pk).update(member_count=7)
+        call_command('reconcile_member_counts', stdout=io.StringIO())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.member_count, 1)
+
+
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='searcher', email='searcher@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        Flashcard.objects.bulk_create([
+            Flashcard(user=cls.user, front='Photosynthesis', back='Plants turn light into sugar'),
+            Flashcard(user=cls.user, front='Mitochondria', back='Powerhouse of the cell, unlike photosynthesis in plants'),
+            Flashcard(user=cls.user, front='Gravity', back='Objects attract each other'),
+            Flashcard(user=cls.other, front='Photosynthesis', back='Someone else\'s card'),
+        ])
+        make_group(cls.other, 'Biology club', [cls.user])
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def search(self, q, **params):
+        response = self.client.get(reverse('search'), {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_ranked_prefix_search_scoped_to_user(self):
+        fronts = [card['front'] for card in self.search('photosynth')]
+        self.assertEqual(fronts, ['Photosynthesis', 'Mitochondria'])
+        self.assertEqual(self.search('"unbalanced AND (syntax'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        Flashcard.objects.filter(front='Gravity').update(front='Inertia')
+        self.assertEqual([card['front'] for card in self.search('inertia')], ['Inertia'])
+        Flashcard.objects.filter(front='Inertia').delete()
+        self.assertEqual(self.search('inertia'), [])
+
+    def test_group_search(self):
+        results = self.search('biology', type='groups')
+        self.assertEqual([group['name'] for group in results], ['Biology club'])
+        self.assertEqual(results[0]['member_count'], 2)
+        self.assertNotIn('members', results[0])
+
+
+class ReviewSchedulingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='learner', email='learner@example.com', password='pass12345')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_sm2_intervals(self):
+        card, now = Flashcard(), timezone.now()
+        intervals = [schedule_review(card, 5, now).interval for _ in range(3)]
+        self.assertEqual(intervals, [1, 6, 16])
+        self.assertAlmostEqual(card.ease_factor, 2.8)
+        schedule_review(card, 1, now)
+        self.assertEqual((card.interval, card.repetitions, card.due_at), (1, 0, now + timedelta(days=1)))
+        self.assertAlmostEqual(card.ease_factor, 2.8)
+
+    def test_due_queue_and_batch_review(self):
+        now = timezone.now()
+        cards = Flashcard.objects.bulk_create(
+            Flashcard(user=self.user, front=f'Q{i}', back='A', due_at=now - timedelta(days=i)) for i in range(4)
+        )
+        Flashcard.objects.filter(pk=cards[0].pk).update(due_at=now + timedelta(days=3))
+        due = self.client.get(reverse('flashcard_due'), {'limit': 2}).data
+        self.assertEqual([card['front'] for card in due], ['Q3', 'Q2'])
+
+        missing = cards[-1].id + 100
+        reviews = [{'id': card.id, 'grade': 4} for card in cards[1:]] + [{'id': missing, 'grade': 4}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('flashcard_batch_review'), reviews, format='json')
+        self.assertEqual(response.data, {'reviewed': 3, 'not_found': [missing]})
+        # One statement for all cards (the other UPDATE advances the sync counter)
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "api_flashcard"') for query in queries), 1)
+        self.assertEqual(self.client.get(reverse('flashcard_due')).data, [])
+
+    def test_batch_review_rejects_out_of_range_ids_and_long_lists(self):
+        url = reverse('flashcard_batch_review')
+        for card_id in (0, 10 ** 25):
+            self.assertEqual(self.client.post(url, [{'id': card_id, 'grade': 3}], format='json').status_code, 400)
+        with self.settings(FLASHCARD_BULK_CHUNK_SIZE=2):
+            response = self.client.post(url, [{'id': 'not an id'}] * 3, format='json')
+        self.assertEqual(response.data, {'error': 'At most 2 reviews can be sent at once'})
+
+    def test_single_review(self):
+        card = Flashcard.objects.create(user=self.user, front='Q', back='A')
+        url = reverse('flashcard_review', args=[card.id])
+        self.assertEqual(self.client.post(url, {'grade': 6}, format='json').status_code, 400)
+        response = self.client.post(url, {'grade': 3}, format='json')
+        self.assertEqual((response.data['interval'], response.data['repetitions']), (1, 1))
+
+
+class AsyncViewTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='asyncer', email='asyncer@example.com', password='pass12345')
+        cls.token = Token.objects.create(user=cls.user)
+        cls.group = make_group(cls.user, 'Async group')
+        for i in range(2):
+            make_group(cls.user, f'Async group {i}')
+        Flashcard.objects.bulk_create(Flashcard(user=cls.user, front=f'Q{i}', back='A') for i in range(5))
+
+    async def test_async_views_match_sync_representation(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        for sync_name, async_name, args in (
+            ('flashcard_list_create', 'async_flashcard_list_create', []),
+            ('group_list_create', 'async_group_list_create', []),
+            ('group_detail', 'async_group_detail', [self.group.id]),
+        ):
+            sync_response = await self.async_client.get(reverse(sync_name, args=args), {'page': 1}, headers=headers)
+            async_response = await self.async_client.get(reverse(async_name, args=args), {'page': 1}, headers=headers)
+            self.assertEqual(async_response.status_code, 200)
+            sync_data, async_data = sync_response.json(), async_response.json()
+            if 'results' in sync_data:
+                # next/previous point at each variant's own route
+                self.assertEqual(async_data['next'] is None, sync_data['next'] is None)
+                sync_data = {'count': sync_data['count'], 'results': sorted(sync_data['results'], key=lambda item: item['id'])}
+                async_data = {'count': async_data['count'], 'results': sorted(async_data['results'], key=lambda item: item['id'])}
+            self.assertEqual(async_data, sync_data, sync_name)
+
+    async def test_async_cursor_pages_match_sync(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        for sync_name, async_name in (
+            ('flashcard_list_create', 'async_flashcard_list_create'),
+            ('group_list_create', 'async_group_list_create'),
+        ):
+            pages = {}
+            for name in (sync_name, async_name):
+                params, pages[name] = {'cursor': '', 'page_size': 2, 'count': 'true'}, []
+                while params is not None:
+                    data = (await self.async_client.get(reverse(name), params, headers=headers)).json()
+                    cursor = parse_qs(urlparse(data['next']).query)['cursor'][0] if data['next'] else None
+                    pages[name].append((data.get('count'), data['results'], cursor))
+                    params = {'cursor': cursor, 'page_size': 2} if cursor else None
+            self.assertEqual(pages[async_name], pages[sync_name], sync_name)
+            self.assertGreater(len(pages[sync_name]), 1)
+        invalid = await self.async_client.get(reverse('async_group_list_create'), {'cursor': 'x'}, headers=headers)
+        self.assertEqual((invalid.status_code, invalid.json()), (404, {'detail': 'Invalid cursor'}))
+
+    async def test_async_group_reads_share_the_cache_and_etags(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        for sync_name, async_name, args in (
+            ('group_list_create', 'async_group_list_create', []),
+            ('group_detail', 'async_group_detail', [self.group.id]),
+        ):
+            await sync_to_async(cache.clear)()
+            fresh = await self.async_client.get(reverse(async_name, args=args), headers=headers)
+            self.assertIsNotNone(fresh['ETag'])
+            cached = await self.async_client.get(reverse(sync_name, args=args), headers=headers)
+            self.assertEqual((cached['ETag'], cached.json()), (fresh['ETag'], fresh.json()))
+            for name in (sync_name, async_name):
+                response = await self.async_client.get(reverse(name, args=args), headers={**headers, 'If-None-Match': fresh['ETag']})
+                self.assertEqual((response.status_code, response['ETag']), (304, fresh['ETag']), name)
+
+    async def test_async_group_create_adds_the_creator_atomically(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        url = reverse('async_group_list_create')
+        response = await self.async_client.post(url, {'name': 'Atomic', 'description': 'D'}, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['member_count'], [member['id'] for member in response.json()['members']]), (1, [self.user.id]))
+        with mock.patch.object(type(StudyGroup.objects), 'add_member', side_effect=DatabaseError('membership insert failed')):
+            with self.assertRaises(DatabaseError):
+                await self.async_client.post(url, {'name': 'Orphan', 'description': 'D'}, content_type='application/json', headers=headers)
+        self.assertFalse(await StudyGroup.objects.filter(name='Orphan').aexists())
+
+    async def test_async_page_size_and_count_false(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        url = reverse('async_flashcard_list_create')
+        data = (await self.async_client.get(url, {'page_size': 2, 'count': 'false'}, headers=headers)).json()
+        self.assertNotIn('count', data)
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn('page=2', data['next'])
+
+    async def test_async_create_and_auth(self):
+        url = reverse('async_flashcard_list_create')
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+        bad = await self.async_client.get(url, headers={'Authorization': 'Token nope'})
+        self.assertEqual(bad.json(), {'detail': 'Invalid token.'})
+        response = await self.async_client.post(
+            url, {'front': 'Async Q', 'back': 'Async A'}, content_type='application/json',
+            headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Flashcard.objects.filter(front='Async Q', user=self.user).aexists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkSuiteTests(APITestCase):
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual({pattern.name for pattern in urls.urlpatterns}, {endpoint.url_name for endpoint in ENDPOINTS})
+
+    def test_suite_runs_every_endpoint_without_errors(self):
+        ctx = suite_context(seed(users=3, groups=3, members_per_group=2, flashcards_per_user=25))
+        with unthrottled():  # login and registration run more often than the auth limit allows
+            results = run_suite(ctx, ENDPOINTS, requests=3, warmup=1, profile=2)
+        self.assertEqual(set(results), {endpoint.label for endpoint in ENDPOINTS})
+        for label, result in results.items():
+            self.assertEqual(result['errors'], 0, label)
+            self.assertEqual(result['requests'], 3, label)
+        self.assertEqual(results['flashcard_list']['queries_per_request'], 2)
+
+
+class PerformanceMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='timed', email='timed@example.com', password='pass12345')
+        cls.admin = User.objects.create_user(username='ops', email='ops@example.com', password='pass12345', is_staff=True)
+        cls.token = Token.objects.create(user=cls.user)
+        Flashcard.objects.bulk_create(Flashcard(user=cls.user, front=f'Q{i}', back='A') for i in range(3))
+
+    def setUp(self):
+        metrics_registry.reset()
+
+    def test_server_timing_header_and_json_log_line(self):
+        self.client.force_authenticate(self.user)
+        with self.assertLogs('api.performance', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('flashcard_list_create'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        data = logs.records[0].data
+        self.assertEqual(data['endpoint'], 'GET /api/flashcards/')
+        self.assertEqual((data['status'], data['queries'], data['response_bytes']), (200, len(queries), len(response.content)))
+        self.assertGreater(data['serializer_ms'], 0)
+
+    def test_metrics_endpoint_is_admin_only_and_aggregates_by_route(self):
+        self.client.force_authenticate(self.user)
+        for user in (self.user, self.admin):
+            self.client.get(reverse('user_detail', args=[user.id]))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_authenticate(self.admin)
+        endpoints = self.client.get(reverse('metrics')).json()['endpoints']
+        stats = endpoints['GET /api/users/<int:id>/']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(sum(stats['latency_ms']['buckets'].values()), 2)
+        self.assertEqual(stats['queries']['max'], 1)
+        self.assertEqual(self.client.delete(reverse('metrics')).status_code, 204)
+        # Only the reset request itself has been recorded since
+        self.assertEqual(list(metrics_registry.snapshot()['endpoints']), ['DELETE /api/metrics/'])
+
+    async def test_async_view_queries_are_counted(self):
+        with self.assertLogs('api.performance', 'INFO') as logs:
+            await self.async_client.get(reverse('async_flashcard_list_create'), headers={'Authorization': f'Token {self.token.key}'})
+        self.assertGreaterEqual(logs.records[0].data['queries'], 2)
+
+
+class LoggingPipelineTests(APITestCase):
+    def make_record(self, name, level, msg, *args):
+        return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+    def test_sampling_is_per_template_and_never_drops_warnings(self):
+        sampler = SamplingFilter({'api': 0.25})
+        listed = [sampler.filter(self.make_record('api.views', logging.INFO, 'Listed %s', i)) for i in range(8)]
+        self.assertEqual(listed, [True, False, False, False] * 2)
+        self.assertTrue(sampler.filter(self.make_record('api', logging.INFO, 'Registered %s', 'x')))
+        self.assertTrue(all(sampler.filter(self.make_record('api', logging.WARNING, 'Listed %s', i)) for i in range(4)))
+        self.assertTrue(sampler.filter(self.make_record('django', logging.INFO, 'Listed %s', 1)))
+
+    def test_queued_batched_file_logging_rotates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'api.log')
+            file_handler = BatchedRotatingFileHandler(path, maxBytes=1000, backupCount=3)
+            file_handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+            queued = QueueListenerHandler([file_handler], batch_size=16)
+            try:
+                for i in range(300):
+                    queued.handle(self.make_record('api', logging.INFO, 'event %s', i))
+                queued.flush()
+            finally:
+                queued.close()
+                file_handler.close()
+            with open(path) as fh:
+                last = fh.read().splitlines()
+            self.assertEqual(last[-1], 'INFO event 299')
+            self.assertTrue(os.path.exists(path + '.1'))
+            self.assertLessEqual(os.path.getsize(path + '.1'), 1000 + 16 * 20)
+
+
+class FlashcardIndexTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='indexed', email='indexed@example.com', password='pass12345')
+        Flashcard.objects.bulk_create(
+            Flashcard(user=cls.user, front=f'Q{i}', back='A', category=['Python', 'SQL', None][i % 3]) for i in range(30)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_category_filter_newest_first(self):
+        url = reverse('flashcard_list_create')
+        response = self.client.get(url, {'category': 'SQL'})
+        self.assertEqual(response.data['count'], 10)
+        ids = [card['id'] for card in response.data['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertTrue(all(card['category'] == 'SQL' for card in response.data['results']))
+        self.assertEqual(self.client.get(url, {'category': ''}).data['count'], 10)
+        cursor_page = self.client.get(url, {'category': 'Python', 'cursor': ''}).data
+        self.assertEqual([card['category'] for card in cursor_page['results']], ['Python'] * 10)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is backend specific')
+    def test_planner_uses_indexes_without_sorting(self):
+        plans = {
+            'flashcard_user_created_idx': Flashcard.objects.filter(user=self.user)[:10].explain(),
+            'flashcard_user_category_idx': Flashcard.objects.filter(user=self.user, category='SQL')[:10].explain(),
+        }
+        for index, plan in plans.items():
+            self.assertIn(f'USING INDEX {index}', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotIn('TEMP B-TREE', StudyGroup.objects.all()[:10].explain())
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite tuning only')
+class SQLiteTuningTests(APITestCase):
+    def test_new_connections_get_pragmas(self):
+        values = sqlite_pragma_values(connection)
+        self.assertEqual((values['synchronous'], values['busy_timeout'], values['cache_size']), (1, 5000, -65536))
+
+    def test_file_database_uses_wal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory, 'tuned.sqlite3'), 'TEST': {}}
+            other = type(connections['default'])(settings_dict, alias='tuning_check')
+            try:
+                other.connect()
+                self.assertEqual(sqlite_pragma_values(other)['journal_mode'], 'wal')
+                self.assertEqual(other.transaction_mode, 'IMMEDIATE')
+            finally:
+                other.close()
+
+
+class SparseFieldsetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='sparse', email='sparse@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='sparse2', email='sparse2@example.com', password='pass12345')
+        cls.group = make_group(cls.user, 'Sparse', members=[cls.other])
+        Flashcard.objects.create(user=cls.user, front='Q', back='A long answer ' * 50, category='Python')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_flashcard_fields_trim_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('flashcard_list_create'), {'fields': 'id,front'})
+        self.assertEqual(response.data['results'], [{'id': Flashcard.objects.get().id, 'front': 'Q'}])
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('"back"', select)
+        self.assertNotIn('"category"', select)
+
+    def test_relations_collapse_to_ids_unless_expanded(self):
+        url = reverse('group_detail', args=[self.group.id])
+        compact = self.client.get(url, {'fields': 'name,creator,members'}).data
+        self.assertEqual(compact, {'name': 'Sparse', 'creator': self.user.id, 'members': [self.user.id, self.other.id]})
+        with self.assertNumQueries(1):
+            expanded = self.client.get(url, {'fields': 'name', 'expand': 'creator'}).data
+        self.assertEqual(expanded['creator'], {'id': self.user.id, 'username': 'sparse', 'email': 'sparse@example.com'})
+        self.assertEqual(set(expanded), {'name', 'creator'})
+
+    def test_fieldsets_vary_the_group_cache(self):
+        url = reverse('group_list_create')
+        full = self.client.get(url).data['results'][0]
+        sparse = self.client.get(url, {'fields': 'id'}).data['results'][0]
+        self.assertIn('members', full)
+        self.assertEqual(sparse, {'id': self.group.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'fields': 'id'}).data['results'][0], sparse)
+
+    def test_unknown_fields_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('flashcard_list_create'), {'fields': 'id,answer'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('group_list_create'), {'expand': 'name'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('user_detail', args=[self.user.id]), {'fields': ''}).status_code, 400)
+
+
+class FastListPathTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='fast', email='fast@example.com', password='pass12345')
+        Flashcard.objects.create(user=cls.user, front='Ünïcode \u2028 line', back='A', category=None, ease_factor=2.36)
+        Flashcard.objects.create(user=cls.user, front='Q', back='A', category='SQL')
+
+    def test_row_mapper_matches_serializer(self):
+        cards = Flashcard.objects.filter(user=self.user)
+        for fields in (None, frozenset({'id', 'due_at'})):
+            mapper = row_mapper(FlashcardSerializer, fields)
+            expected = FlashcardSerializer(cards, many=True, context={'fields': fields}).data
+            self.assertEqual(mapper.map(mapper.values(cards)), expected)
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {'results': FlashcardSerializer(Flashcard.objects.all(), many=True).data, 'when': timezone.now(), 1: 'key'}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'), JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_list_endpoint_serves_mapped_rows(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('flashcard_list_create')
+        expected = FlashcardSerializer(Flashcard.objects.filter(user=self.user), many=True).data
+        self.assertEqual(json.loads(self.client.get(url).content)['results'], json.loads(json.dumps(expected)))
+        cursor_page = self.client.get(url, {'cursor': '', 'fields': 'front'}).data
+        self.assertEqual(cursor_page['results'], [{'front': 'Q'}, {'front': 'Ünïcode \u2028 line'}])
+
+
+class FlashcardSyncTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='syncer', email='syncer@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        Flashcard.objects.bulk_create(Flashcard(user=cls.user, front=f'Q{i}', back='A') for i in range(3))
+        Flashcard.objects.create(user=cls.other, front='Theirs', back='A')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def sync(self, **params):
+        response = self.client.get(reverse('flashcard_sync'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_tokens_ahead_of_the_counter_are_rejected(self):
+        token = int(self.sync()['token'])
+        for since in (token + 1, 10 ** 23):
+            response = self.client.get(reverse('flashcard_sync'), {'since': since})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.sync(since=token)['changed'], [])
+
+    def test_incremental_sync_reports_every_write_path(self):
+        full = self.sync()
+        self.assertEqual(sorted(card['front'] for card in full['changed']), ['Q0', 'Q1', 'Q2'])
+        self.assertEqual((full['deleted'], full['has_more']), ([], False))
+        self.assertEqual(self.sync(since=full['token'])['changed'], [])
+
+        first, second, third = Flashcard.objects.filter(user=self.user).order_by('id')
+        self.client.put(reverse('flashcard_detail', args=[first.id]), {'back': 'Edited'}, format='json')
+        self.client.post(reverse('flashcard_review', args=[second.id]), {'grade': 4}, format='json')
+        self.client.delete(reverse('flashcard_detail', args=[third.id]))
+        self.client.post(reverse('flashcard_bulk_import'), [{'front': 'New', 'back': 'A'}], format='json')
+        delta = self.sync(since=full['token'])
+        self.assertEqual([card['front'] for card in delta['changed']], ['Q0', 'Q1', 'New'])
+        self.assertEqual(delta['changed'][0]['back'], 'Edited')
+        self.assertEqual(delta['deleted'], [third.id])
+        self.assertGreater(int(delta['token']), int(full['token']))
+
+        # Tombstones stay out of the regular endpoints
+        self.assertEqual(self.client.get(reverse('flashcard_list_create')).data['count'], 3)
+        self.assertEqual(self.client.put(reverse('flashcard_detail', args=[third.id]), {'back': 'B'}, format='json').status_code, 404)
+        self.assertEqual(self.sync(since=delta['token'])['changed'], [])
+
+    def test_sync_pages_by_change_sequence(self):
+        page = self.sync(since='0', page_size='2')
+        self.assertEqual(([card['front'] for card in page['changed']], page['has_more']), (['Q0', 'Q1'], True))
+        page = self.sync(since=page['token'], page_size='2')
+        self.assertEqual(([card['front'] for card in page['changed']], page['has_more']), (['Q2'], False))
+        self.assertEqual(self.client.get(reverse('flashcard_sync'), {'since': 'abc'}).status_code, 400)
+
+    def test_purged_tombstones_force_a_full_sync(self):
+        token = self.sync()['token']
+        card = Flashcard.objects.filter(user=self.user).first()
+        card.delete()
+        Flashcard.all_objects.filter(pk=card.pk).update(deleted_at=timezone.now() - timedelta(days=60))
+        call_command('purge_flashcard_tombstones', days=30, stdout=io.StringIO())
+        self.assertFalse(Flashcard.all_objects.filter(pk=card.pk).exists())
+        self.assertEqual(SyncCounter.objects.get(user=self.user).purged_through, card.change_seq)
+        self.assertEqual(self.client.get(reverse('flashcard_sync'), {'since': token}).status_code, 410)
+        full = self.sync()
+        self.assertEqual(len(full['changed']), 2)
+        self.assertEqual(self.sync(since=full['token'])['changed'], [])
+
+
+@override_settings(API_THROTTLE={'RATES': {'auth': '2/min', 'write': '2/min', 'read': None}, 'CACHE_ALIAS': None})
+class ThrottlingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='limited', email='limited@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='unlimited', email='unlimited@example.com', password='pass12345')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        reset_throttle()  # fresh buckets for every test
+
+    def test_auth_scope_limits_password_checks_per_ip(self):
+        credentials = {'username': 'limited', 'password': 'wrong'}
+        statuses = [self.client.post(reverse('login'), credentials, format='json').status_code for _ in range(3)]
+        self.assertEqual(statuses, [401, 401, 429])
+        response = self.client.post(reverse('register'), {'username': 'new', 'email': 'new@example.com', 'password': 'pass12345'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 30)
+
+    def test_auth_scope_ignores_client_supplied_forwarded_for(self):
+        credentials = {'username': 'limited', 'password': 'wrong'}
+        statuses = [
+            self.client.post(reverse('login'), credentials, format='json', headers={'X-Forwarded-For': f'203.0.113.{i}'}).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_write_scope_is_per_user_and_reads_are_separate(self):
+        self.client.force_authenticate(self.user)
+        statuses = [self.client.post(reverse('flashcard_list_create'), {'front': 'Q', 'back': 'A'}, format='json').status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(self.client.get(reverse('flashcard_list_create')).status_code, 200)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.post(reverse('flashcard_list_create'), {'front': 'Q', 'back': 'A'}, format='json').status_code, 201)
+
+    async def test_async_views_share_the_limits(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        url = reverse('async_flashcard_list_create')
+        statuses = [(await self.async_client.post(url, {'front': 'Q', 'back': 'A'}, content_type='application/json', headers=headers)).status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+
+    def test_token_bucket_refills_evenly(self):
+        store = LocalBucketStore(max_entries=2)
+        self.assertEqual([store.hit('k', 2, 60, now=0) for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(store.hit('k', 2, 60, now=0), 30)
+        self.assertAlmostEqual(store.hit('k', 2, 60, now=20), 10)
+        self.assertEqual(store.hit('k', 2, 60, now=30), 0)
+        store.hit('a', 2, 60, now=30)
+        store.hit('b', 2, 60, now=30)
+        self.assertNotIn('k', store._buckets)  # bounded: least recently used dropped
+
+    def test_shared_sliding_window(self):
+        store = CacheWindowStore('default')
+        self.assertEqual([store.hit('sliding', 4, 60, now=60 * 1000 + 50) for _ in range(4)], [0, 0, 0, 0])
+        self.assertEqual(store.hit('sliding', 4, 60, now=60 * 1000 + 55), 5)  # over until the window ends
+        # Next window: 5 counted before, weighted by the 3/4 of that window still inside the last minute
+        self.assertAlmostEqual(store.hit('sliding', 4, 60, now=60 * 1001 + 15), (5 * 0.75 + 1 - 4) * 60 / 5)
+        self.assertEqual(store.hit('sliding', 4, 60, now=60 * 1001 + 50), 0)
+
+    def test_check_costs_microseconds(self):
+        throttle = get_throttle()
+        started = time.perf_counter()
+        for i in range(2000):
+            throttle.check('write', f'user:{i % 50}')
+        self.assertLess((time.perf_counter() - started) / 2000, 0.0001)
+
+
+@override_settings(PASSWORD_HASHING={'ITERATIONS': 1000, 'POOL_WORKERS': 1, 'MAX_PENDING': 1})
+class PasswordHashingPoolTests(APITestCase):
+    def register(self, name='pooled', url='register'):
+        return self.client.post(reverse(url), {'username': name, 'email': f'{name}@example.com', 'password': 'pass12345'}, format='json')
+
+    def test_register_and_login_hash_in_the_pool(self):
+        self.assertEqual(self.register().status_code, 201)
+        self.assertTrue(User.objects.get(username='pooled').password.startswith('pbkdf2_sha256$1000$'))
+        login = reverse('login')
+        self.assertEqual(self.client.post(login, {'username': 'pooled', 'password': 'pass12345'}, format='json').status_code, 200)
+        self.assertEqual(self.client.post(login, {'username': 'pooled', 'password': 'wrong'}, format='json').status_code, 401)
+        self.assertEqual(self.client.post(login, {'username': 'nobody', 'password': 'wrong'}, format='json').status_code, 401)
+
+    def test_changed_iterations_upgrade_the_hash_at_login(self):
+        self.register()
+        with override_settings(PASSWORD_HASHING={'ITERATIONS': 2000, 'POOL_WORKERS': 0, 'MAX_PENDING': 1}):
+            response = self.client.post(reverse('login'), {'username': 'pooled', 'password': 'pass12345'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.get(username='pooled').password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_full_pool_answers_503(self):
+        busy = get_pool().submit(time.sleep, 1)  # takes the only slot
+        response = self.register()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+        busy.result()
+        self.assertEqual(self.register().status_code, 201)
+
+    async def test_async_views_await_the_pool(self):
+        response = await self.async_client.post(
+            reverse('async_register'), {'username': 'async', 'email': 'async@example.com', 'password': 'pass12345'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.post(reverse('async_login'), {'username': 'async', 'password': 'pass12345'}, content_type='application/json')
+        self.assertEqual(response.json()['token'], (await Token.objects.aget(user__username='async')).key)
+        response = await self.async_client.post(reverse('async_login'), {'username': 'async', 'password': 'nope'}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class CachedSchemaTests(APITestCase):
+    def setUp(self):
+        reset_document()
+        self.addCleanup(reset_document)
+
+    @override_settings(API_SCHEMA={'ARTIFACT_DIR': None})
+    def test_schema_is_built_once_and_revalidated(self):
+        with mock.patch.object(SchemaDocument, 'build', wraps=SchemaDocument.build) as build:
+            first = self.client.get('/swagger/?format=openapi')
+            second = self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            yaml = self.client.get('/swagger.yaml')
+        self.assertEqual(build.call_count, 1)
+        self.assertIn('/flashcards/sync/', json.loads(first.content)['paths'])
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(second.content), first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(yaml['Content-Type'], 'application/yaml')
+        not_modified = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+
+    def test_artifact_is_used_while_it_matches_the_urlconf(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(API_SCHEMA={'ARTIFACT_DIR': directory}):
+            call_command('generate_schema', stdout=io.StringIO())
+            artifact = Path(directory) / 'openapi-v1.json'
+            self.assertTrue(artifact.with_suffix('.yaml').exists())
+            with mock.patch.object(SchemaDocument, 'build', wraps=SchemaDocument.build) as build:
+                response = self.client.get('/swagger.json')
+                self.assertEqual((build.call_count, response.content), (0, artifact.read_bytes()))
+                stale = json.loads(artifact.read_text())
+                stale[FINGERPRINT_KEY] = 'outdated'
+                artifact.write_text(json.dumps(stale))
+                reset_document()
+                response = self.client.get('/swagger.json')
+            self.assertEqual(build.call_count, 1)
+            self.assertNotEqual(json.loads(response.content)[FINGERPRINT_KEY], 'outdated')
+
+
+class ReplicaRoutingTests(APITransactionTestCase):
+    """A second SQLite file as the replica, refreshed by sync_sqlite_replicas."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        # Added here rather than in settings, so the test runner does not create or check it
+        connections.settings['replica_test'] = {**connections['default'].settings_dict, 'NAME': os.path.join(cls.directory.name, 'replica.sqlite3')}
+        cls.databases = {'default', 'replica_test'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica_test'].close()
+        del connections.settings['replica_test']
+        cls.directory.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        Flashcard.objects.create(user=self.user, front='Replicated', back='yes')
+        routing = override_settings(DATABASE_ROUTING={'REPLICAS': ['replica_test'], 'PIN_SECONDS': 60})
+        routing.enable()
+        self.addCleanup(routing.disable)
+        call_command('sync_sqlite_replicas', stdout=io.StringIO())
+        Flashcard.objects.create(user=self.user, front='Primary only', back='not yet replicated')
+
+    def fronts(self):
+        return [card['front'] for card in self.client.get(reverse('flashcard_list_create')).json()['results']]
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.fronts(), ['Replicated'])
+        self.assertEqual(Flashcard.objects.count(), 2)  # outside a request: the primary
+
+    def test_writer_is_pinned_to_the_primary(self):
+        response = self.client.post(reverse('flashcard_list_create'), {'front': 'Mine', 'back': 'now'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.fronts()), 3)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=User.objects.create_user('other')).key)
+        self.assertEqual(self.fronts(), [])  # another client is not pinned
+        cache.clear()  # the pin expires
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.user.auth_token.key)
+        self.assertEqual(self.fronts(), ['Replicated'])
+
+
+class GroupEventStreamTests(APITestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='host', password='pass12345')
+        self.member = User.objects.create_user(username='guest', password='pass12345')
+        self.group = make_group(self.creator, 'Streamed')
+        self.tokens = {user.username: Token.objects.create(user=user).key for user in (self.creator, self.member)}
+
+    def post_as(self, username, url_name, data=None, method='post'):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.tokens[username])
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(reverse(url_name, args=[self.group.id]), data, format='json')
+
+    async def test_join_and_edit_reach_subscribers_after_commit(self):
+        subscription = get_broker().subscribe(group_channel(self.group.id))
+        self.addCleanup(get_broker().unsubscribe, subscription)
+        await sync_to_async(self.post_as)('guest', 'join_group')
+        await sync_to_async(self.post_as)('host', 'group_detail', {'description': 'Edited'}, method='put')
+        frames = await subscription.aget(timeout=1)
+        self.assertEqual([frame.split(b'\n')[0] for frame in frames], [b'event: member_joined', b'event: updated'])
+        self.assertEqual(json.loads(frames[0].split(b'data: ')[1])['user'], {'id': self.member.id, 'username': 'guest'})
+        self.assertEqual(json.loads(frames[1].split(b'data: ')[1])['description'], 'Edited')
+
+    async def test_stream_over_asgi(self):
+        headers = {'Authorization': 'Token ' + self.tokens['guest']}
+        response = await self.async_client.get(reverse('group_events', args=[self.group.id]), headers=headers)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'text/event-stream'))
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry: '))
+        get_broker().publish(group_channel(self.group.id), 'updated', {'name': 'Live'})
+        self.assertEqual(await anext(chunks), b'event: updated\ndata: {"name":"Live"}\n\n')
+        # A client disconnect cancels the task writing the response, inside the wait for events
+        waiting = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(get_broker().subscriber_count(group_channel(self.group.id)), 0)
+        missing = await self.async_client.get(reverse('group_events', args=[self.group.id + 100]), headers=headers)
+        self.assertEqual(missing.status_code, 404)
+
+    @override_settings(API_EVENTS={'MAX_PENDING': 2})
+    def test_slow_subscriber_is_cut_off(self):
+        subscription = get_broker().subscribe(group_channel(self.group.id))
+        for i in range(3):
+            get_broker().publish(group_channel(self.group.id), 'updated', {'i': i})
+        with self.assertRaises(Overflowed):
+            subscription.get(timeout=0)
+
+    def test_streams_are_refused_under_wsgi(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.tokens['guest'])
+        response = self.client.get(reverse('group_events', args=[self.group.id]), {'timeout': 0})
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(get_broker().subscriber_count(group_channel(self.group.id)), 0)
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batcher', password='pass12345')
+        self.group = make_group(self.user, 'Batched')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+
+    def batch(self, *requests, **options):
+        response = self.client.post(reverse('batch'), {'requests': list(requests), **options}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['responses']
+
+    def test_sub_requests_run_in_order_as_the_batch_user(self):
+        created, listed, mine = self.batch(
+            {'method': 'POST', 'path': reverse('flashcard_list_create'), 'body': {'front': 'Q', 'back': 'A'}},
+            {'path': reverse('flashcard_list_create')},
+            {'path': reverse('user_detail', args=[self.user.id])},
+        )
+        self.assertEqual(created['status'], 201)
+        self.assertEqual(listed['status'], 200)
+        self.assertEqual([card['id'] for card in listed['body']['results']], [created['body']['id']])
+        self.assertEqual(mine['body']['username'], 'batcher')
+        self.client.credentials()
+        self.assertEqual(self.client.post(reverse('batch'), {'requests': [{'path': reverse('group_list_create')}]}, format='json').status_code, 401)
+
+    def test_unbatchable_and_invalid_items(self):
+        stream, outside, missing, invalid = self.batch(
+            {'path': reverse('group_events', args=[self.group.id])},
+            {'path': reverse('schema-json', args=['json'])},
+            {'path': '/api/nothing/'},
+            {'method': 'PUT', 'path': reverse('group_detail', args=[self.group.id]), 'body': {'name': ''}},
+        )
+        self.assertEqual([item['status'] for item in (stream, outside, missing, invalid)], [400, 400, 404, 400])
+        self.assertIn('cannot be batched', stream['body']['error'])
+        self.assertIn('name', invalid['body'])
+        with self.settings(API_BATCH={'MAX_REQUESTS': 1}):
+            response = self.client.post(reverse('batch'), {'requests': [{'path': '/api/groups/'}] * 2}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_items_may_only_set_allow_listed_headers(self):
+        response = self.client.post(reverse('batch'), {'requests': [
+            {'path': reverse('group_list_create'), 'headers': {'X-Forwarded-For': '203.0.113.9'}}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        url = reverse('group_detail', args=[self.group.id])
+        etag = self.client.get(url)['ETag']
+        (cached,) = self.batch({'path': url, 'headers': {'if-none-match': etag}})
+        self.assertEqual((cached['status'], cached['headers']), (304, {'ETag': etag}))
+
+    @override_settings(API_BATCH={'TIME_BUDGET_SECONDS': 0})
+    def test_requests_past_the_time_budget_are_not_run(self):
+        (late,) = self.batch({'method': 'POST', 'path': reverse('flashcard_list_create'), 'body': {'front': 'Q', 'back': 'A'}})
+        self.assertEqual(late['status'], 503)
+        self.assertFalse(Flashcard.objects.exists())
+
+
+class ParallelBatchTests(APITransactionTestCase):
+    def test_consecutive_reads_run_concurrently(self):
+        user = User.objects.create_user(username='parallel', password='pass12345')
+        groups = [make_group(user, f'Parallel {i}') for i in range(4)]
+        self.client.force_authenticate(user)
+        requests = [{'path': reverse('group_detail', args=[group.id])} for group in groups]
+        response = self.client.post(reverse('batch'), {'requests': requests, 'parallel': True}, format='json')
+        self.assertEqual([item['body']['name'] for item in response.json()['responses']], [group.name for group in groups])
+
+
+class UserLookupTests(APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'member{i}', email=f'member{i}@example.com', password='pass12345') for i in range(3)]
+        self.client.force_authenticate(self.users[0])
+        self.ids = [user.id for user in self.users]
+        cache.clear()
+
+    def lookup(self, ids, **params):
+        return self.client.get(reverse('user_lookup'), {'ids': ','.join(map(str, ids)), **params})
+
+    def test_users_resolve_in_one_query_then_from_the_cache(self):
+        with self.assertNumQueries(1):
+            response = self.lookup([self.ids[2], 999, self.ids[0]])
+        self.assertEqual([user['username'] for user in response.data['results']], ['member2', 'member0'])
+        self.assertEqual(response.data['not_found'], [999])
+        with self.assertNumQueries(1):  # only member1 is not cached
+            self.assertEqual(len(self.lookup(self.ids).data['results']), 3)
+        with self.assertNumQueries(0):
+            response = self.lookup(self.ids, fields='id')
+        self.assertEqual(response.data['results'][0], {'id': self.ids[0]})
+
+    def test_saved_users_are_refetched(self):
+        self.lookup(self.ids)
+        self.users[1].username = 'renamed'
+        self.users[1].save()
+        self.assertEqual(self.lookup(self.ids).data['results'][1]['username'], 'renamed')
+        self.users[2].delete()
+        self.assertEqual(self.lookup(self.ids).data['not_found'], [self.ids[2]])
+
+    def test_ids_are_validated(self):
+        self.assertEqual(self.client.get(reverse('user_lookup')).status_code, 400)
+        self.assertEqual(self.lookup(['1', 'x']).status_code, 400)
+        self.assertEqual(self.lookup([self.ids[0], 10 ** 23]).status_code, 400)
+        self.assertEqual(self.lookup([0]).status_code, 400)
+        with self.settings(USER_PROFILE_CACHE={'MAX_IDS': 2}):
+            self.assertEqual(self.lookup(self.ids).status_code, 400)
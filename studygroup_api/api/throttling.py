@@ -0,0 +1,176 @@
+"""
+Request throttling with cheap counters.
+
+Each request is charged to one scope and one client. The scope is 'auth' for login and
+registration, where every attempt costs a password hash; otherwise 'write' for unsafe
+methods and 'read' for the rest. The client is the user when authenticated, otherwise the
+IP address. Limits come from settings.API_THROTTLE.
+
+By default the counters are token buckets held in this process, so a check is a dict
+lookup and a little arithmetic under a lock, with no cache round trip. With CACHE_ALIAS
+set, the limits are shared between workers through a sliding-window counter (the current
+and previous fixed windows, weighted) that needs only atomic add()/incr() from the cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_THROTTLE = {
+    # 'requests/period' with period s, min, hour or day; None turns the scope off
+    'RATES': {
+        'auth': '20/min',
+        'write': '120/min',
+        'read': '1200/min',
+    },
+    # Cache alias for limits shared between workers, or None for per-process buckets
+    'CACHE_ALIAS': None,
+    'MAX_ENTRIES': 100000,  # per-process buckets kept; the least recently used are dropped
+}
+
+AUTH, WRITE, READ = 'auth', 'write', 'read'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'100/min' -> (100, 60); None -> None."""
+    if rate is None:
+        return None
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period[0]]
+
+
+def method_scope(method):
+    return READ if method in SAFE_METHODS else WRITE
+
+
+class LocalBucketStore:
+    """Token buckets in this process: `limit` tokens, refilled evenly over `period` seconds."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period, now=None):
+        """Take a token. Returns 0 when allowed, else the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        rate = limit / period
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            # Re-inserting keeps the dict in least-recently-used order; a dropped bucket was idle and refills to full
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def ahit(self, key, limit, period):
+        return self.hit(key, limit, period)  # no I/O, safe on the event loop
+
+
+class CacheWindowStore:
+    """
+    Sliding-window counters in a shared Django cache. Rejected requests are counted too,
+    so a client that keeps retrying past its limit stays limited.
+    """
+
+    def __init__(self, cache_alias):
+        self.cache = caches[cache_alias]
+
+    def hit(self, key, limit, period, now=None):
+        current, previous, elapsed = self._window(key, period, now)
+        self.cache.add(current, 0, period * 2)
+        try:
+            count = self.cache.incr(current)
+        except ValueError:  # expired between add() and incr()
+            count = 1
+            self.cache.set(current, count, period * 2)
+        return self._wait(count, self.cache.get(previous, 0), limit, period, elapsed)
+
+    async def ahit(self, key, limit, period):
+        current, previous, elapsed = self._window(key, period)
+        await self.cache.aadd(current, 0, period * 2)
+        try:
+            count = await self.cache.aincr(current)
+        except ValueError:
+            count = 1
+            await self.cache.aset(current, count, period * 2)
+        return self._wait(count, await self.cache.aget(previous, 0), limit, period, elapsed)
+
+    @staticmethod
+    def _window(key, period, now=None):
+        window, elapsed = divmod(time.time() if now is None else now, period)
+        return f'throttle:{key}:{period}:{int(window)}', f'throttle:{key}:{period}:{int(window) - 1}', elapsed
+
+    @staticmethod
+    def _wait(count, previous, limit, period, elapsed):
+        estimated = previous * (1 - elapsed / period) + count
+        if estimated <= limit:
+            return 0
+        if count > limit or not previous:
+            return period - elapsed  # over the limit until this window ends
+        # Until enough of the previous window has slid out
+        return (estimated - limit) * period / previous
+
+
+class Throttle:
+    """Parsed API_THROTTLE: the rate for each scope and the counter store."""
+
+    def __init__(self, rates, cache_alias=None, max_entries=DEFAULT_THROTTLE['MAX_ENTRIES']):
+        self.rates = {scope: parse_rate(rate) for scope, rate in rates.items()}
+        self.store = CacheWindowStore(cache_alias) if cache_alias else LocalBucketStore(max_entries)
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_THROTTLE, **getattr(settings, 'API_THROTTLE', {})}
+        return cls(config['RATES'], config['CACHE_ALIAS'], config['MAX_ENTRIES'])
+
+    def check(self, scope, client):
+        """0 when the request may proceed, else the seconds to wait."""
+        rate = self.rates.get(scope)
+        return self.store.hit(f'{scope}:{client}', *rate) if rate else 0
+
+    async def acheck(self, scope, client):
+        rate = self.rates.get(scope)
+        return await self.store.ahit(f'{scope}:{client}', *rate) if rate else 0
+
+
+_throttle = None
+
+
+def get_throttle():
+    global _throttle
+    if _throttle is None:
+        _throttle = Throttle.from_settings()
+    return _throttle
+
+
+def reset_throttle():
+    global _throttle
+    _throttle = None
+
+
+class ScopedThrottle(BaseThrottle):
+    """
+    DEFAULT_THROTTLE_CLASSES entry. Views may name their scope with a throttle_scope
+    attribute; otherwise the request method picks 'read' or 'write'.
+    """
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None) or method_scope(request.method)
+        self.delay = get_throttle().check(scope, self.client(request))
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+    def client(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'ip:{self.get_ident(request)}'
@@ -1,18 +1,50 @@
+from django.conf import settings
 from django.urls import path
+from .async_views import (
+    AsyncStudyGroupListCreateView, AsyncStudyGroupDetailView,
+    AsyncFlashcardListCreateView, AsyncFlashcardDetailView,
+    AsyncRegisterView, AsyncLoginView, AsyncGroupEventStreamView
+)
 from .views import (
-    RegisterView, LoginView, UserDetailView,
-    StudyGroupListCreateView, StudyGroupDetailView, JoinStudyGroupView,
-    FlashcardListCreateView, FlashcardDetailView  # Import the flashcard views
+    RegisterView, LoginView, UserDetailView, UserLookupView,
+    StudyGroupListCreateView, StudyGroupDetailView, StudyGroupMembersView, JoinStudyGroupView, LeaveStudyGroupView,
+    FlashcardListCreateView, FlashcardDetailView, FlashcardBulkImportView, FlashcardExportView,  # Import the flashcard views
+    FlashcardReviewView, FlashcardBatchReviewView, DueFlashcardsView, FlashcardSyncView,
+    SearchView, MetricsView, BatchView
 )
 
+def select(name, view, async_view):
+    # Routes named in API_ASYNC_VIEWS are served by their native async variant
+    return async_view.as_view() if name in settings.API_ASYNC_VIEWS else view.as_view()
+
 urlpatterns = [
-    path('users/register/', RegisterView.as_view(), name='register'),
-    path('users/login/', LoginView.as_view(), name='login'),
+    path('users/register/', select('register', RegisterView, AsyncRegisterView), name='register'),
+    path('users/login/', select('login', LoginView, AsyncLoginView), name='login'),
+    path('users/', UserLookupView.as_view(), name='user_lookup'),
     path('users/<int:id>/', UserDetailView.as_view(), name='user_detail'),
-    path('groups/', StudyGroupListCreateView.as_view(), name='group_list_create'),
-    path('groups/<int:id>/', StudyGroupDetailView.as_view(), name='group_detail'),
+    path('groups/', select('group_list_create', StudyGroupListCreateView, AsyncStudyGroupListCreateView), name='group_list_create'),
+    path('groups/<int:id>/', select('group_detail', StudyGroupDetailView, AsyncStudyGroupDetailView), name='group_detail'),
+    path('groups/<int:id>/members/', StudyGroupMembersView.as_view(), name='group_members'),
     path('groups/<int:id>/join/', JoinStudyGroupView.as_view(), name='join_group'),
+    path('groups/<int:id>/leave/', LeaveStudyGroupView.as_view(), name='leave_group'),
+    path('groups/<int:id>/events/', AsyncGroupEventStreamView.as_view(), name='group_events'),
     # Flashcard endpoints
-    path('flashcards/', FlashcardListCreateView.as_view(), name='flashcard_list_create'),
-    path('flashcards/<int:id>/', FlashcardDetailView.as_view(), name='flashcard_detail'),
+    path('flashcards/', select('flashcard_list_create', FlashcardListCreateView, AsyncFlashcardListCreateView), name='flashcard_list_create'),
+    path('flashcards/<int:id>/', select('flashcard_detail', FlashcardDetailView, AsyncFlashcardDetailView), name='flashcard_detail'),
+    path('flashcards/bulk/', FlashcardBulkImportView.as_view(), name='flashcard_bulk_import'),
+    path('flashcards/export/', FlashcardExportView.as_view(), name='flashcard_export'),
+    path('flashcards/<int:id>/review/', FlashcardReviewView.as_view(), name='flashcard_review'),
+    path('flashcards/review/', FlashcardBatchReviewView.as_view(), name='flashcard_batch_review'),
+    path('flashcards/due/', DueFlashcardsView.as_view(), name='flashcard_due'),
+    path('flashcards/sync/', FlashcardSyncView.as_view(), name='flashcard_sync'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    # Async variants, always reachable for canarying and benchmarking
+    path('async/groups/', AsyncStudyGroupListCreateView.as_view(), name='async_group_list_create'),
+    path('async/groups/<int:id>/', AsyncStudyGroupDetailView.as_view(), name='async_group_detail'),
+    path('async/flashcards/', AsyncFlashcardListCreateView.as_view(), name='async_flashcard_list_create'),
+    path('async/flashcards/<int:id>/', AsyncFlashcardDetailView.as_view(), name='async_flashcard_detail'),
+    path('async/users/register/', AsyncRegisterView.as_view(), name='async_register'),
+    path('async/users/login/', AsyncLoginView.as_view(), name='async_login'),
 ]
\ No newline at end of file
@@ -2,21 +2,110 @@ import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from .models import StudyGroup, Flashcard
-from .serializers import UserSerializer, RegisterSerializer, StudyGroupSerializer, FlashcardSerializer
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from . import batch
+from . import cache as response_cache
+from . import events
+from . import profiles
+from .metrics import registry as metrics_registry
+from .fieldsets import FULL, FieldsetError, describe, expandable, parse_fieldset, trim_queryset
+from .hashing import HashingBusy
+from .bulk import BulkImportError, read_rows, validate_rows, stream_csv, stream_json
+from .models import StudyGroup, Flashcard, SyncCounter, MAX_ID, MEMBER_MODES, MEMBERS_COUNT, MEMBERS_FULL, member_queryset
+from .pagination import (
+    PAGE_SIZE_QUERY_PARAM, FlashcardKeysetPagination, ListPagination, StudyGroupKeysetPagination, get_page_size, get_paginator
+)
+from .scheduling import schedule_review
+from .search import get_search_backend
+from .throttling import AUTH, READ
+from .serializers import (
+    UserSerializer, RegisterSerializer, StudyGroupSerializer, FlashcardSerializer,
+    ReviewSerializer, BatchReviewSerializer, BatchSerializer, row_mapper
+)
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # Set up logger for the 'api' app
 logger = logging.getLogger('api')
 
+members_param = openapi.Parameter(
+    'members', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(MEMBER_MODES), default=MEMBERS_FULL,
+    description="Member representation: 'full' embeds every member, 'preview' embeds the first few, 'count' embeds none. member_count is always returned."
+)
+
+cursor_params = [
+    openapi.Parameter(
+        'cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description="Opt into cursor pagination. Pass an empty value for the first page, then follow the next/previous links."
+    ),
+    openapi.Parameter(
+        'count', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+        description="Page mode: false skips the COUNT query and omits count. Cursor mode: true also returns the (cached) total count."
+    ),
+    openapi.Parameter(
+        'page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+        description=f"Items per page (default {settings.REST_FRAMEWORK['PAGE_SIZE']}, at most {settings.MAX_PAGE_SIZE})."
+    ),
+]
+
+category_param = openapi.Parameter(
+    'category', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    description="Only flashcards in this category (exact match); pass an empty value for uncategorized cards."
+)
+
+def filter_category(flashcards, params):
+    # Served by the (user, category, created_at, id) index
+    if 'category' not in params:
+        return flashcards
+    category = params['category']
+    return flashcards.filter(category=category) if category else flashcards.filter(Q(category='') | Q(category__isnull=True))
+
+def get_member_mode(request, default=MEMBERS_FULL):
+    mode = request.query_params.get('members', default)
+    return mode if mode in MEMBER_MODES else None
+
+def group_queryset(mode, fieldset=FULL):
+    if not fieldset.includes('members'):
+        mode = MEMBERS_COUNT  # nothing to prefetch
+    groups = StudyGroup.objects.for_representation(mode, settings.GROUP_MEMBER_PREVIEW_SIZE)
+    return trim_queryset(groups, StudyGroupSerializer, fieldset)
+
+def invalid_member_mode_response():
+    return Response({'error': f"members must be one of: {', '.join(MEMBER_MODES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+def fieldset_params(serializer_class):
+    params = [openapi.Parameter(
+        'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description=f"Comma-separated fields to return, out of: {', '.join(describe(serializer_class))}. "
+                    "Only those columns are read from the database."
+    )]
+    if expandable(serializer_class):
+        params.append(openapi.Parameter(
+            'expand', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+            description=f"With fields, embed these relations as objects instead of ids: {', '.join(expandable(serializer_class))}."
+        ))
+    return params
+
+def hashing_busy_response():
+    logger.warning("Password hashing pool is full, refusing sign-in")
+    return Response({'error': 'Too many sign-ins in progress, try again shortly'}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+
+def invalid_fieldset_response(exc):
+    return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = AUTH  # password hashing: limited per IP
 
     @swagger_auto_schema(
         operation_description="Register a new user and return a token.",
@@ -31,24 +120,29 @@ class RegisterView(APIView):
         ),
         responses={
             201: openapi.Response('User registered successfully', UserSerializer),
-            400: 'Bad Request - Invalid input data'
+            400: 'Bad Request - Invalid input data',
+            503: 'Service Unavailable - Too many sign-ins in progress; retry after Retry-After seconds'
         }
     )
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            try:
+                user = serializer.save()
+            except HashingBusy:
+                return hashing_busy_response()
             token, created = Token.objects.get_or_create(user=user)
-            logger.info(f"User {user.username} registered successfully")
+            logger.info("User %s registered successfully", user.username)
             return Response({
                 'user': UserSerializer(user).data,
                 'token': token.key
             }, status=status.HTTP_201_CREATED)
-        logger.error(f"Registration failed: {serializer.errors}")
+        logger.error("Registration failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = AUTH  # password hashing: limited per IP
 
     @swagger_auto_schema(
         operation_description="Authenticate a user and return a token.",
@@ -67,18 +161,22 @@ class LoginView(APIView):
                     'token': openapi.Schema(type=openapi.TYPE_STRING, description='Authentication token')
                 }
             )),
-            401: 'Unauthorized - Invalid credentials'
+            401: 'Unauthorized - Invalid credentials',
+            503: 'Service Unavailable - Too many sign-ins in progress; retry after Retry-After seconds'
         }
     )
     def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
-        user = authenticate(username=username, password=password)
+        try:
+            user = authenticate(username=username, password=password)  # api.backends.PooledModelBackend
+        except HashingBusy:
+            return hashing_busy_response()
         if user:
             token, created = Token.objects.get_or_create(user=user)
-            logger.info(f"User {username} logged in successfully")
+            logger.info("User %s logged in successfully", username)
             return Response({'token': token.key}, status=status.HTTP_200_OK)
-        logger.error(f"Login failed for username {username}: Invalid credentials")
+        logger.error("Login failed for username %s: Invalid credentials", username)
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
 class UserDetailView(APIView):
@@ -86,33 +184,86 @@ class UserDetailView(APIView):
 
     @swagger_auto_schema(
         operation_description="Retrieve details of a specific user by ID.",
+        manual_parameters=fieldset_params(UserSerializer),
         responses={
             200: openapi.Response('User details retrieved', UserSerializer),
+            400: 'Bad Request - Invalid fields',
             404: 'Not Found - User does not exist',
             401: 'Unauthorized - Authentication required'
         }
     )
     def get(self, request, id):
         try:
-            user = User.objects.get(id=id)
-            serializer = UserSerializer(user)
-            logger.info(f"User {id} details retrieved by {request.user.username}")
+            fieldset = parse_fieldset(request.query_params, UserSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        try:
+            user = trim_queryset(User.objects.all(), UserSerializer, fieldset).get(id=id)
+            serializer = UserSerializer(user, context=fieldset.context())
+            logger.info("User %s details retrieved by %s", id, request.user.username)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except User.DoesNotExist:
-            logger.error(f"User {id} not found")
+            logger.error("User %s not found", id)
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
+class UserLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Retrieve many users by ID in one request, e.g. to render a group's members. "
+                              "Users come from a cache of serialized users; only those not cached are queried, all at once.",
+        manual_parameters=[
+            openapi.Parameter(
+                'ids', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                description="Comma-separated user IDs, e.g. 1,2,3 (at most USER_PROFILE_CACHE MAX_IDS)."
+            ),
+            *fieldset_params(UserSerializer),
+        ],
+        responses={
+            200: openapi.Response('Users in the order requested', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'not_found': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER))
+                }
+            )),
+            400: 'Bad Request - Invalid ids or fields',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request):
+        try:
+            fieldset = parse_fieldset(request.query_params, UserSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        limit = profiles.get_config()['MAX_IDS']
+        try:
+            ids = list(dict.fromkeys(int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()))
+        except ValueError:
+            ids = []
+        if not ids or len(ids) > limit or not all(1 <= user_id <= MAX_ID for user_id in ids):
+            return Response({'error': f"ids must list between 1 and {limit} user IDs, separated by commas"}, status=status.HTTP_400_BAD_REQUEST)
+        found = profiles.get_profiles(ids)
+        results = [
+            {name: value for name, value in found[user_id].items() if fieldset.includes(name)}
+            for user_id in ids if user_id in found
+        ]
+        logger.info("%s of %s users retrieved by %s", len(results), len(ids), request.user.username)
+        return Response({'results': results, 'not_found': [user_id for user_id in ids if user_id not in found]}, status=status.HTTP_200_OK)
+
 class StudyGroupListCreateView(APIView):
     # Define pagination_class explicitly
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
+    cursor_pagination_class = StudyGroupKeysetPagination
 
     @swagger_auto_schema(
-        operation_description="List all study groups. Results are paginated (10 per page). Use ?page=2 to access the next page.",
+        operation_description="List all study groups. Results are paginated (10 per page, ?page_size= up to MAX_PAGE_SIZE). Use ?page=2 to access the next page, or ?cursor= for cursor pagination.",
+        manual_parameters=[members_param, *cursor_params, *fieldset_params(StudyGroupSerializer)],
         responses={
             200: openapi.Response('Paginated list of study groups', openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
-                    'count': openapi.Schema(type=openapi.TYPE_INTEGER, description='Total number of groups'),
+                    'count': openapi.Schema(type=openapi.TYPE_INTEGER, description='Total number of groups (omitted with ?count=false)'),
                     'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the next page'),
                     'previous': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the previous page'),
                     'results': openapi.Schema(
@@ -123,16 +274,31 @@ class StudyGroupListCreateView(APIView):
                         )
                     )
                 }
-            ))
+            )),
+            304: 'Not Modified - The If-None-Match ETag is current',
+            400: 'Bad Request - Invalid members mode or fields'
         }
     )
     def get(self, request):
-        groups = StudyGroup.objects.all()
-        paginator = self.pagination_class()
+        mode = get_member_mode(request)
+        if not mode:
+            return invalid_member_mode_response()
+        try:
+            fieldset = parse_fieldset(request.query_params, StudyGroupSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        cache_key = response_cache.group_list_key(request, mode, fieldset)
+        cached = response_cache.get_cached(cache_key)
+        if cached:
+            logger.info("Listed study groups (page %s, cached)", request.GET.get('page', 1))
+            return response_cache.etag_response(request, *cached)
+        groups = group_queryset(mode, fieldset)
+        paginator = get_paginator(self, request)
         page = paginator.paginate_queryset(groups, request)
-        serializer = StudyGroupSerializer(page, many=True)
-        logger.info(f"Listed study groups (page {request.GET.get('page', 1)})")
-        return paginator.get_paginated_response(serializer.data)
+        serializer = StudyGroupSerializer(page, many=True, context={'members': mode, **fieldset.context()})
+        logger.info("Listed study groups (page %s)", request.GET.get('page', 1))
+        data = paginator.get_paginated_response(serializer.data).data
+        return response_cache.etag_response(request, data, response_cache.set_cached(cache_key, data))
 
     @swagger_auto_schema(
         operation_description="Create a new study group. The authenticated user is set as the creator.",
@@ -154,33 +320,48 @@ class StudyGroupListCreateView(APIView):
         serializer = StudyGroupSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(creator=request.user)
-            logger.info(f"Study group {serializer.data['name']} created by {request.user.username}")
+            logger.info("Study group %s created by %s", serializer.data['name'], request.user.username)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Study group creation failed: {serializer.errors}")
+        logger.error("Study group creation failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class StudyGroupDetailView(APIView):
-    def get_object(self, id):
+    def get_object(self, id, queryset=None):
         try:
-            return StudyGroup.objects.get(id=id)
+            return (queryset if queryset is not None else StudyGroup.objects).get(id=id)
         except StudyGroup.DoesNotExist:
             return None
 
     @swagger_auto_schema(
         operation_description="Retrieve details of a specific study group by ID.",
+        manual_parameters=[members_param, *fieldset_params(StudyGroupSerializer)],
         responses={
             200: openapi.Response('Study group details', StudyGroupSerializer),
+            304: 'Not Modified - The If-None-Match ETag is current',
+            400: 'Bad Request - Invalid members mode or fields',
             404: 'Not Found - Study group does not exist'
         }
     )
     def get(self, request, id):
-        group = self.get_object(id)
+        mode = get_member_mode(request)
+        if not mode:
+            return invalid_member_mode_response()
+        try:
+            fieldset = parse_fieldset(request.query_params, StudyGroupSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        cache_key = response_cache.group_detail_key(request, id, mode, fieldset)
+        cached = response_cache.get_cached(cache_key)
+        if cached:
+            logger.info("Study group %s details retrieved by %s (cached)", id, request.user.username)
+            return response_cache.etag_response(request, *cached)
+        group = self.get_object(id, group_queryset(mode, fieldset))
         if not group:
-            logger.error(f"Study group {id} not found")
+            logger.error("Study group %s not found", id)
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = StudyGroupSerializer(group)
-        logger.info(f"Study group {id} details retrieved by {request.user.username}")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = StudyGroupSerializer(group, context={'members': mode, **fieldset.context()})
+        logger.info("Study group %s details retrieved by %s", id, request.user.username)
+        return response_cache.etag_response(request, serializer.data, response_cache.set_cached(cache_key, serializer.data))
 
     @swagger_auto_schema(
         operation_description="Update a study group. Only the creator can update the group.",
@@ -201,19 +382,20 @@ class StudyGroupDetailView(APIView):
         }
     )
     def put(self, request, id):
-        group = self.get_object(id)
+        group = self.get_object(id, group_queryset(MEMBERS_FULL))
         if not group:
-            logger.error(f"Study group {id} not found for update")
+            logger.error("Study group %s not found for update", id)
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
         if group.creator != request.user:
-            logger.warning(f"User {request.user.username} attempted to update study group {id} but is not the creator")
+            logger.warning("User %s attempted to update study group %s but is not the creator", request.user.username, id)
             return Response({'error': 'Only the creator can update this group'}, status=status.HTTP_403_FORBIDDEN)
         serializer = StudyGroupSerializer(group, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            logger.info(f"Study group {id} updated by {request.user.username}")
+            logger.info("Study group %s updated by %s", id, request.user.username)
+            events.publish_group_event(id, events.GROUP_UPDATED, serializer.data)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        logger.error(f"Study group {id} update failed: {serializer.errors}")
+        logger.error("Study group %s update failed: %s", id, serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
@@ -228,18 +410,63 @@ class StudyGroupDetailView(APIView):
     def delete(self, request, id):
         group = self.get_object(id)
         if not group:
-            logger.error(f"Study group {id} not found for deletion")
+            logger.error("Study group %s not found for deletion", id)
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
         if group.creator != request.user:
-            logger.warning(f"User {request.user.username} attempted to delete study group {id} but is not the creator")
+            logger.warning("User %s attempted to delete study group %s but is not the creator", request.user.username, id)
             return Response({'error': 'Only the creator can delete this group'}, status=status.HTTP_403_FORBIDDEN)
         group.delete()
-        logger.info(f"Study group {id} deleted by {request.user.username}")
+        logger.info("Study group %s deleted by %s", id, request.user.username)
+        events.publish_group_event(id, events.GROUP_DELETED, {'group': id})
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class StudyGroupMembersView(APIView):
+    pagination_class = PageNumberPagination
+
+    @swagger_auto_schema(
+        operation_description="List the members of a study group. Results are paginated (10 per page). Use ?page=2 to access the next page.",
+        manual_parameters=fieldset_params(UserSerializer),
+        responses={
+            200: openapi.Response('Paginated list of group members', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'count': openapi.Schema(type=openapi.TYPE_INTEGER, description='Total number of members'),
+                    'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the next page'),
+                    'previous': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the previous page'),
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            ref='#/components/schemas/User'
+                        )
+                    )
+                }
+            )),
+            404: 'Not Found - Study group does not exist',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request, id):
+        try:
+            fieldset = parse_fieldset(request.query_params, UserSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        if not StudyGroup.objects.filter(id=id).exists():
+            logger.error("Study group %s not found for member listing", id)
+            return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
+        members = trim_queryset(member_queryset().filter(study_groups=id), UserSerializer, fieldset)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(members, request)
+        serializer = UserSerializer(page, many=True, context=fieldset.context())
+        logger.info("Listed members of study group %s (page %s)", id, request.GET.get('page', 1))
+        return paginator.get_paginated_response(serializer.data)
+
+def member_event(group_id, user):
+    return {'group': group_id, 'user': {'id': user.id, 'username': user.username}}
+
 class JoinStudyGroupView(APIView):
     @swagger_auto_schema(
-        operation_description="Join an existing study group. The authenticated user is added to the group's members.",
+        operation_description="Join an existing study group. The authenticated user is added to the group's members. Joining twice is a no-op.",
         responses={
             200: openapi.Response('Joined group successfully', openapi.Schema(
                 type=openapi.TYPE_OBJECT,
@@ -252,25 +479,56 @@ class JoinStudyGroupView(APIView):
         }
     )
     def post(self, request, id):
-        group = StudyGroup.objects.filter(id=id).first()
-        if not group:
-            logger.error(f"Study group {id} not found for joining")
+        joined = StudyGroup.objects.add_member(id, request.user.id)
+        if joined is None:
+            logger.error("Study group %s not found for joining", id)
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
-        group.members.add(request.user)
-        logger.info(f"User {request.user.username} joined study group {id}")
+        if joined:
+            logger.info("User %s joined study group %s", request.user.username, id)
+            events.publish_group_event(id, events.MEMBER_JOINED, member_event(id, request.user))
         return Response({'message': 'Joined group successfully'}, status=status.HTTP_200_OK)
 
+class LeaveStudyGroupView(APIView):
+    @swagger_auto_schema(
+        operation_description="Leave a study group. Leaving a group you are not in is a no-op; the creator cannot leave.",
+        responses={
+            200: openapi.Response('Left group successfully', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'message': openapi.Schema(type=openapi.TYPE_STRING, description='Success message')
+                }
+            )),
+            403: 'Forbidden - The creator cannot leave the group',
+            404: 'Not Found - Study group does not exist',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def post(self, request, id):
+        creator_id = StudyGroup.objects.filter(id=id).values_list('creator_id', flat=True).first()
+        if creator_id is None:
+            logger.error("Study group %s not found for leaving", id)
+            return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
+        if creator_id == request.user.id:
+            logger.warning("User %s attempted to leave study group %s they created", request.user.username, id)
+            return Response({'error': 'The creator cannot leave this group'}, status=status.HTTP_403_FORBIDDEN)
+        if StudyGroup.objects.remove_member(id, request.user.id):
+            logger.info("User %s left study group %s", request.user.username, id)
+            events.publish_group_event(id, events.MEMBER_LEFT, member_event(id, request.user))
+        return Response({'message': 'Left group successfully'}, status=status.HTTP_200_OK)
+
 class FlashcardListCreateView(APIView):
     # Define pagination_class explicitly
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
+    cursor_pagination_class = FlashcardKeysetPagination
 
     @swagger_auto_schema(
-        operation_description="List all flashcards for the authenticated user. Results are paginated (10 per page). Use ?page=2 to access the next page.",
+        operation_description="List all flashcards for the authenticated user, newest first. Results are paginated (10 per page, ?page_size= up to MAX_PAGE_SIZE). Use ?page=2 to access the next page, or ?cursor= for cursor pagination.",
+        manual_parameters=[category_param, *cursor_params, *fieldset_params(FlashcardSerializer)],
         responses={
             200: openapi.Response('Paginated list of flashcards', openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
-                    'count': openapi.Schema(type=openapi.TYPE_INTEGER, description='Total number of flashcards'),
+                    'count': openapi.Schema(type=openapi.TYPE_INTEGER, description='Total number of flashcards (omitted with ?count=false)'),
                     'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the next page'),
                     'previous': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the previous page'),
                     'results': openapi.Schema(
@@ -286,12 +544,17 @@ class FlashcardListCreateView(APIView):
         }
     )
     def get(self, request):
-        flashcards = Flashcard.objects.filter(user=request.user)
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(flashcards, request)
-        serializer = FlashcardSerializer(page, many=True)
-        logger.info(f"Listed flashcards for {request.user.username} (page {request.GET.get('page', 1)})")
-        return paginator.get_paginated_response(serializer.data)
+        try:
+            fieldset = parse_fieldset(request.query_params, FlashcardSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        flashcards = filter_category(Flashcard.objects.filter(user=request.user), request.query_params)
+        # Large pages: map plain .values() rows instead of building instances and running the serializer
+        mapper = row_mapper(FlashcardSerializer, fieldset.fields)
+        paginator = get_paginator(self, request)
+        page = paginator.paginate_queryset(mapper.values(flashcards), request)
+        logger.info("Listed flashcards for %s (page %s)", request.user.username, request.GET.get('page', 1))
+        return paginator.get_paginated_response(mapper.map(page))
 
     @swagger_auto_schema(
         operation_description="Create a new flashcard for the authenticated user.",
@@ -314,9 +577,9 @@ class FlashcardListCreateView(APIView):
         serializer = FlashcardSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(user=request.user)
-            logger.info(f"Flashcard created by {request.user.username}: {serializer.data['front']}")
+            logger.info("Flashcard created by %s: %s", request.user.username, serializer.data['front'])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Flashcard creation failed: {serializer.errors}")
+        logger.error("Flashcard creation failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class FlashcardDetailView(APIView):
@@ -347,14 +610,14 @@ class FlashcardDetailView(APIView):
     def put(self, request, id):
         flashcard = self.get_object(id, request.user)
         if not flashcard:
-            logger.error(f"Flashcard {id} not found or not authorized for {request.user.username}")
+            logger.error("Flashcard %s not found or not authorized for %s", id, request.user.username)
             return Response({'error': 'Flashcard not found or not authorized'}, status=status.HTTP_404_NOT_FOUND)
         serializer = FlashcardSerializer(flashcard, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            logger.info(f"Flashcard {id} updated by {request.user.username}")
+            logger.info("Flashcard %s updated by %s", id, request.user.username)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        logger.error(f"Flashcard {id} update failed: {serializer.errors}")
+        logger.error("Flashcard %s update failed: %s", id, serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
@@ -368,8 +631,390 @@ class FlashcardDetailView(APIView):
     def delete(self, request, id):
         flashcard = self.get_object(id, request.user)
         if not flashcard:
-            logger.error(f"Flashcard {id} not found or not authorized for {request.user.username}")
+            logger.error("Flashcard %s not found or not authorized for %s", id, request.user.username)
             return Response({'error': 'Flashcard not found or not authorized'}, status=status.HTTP_404_NOT_FOUND)
         flashcard.delete()
-        logger.info(f"Flashcard {id} deleted by {request.user.username}")
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        logger.info("Flashcard %s deleted by %s", id, request.user.username)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class FlashcardBulkImportView(APIView):
+    @swagger_auto_schema(
+        operation_description="Create many flashcards at once from a JSON array body or a CSV upload (multipart field 'file' with a front,back,category header). Nothing is saved unless every row is valid.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'front': openapi.Schema(type=openapi.TYPE_STRING, description='Front side of the flashcard'),
+                    'back': openapi.Schema(type=openapi.TYPE_STRING, description='Back side of the flashcard'),
+                    'category': openapi.Schema(type=openapi.TYPE_STRING, description='Category of the flashcard (optional)'),
+                },
+                required=['front', 'back']
+            )
+        ),
+        responses={
+            201: openapi.Response('Flashcards created', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'created': openapi.Schema(type=openapi.TYPE_INTEGER, description='Number of flashcards created')
+                }
+            )),
+            400: 'Bad Request - Unreadable upload, too many rows, or per-row validation errors',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def post(self, request):
+        try:
+            rows = read_rows(request)
+        except BulkImportError as exc:
+            logger.error("Flashcard import failed for %s: %s", request.user.username, exc)
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.FLASHCARD_IMPORT_MAX_ROWS:
+            logger.error("Flashcard import by %s rejected: %s rows", request.user.username, len(rows))
+            return Response({'error': f"At most {settings.FLASHCARD_IMPORT_MAX_ROWS} flashcards can be imported at once"}, status=status.HTTP_400_BAD_REQUEST)
+        validated, errors = validate_rows(rows, settings.FLASHCARD_BULK_CHUNK_SIZE)
+        if errors:
+            logger.error("Flashcard import by %s failed validation on %s rows", request.user.username, len(errors))
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            created = Flashcard.objects.bulk_create(
+                [Flashcard(user=request.user, **data) for data in validated],
+                batch_size=settings.FLASHCARD_BULK_CHUNK_SIZE
+            )
+        logger.info("Imported %s flashcards for %s", len(created), request.user.username)
+        return Response({'created': len(created)}, status=status.HTTP_201_CREATED)
+
+class FlashcardExportView(APIView):
+    @swagger_auto_schema(
+        operation_description="Stream every flashcard of the authenticated user as JSON (default) or CSV (?as=csv).",
+        manual_parameters=[
+            openapi.Parameter('as', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['json', 'csv'], default='json', description='Export format')
+        ],
+        responses={
+            200: 'Flashcards as a JSON array or CSV file',
+            400: 'Bad Request - Unsupported export format',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request):
+        export_format = request.query_params.get('as', 'json')
+        if export_format not in ('json', 'csv'):
+            return Response({'error': 'as must be one of: json, csv'}, status=status.HTTP_400_BAD_REQUEST)
+        flashcards = Flashcard.objects.filter(user=request.user).order_by('id')
+        chunk_size = settings.FLASHCARD_BULK_CHUNK_SIZE
+        if export_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(flashcards, chunk_size), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(stream_json(flashcards, chunk_size), content_type='application/json')
+        response['Content-Disposition'] = f'attachment; filename="flashcards.{export_format}"'
+        logger.info("Flashcard export (%s) started for %s", export_format, request.user.username)
+        return response
+
+class FlashcardReviewView(APIView):
+    @swagger_auto_schema(
+        operation_description="Grade a review of one flashcard (0 = blackout, 5 = perfect recall) and reschedule it with SM-2.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'grade': openapi.Schema(type=openapi.TYPE_INTEGER, minimum=0, maximum=5, description='Recall quality from 0 to 5; below 3 counts as a lapse'),
+            },
+            required=['grade']
+        ),
+        responses={
+            200: openapi.Response('Flashcard rescheduled', FlashcardSerializer),
+            400: 'Bad Request - Invalid grade',
+            404: 'Not Found - Flashcard does not exist or not authorized',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def post(self, request, id):
+        serializer = ReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error("Review of flashcard %s failed: %s", id, serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        flashcard = Flashcard.objects.filter(id=id, user=request.user).first()
+        if not flashcard:
+            logger.error("Flashcard %s not found or not authorized for %s", id, request.user.username)
+            return Response({'error': 'Flashcard not found or not authorized'}, status=status.HTTP_404_NOT_FOUND)
+        schedule_review(flashcard, serializer.validated_data['grade'], timezone.now())
+        flashcard.save(update_fields=['ease_factor', 'interval', 'repetitions', 'due_at'])
+        logger.info("Flashcard %s reviewed by %s, next due %s", id, request.user.username, flashcard.due_at.date())
+        return Response(FlashcardSerializer(flashcard).data, status=status.HTTP_200_OK)
+
+class FlashcardBatchReviewView(APIView):
+    @swagger_auto_schema(
+        operation_description="Grade several reviews at once. All cards are rescheduled in a single bulk update; unknown ids are reported and skipped.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='Flashcard id'),
+                    'grade': openapi.Schema(type=openapi.TYPE_INTEGER, minimum=0, maximum=5, description='Recall quality from 0 to 5'),
+                },
+                required=['id', 'grade']
+            )
+        ),
+        responses={
+            200: openapi.Response('Reviews applied', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'reviewed': openapi.Schema(type=openapi.TYPE_INTEGER, description='Number of flashcards rescheduled'),
+                    'not_found': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER), description='Ids that do not exist or are not yours')
+                }
+            )),
+            400: 'Bad Request - Invalid review list',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def post(self, request):
+        # Checked before validation, so an oversized list is refused without validating every item
+        if isinstance(request.data, list) and len(request.data) > settings.FLASHCARD_BULK_CHUNK_SIZE:
+            return Response({'error': f"At most {settings.FLASHCARD_BULK_CHUNK_SIZE} reviews can be sent at once"}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = BatchReviewSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            logger.error("Batch review failed: %s", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        reviews = serializer.validated_data
+        flashcards = Flashcard.objects.filter(user=request.user).in_bulk({review['id'] for review in reviews})
+        now = timezone.now()
+        for review in reviews:
+            if review['id'] in flashcards:
+                schedule_review(flashcards[review['id']], review['grade'], now)
+        Flashcard.objects.bulk_update(flashcards.values(), ['ease_factor', 'interval', 'repetitions', 'due_at'])
+        not_found = sorted({review['id'] for review in reviews} - flashcards.keys())
+        logger.info("%s flashcards reviewed by %s", len(flashcards), request.user.username)
+        return Response({'reviewed': len(flashcards), 'not_found': not_found}, status=status.HTTP_200_OK)
+
+class DueFlashcardsView(APIView):
+    @swagger_auto_schema(
+        operation_description="The authenticated user's flashcards that are due for review, most overdue first.",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=20, description='Maximum number of cards to return (at most 100)'),
+            *fieldset_params(FlashcardSerializer),
+        ],
+        responses={
+            200: openapi.Response('Due flashcards', FlashcardSerializer(many=True)),
+            400: 'Bad Request - Invalid limit or fields',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request):
+        limit = request.query_params.get('limit', '20')
+        if not limit.isdigit() or not 1 <= int(limit) <= 100:
+            return Response({'error': 'limit must be an integer between 1 and 100'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            fieldset = parse_fieldset(request.query_params, FlashcardSerializer)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        # Range scan on the (user, due_at) index; stops after `limit` rows
+        due = Flashcard.objects.filter(user=request.user, due_at__lte=timezone.now()).order_by('due_at', 'id')
+        due = trim_queryset(due, FlashcardSerializer, fieldset)[:int(limit)]
+        serializer = FlashcardSerializer(due, many=True, context=fieldset.context())
+        logger.info("Listed due flashcards for %s", request.user.username)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class FlashcardSyncView(APIView):
+    @swagger_auto_schema(
+        operation_description="Changes to your flashcards since a sync token: cards created or edited (reviews included) and ids of deleted cards, "
+                              "oldest change first. Omit since for a full sync of every live card; then pass the returned token as ?since= "
+                              "and repeat while has_more is true. A token older than the retained deletions gets 410 and needs a full sync.",
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Token from the previous sync; omit for a full sync'),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description=f"Changes per response (default and maximum {settings.MAX_PAGE_SIZE})"
+            ),
+        ],
+        responses={
+            200: openapi.Response('Changes since the token', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'token': openapi.Schema(type=openapi.TYPE_STRING, description='Pass as ?since= on the next sync'),
+                    'has_more': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='More changes are waiting; sync again right away'),
+                    'changed': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT, ref='#/components/schemas/Flashcard')),
+                    'deleted': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER), description='Ids of deleted flashcards'),
+                }
+            )),
+            400: 'Bad Request - since is not a token a previous sync returned',
+            410: 'Gone - The token predates purged deletions; sync again without since',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is not None and not since.isdigit():
+            return Response({'error': 'since must be a token returned by a previous sync'}, status=status.HTTP_400_BAD_REQUEST)
+        if PAGE_SIZE_QUERY_PARAM in request.query_params:
+            limit = get_page_size(request.query_params)
+        else:
+            limit = settings.MAX_PAGE_SIZE
+        # Read the counter before the cards: every change numbered up to it has committed already
+        counter = SyncCounter.objects.filter(user=request.user).values('value', 'purged_through').first()
+        counter = counter or {'value': 0, 'purged_through': 0}
+        if since is None:
+            since = 0
+            flashcards = Flashcard.objects.filter(user=request.user)  # a full sync needs no tombstones
+        elif int(since) > counter['value']:
+            # Never issued: echoing it back would make the client skip every change up to it
+            logger.error("Sync token %s of %s is ahead of its counter %s", since, request.user.username, counter['value'])
+            return Response({'error': 'since must be a token returned by a previous sync'}, status=status.HTTP_400_BAD_REQUEST)
+        elif int(since) < counter['purged_through']:
+            logger.warning("Sync token %s of %s predates purged tombstones", since, request.user.username)
+            return Response({'error': 'This sync token is too old; sync again without since'}, status=status.HTTP_410_GONE)
+        else:
+            since = int(since)
+            flashcards = Flashcard.all_objects.filter(user=request.user)
+        # Range scan on the (user, change_seq) index, with one extra row to tell whether there is more
+        mapper = row_mapper(FlashcardSerializer)
+        rows = list(
+            flashcards.filter(change_seq__gt=since).order_by('change_seq')
+            .values(*mapper.columns, 'change_seq', 'deleted_at')[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        token = rows[-1]['change_seq'] if rows else since
+        if not has_more:
+            token = max(token, counter['value'])
+        changed = [row for row in rows if row['deleted_at'] is None]
+        logger.info("Synced %s changes for %s since %s", len(rows), request.user.username, since)
+        return Response({
+            'token': str(token),
+            'has_more': has_more,
+            'changed': mapper.map(changed),
+            'deleted': [row['id'] for row in rows if row['deleted_at'] is not None],
+        }, status=status.HTTP_200_OK)
+
+class SearchView(APIView):
+    @swagger_auto_schema(
+        operation_description="Full-text search over your flashcards (front/back) or over study groups (name/description). "
+                              "Results are ranked by relevance and paginated (10 per page); the last word matches as a prefix.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description='Search terms'),
+            openapi.Parameter('type', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['flashcards', 'groups'], default='flashcards', description='What to search'),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Page number'),
+            openapi.Parameter(
+                'members', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(MEMBER_MODES), default=MEMBERS_COUNT,
+                description="Member representation for group results, as for the group list"
+            ),
+            openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Comma-separated fields to return, as for the flashcard or group list'),
+            openapi.Parameter('expand', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Relations to embed in group results, as for the group list'),
+        ],
+        responses={
+            200: openapi.Response('Ranked search results', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the next page'),
+                    'previous': openapi.Schema(type=openapi.TYPE_STRING, nullable=True, description='URL to the previous page'),
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT))
+                }
+            )),
+            400: 'Bad Request - Missing query or invalid type/page/fields',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        search_type = request.query_params.get('type', 'flashcards')
+        page = request.query_params.get('page', '1')
+        if not query or search_type not in ('flashcards', 'groups') or not page.isdigit() or int(page) < 1:
+            return Response({'error': 'q is required, type must be flashcards or groups, and page a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        backend = get_search_backend()
+        serializer_class = FlashcardSerializer if search_type == 'flashcards' else StudyGroupSerializer
+        try:
+            fieldset = parse_fieldset(request.query_params, serializer_class)
+        except FieldsetError as exc:
+            return invalid_fieldset_response(exc)
+        if search_type == 'flashcards':
+            mode = None
+            flashcards = trim_queryset(Flashcard.objects.filter(user=request.user), FlashcardSerializer, fieldset)
+            queryset = backend.search(flashcards, query)
+        else:
+            mode = get_member_mode(request, default=MEMBERS_COUNT)
+            if not mode:
+                return invalid_member_mode_response()
+            queryset = backend.search(group_queryset(mode, fieldset), query)
+
+        # Page by look-ahead instead of COUNT so a page is one ranked query
+        page = int(page)
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        offset = (page - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        has_next = len(results) > page_size
+        results = results[:page_size]
+        data = serializer_class(results, many=True, context={'members': mode, **fieldset.context()}).data
+
+        url = request.build_absolute_uri()
+        logger.info("Search for %s by %s returned %s results (page %s)", search_type, request.user.username, len(results), page)
+        return Response({
+            'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'results': data,
+        }, status=status.HTTP_200_OK)
+
+class BatchView(APIView):
+    throttle_scope = READ  # each sub-request is throttled in its own scope
+
+    @swagger_auto_schema(
+        operation_description="Run several API calls in one round trip. Sub-requests run in order as the authenticated user, "
+                              "and the response holds one {status, headers, body} per sub-request, in the same order. "
+                              "With parallel, consecutive GETs run concurrently. Streaming endpoints cannot be batched.",
+        request_body=BatchSerializer,
+        responses={
+            200: openapi.Response('One response per sub-request', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'responses': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'headers': openapi.Schema(type=openapi.TYPE_OBJECT, description='ETag, Location and Retry-After, when set'),
+                            'body': openapi.Schema(type=openapi.TYPE_OBJECT, description='The JSON body, or null'),
+                        }
+                    ))
+                }
+            )),
+            400: 'Bad Request - Invalid sub-requests, or more than API_BATCH MAX_REQUESTS of them',
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error("Batch request failed: %s", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        items = serializer.validated_data['requests']
+        limit = batch.get_config()['MAX_REQUESTS']
+        if len(items) > limit:
+            return Response({'error': f"At most {limit} requests can be batched"}, status=status.HTTP_400_BAD_REQUEST)
+        body = batch.run_batch(request, items, serializer.validated_data['parallel'])
+        logger.info("Ran a batch of %s requests for %s", len(items), request.user.username)
+        return HttpResponse(body, content_type='application/json')
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Per-endpoint request metrics recorded by PerformanceMiddleware in this server process: "
+                              "latency, DB time, serializer time, query count and response size histograms with estimated p50/p90/p99. Admins only.",
+        responses={
+            200: 'Metrics keyed by "METHOD /route"',
+            401: 'Unauthorized - Authentication required',
+            403: 'Forbidden - Admins only'
+        }
+    )
+    def get(self, request):
+        return Response(metrics_registry.snapshot(), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Reset the request metrics of this server process. Admins only.",
+        responses={
+            204: 'No Content - Metrics reset',
+            401: 'Unauthorized - Authentication required',
+            403: 'Forbidden - Admins only'
+        }
+    )
+    def delete(self, request):
+        metrics_registry.reset()
+        logger.info("Request metrics reset by %s", request.user.username)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'studygroup_api.settings')
 
 application = get_asgi_application()
+
+# Build (or load) the OpenAPI schema now rather than on the first request for it
+from api.schema import warm_up  # noqa: E402
+
+warm_up()
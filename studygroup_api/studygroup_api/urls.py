@@ -1,19 +1,21 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework import permissions
-from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from api.schema import get_schema_view
 
-# Configure Swagger
+# Swagger info, SWAGGER_SETTINGS['DEFAULT_INFO']
+api_info = openapi.Info(
+    title="Study Group Management API",
+    default_version='v1',
+    description="API for managing study groups, users, and flashcards",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@yourdomain.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+# Configure Swagger; the schema itself is generated once and cached (api/schema.py)
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Study Group Management API",
-        default_version='v1',
-        description="API for managing study groups, users, and flashcards",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@yourdomain.com"),
-        license=openapi.License(name="MIT License"),
-    ),
     public=True,
     permission_classes=(permissions.AllowAny,),
 )
@@ -22,6 +24,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     # Swagger endpoints
+    re_path(r'^swagger\.(?P<format>json|yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-]
\ No newline at end of file
+]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'studygroup_api.settings')
 
 application = get_wsgi_application()
+
+# Build (or load) the OpenAPI schema now rather than on the first request for it
+from api.schema import warm_up  # noqa: E402
+
+warm_up()